@@ -119,23 +119,6 @@ class ResultsCollector:
         except Exception:
             return []
 
-    def read_result(self, result_file: str) -> Optional[str]:
-        """
-        Read a result file
-
-        Args:
-            result_file: Result file name
-
-        Returns:
-            File content, None if failed
-        """
-        file_path = f"{self.results_path}/{result_file}"
-        try:
-            content = self.client.cat(file_path)
-            return content.decode('utf-8')
-        except Exception:
-            return None
-
     def wait_for_results(
         self,
         expected_count: int,
@@ -175,19 +158,28 @@ class ResultsCollector:
             # List current results
             result_files = self.list_results()
 
+            # Read all new files concurrently
+            new_files = [f for f in result_files if f not in seen_files]
+            results = self.client.cat_many([f"{self.results_path}/{f}" for f in new_files])
+
             # Process new files
-            for file_name in result_files:
-                if file_name not in seen_files:
-                    content = self.read_result(file_name)
-                    if content:
-                        collected_results.append({
-                            "file_name": file_name,
-                            "content": content,
-                            "timestamp": datetime.now().isoformat()
-                        })
-                        seen_files.add(file_name)
-
-                        print(f"📥 Result {len(collected_results)}/{expected_count}: {file_name}")
+            for file_name, result in zip(new_files, results):
+                if not result.ok:
+                    continue
+                try:
+                    content = result.value.decode('utf-8')
+                except UnicodeDecodeError:
+                    # Probably still being written; try again on the next poll
+                    continue
+                if content:
+                    collected_results.append({
+                        "file_name": file_name,
+                        "content": content,
+                        "timestamp": datetime.now().isoformat()
+                    })
+                    seen_files.add(file_name)
+
+                    print(f"📥 Result {len(collected_results)}/{expected_count}: {file_name}")
 
             # Check if we have all results
             if len(collected_results) >= expected_count:
@@ -1,13 +1,12 @@
 #!/usr/bin/env python3
 """AGFS MCP Server - Expose AGFS operations through Model Context Protocol"""
 
-import json
 import logging
 import os
 from typing import Any, Optional
 from mcp.server import Server
 from mcp.types import Tool, TextContent, Prompt, PromptMessage
-from pyagfs import AGFSClient, AGFSClientError, cp, upload, download
+from pyagfs import AGFSClient, AGFSClientError, codec, cp, upload, download
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -61,14 +60,30 @@ class AGFSMCPServer:
             logger.debug("Skills discovery failed: %s", exc)
             return []
 
-        skills: list[dict[str, str]] = []
+        skill_entries = []
         for entry in entries:
             if not entry.get("isDir"):
                 continue
             name = entry.get("name") or entry.get("path") or "skill"
-            skill_path = f"{self.skills_base.rstrip('/')}/{name}"
-            metadata = self._safe_cat(f"{skill_path}/metadata").strip()
-            instructions = self._safe_cat(f"{skill_path}/instructions").strip()
+            skill_entries.append((name, f"{self.skills_base.rstrip('/')}/{name}"))
+
+        # Fetch metadata and instructions of all skills concurrently
+        paths = []
+        for _, skill_path in skill_entries:
+            paths.append(f"{skill_path}/metadata")
+            paths.append(f"{skill_path}/instructions")
+        texts = []
+        for result in self._get_client().cat_many(paths):
+            if result.ok:
+                texts.append(result.value.decode("utf-8", errors="replace"))
+            else:
+                logger.debug("Failed to read %s: %s", result.path, result.error)
+                texts.append("")
+
+        skills: list[dict[str, str]] = []
+        for i, (name, skill_path) in enumerate(skill_entries):
+            metadata = texts[2 * i].strip()
+            instructions = texts[2 * i + 1].strip()
 
             safe_base = "".join(ch if ch.isalnum() else "_" for ch in name.lower()).strip("_")
             safe_name = f"skill_{safe_base}" if safe_base else f"skill_{len(skills)+1}"
@@ -597,7 +612,7 @@ The key insight is that whether you're reading from a SQL database at /db/users/
                     result = client.ls(path)
                     return [TextContent(
                         type="text",
-                        text=json.dumps(result, indent=2, ensure_ascii=False)
+                        text=codec.dumps(result, indent=2)
                     )]
 
                 elif name == "agfs_cat":
@@ -625,7 +640,7 @@ The key insight is that whether you're reading from a SQL database at /db/users/
                     result = client.mkdir(path, mode=mode)
                     return [TextContent(
                         type="text",
-                        text=json.dumps(result, indent=2)
+                        text=codec.dumps(result, indent=2, ensure_ascii=True)
                     )]
 
                 elif name == "agfs_rm":
@@ -634,7 +649,7 @@ The key insight is that whether you're reading from a SQL database at /db/users/
                     result = client.rm(path, recursive=recursive)
                     return [TextContent(
                         type="text",
-                        text=json.dumps(result, indent=2)
+                        text=codec.dumps(result, indent=2, ensure_ascii=True)
                     )]
 
                 elif name == "agfs_stat":
@@ -642,7 +657,7 @@ The key insight is that whether you're reading from a SQL database at /db/users/
                     result = client.stat(path)
                     return [TextContent(
                         type="text",
-                        text=json.dumps(result, indent=2)
+                        text=codec.dumps(result, indent=2, ensure_ascii=True)
                     )]
 
                 elif name == "agfs_mv":
@@ -651,7 +666,7 @@ The key insight is that whether you're reading from a SQL database at /db/users/
                     result = client.mv(old_path, new_path)
                     return [TextContent(
                         type="text",
-                        text=json.dumps(result, indent=2)
+                        text=codec.dumps(result, indent=2, ensure_ascii=True)
                     )]
 
                 elif name == "agfs_grep":
@@ -667,14 +682,14 @@ The key insight is that whether you're reading from a SQL database at /db/users/
                     )
                     return [TextContent(
                         type="text",
-                        text=json.dumps(result, indent=2, ensure_ascii=False)
+                        text=codec.dumps(result, indent=2)
                     )]
 
                 elif name == "agfs_mounts":
                     result = client.mounts()
                     return [TextContent(
                         type="text",
-                        text=json.dumps(result, indent=2)
+                        text=codec.dumps(result, indent=2, ensure_ascii=True)
                     )]
 
                 elif name == "agfs_mount":
@@ -684,7 +699,7 @@ The key insight is that whether you're reading from a SQL database at /db/users/
                     result = client.mount(fstype, path, config)
                     return [TextContent(
                         type="text",
-                        text=json.dumps(result, indent=2)
+                        text=codec.dumps(result, indent=2, ensure_ascii=True)
                     )]
 
                 elif name == "agfs_unmount":
@@ -692,14 +707,14 @@ The key insight is that whether you're reading from a SQL database at /db/users/
                     result = client.unmount(path)
                     return [TextContent(
                         type="text",
-                        text=json.dumps(result, indent=2)
+                        text=codec.dumps(result, indent=2, ensure_ascii=True)
                     )]
 
                 elif name == "agfs_health":
                     result = client.health()
                     return [TextContent(
                         type="text",
-                        text=json.dumps(result, indent=2)
+                        text=codec.dumps(result, indent=2, ensure_ascii=True)
                     )]
 
                 elif name == "agfs_cp":
@@ -771,7 +786,7 @@ The key insight is that whether you're reading from a SQL database at /db/users/
                         "message": data,
                         "timestamp": datetime.now(timezone.utc).isoformat()
                     }
-                    message_data = json.dumps(message_json, ensure_ascii=False)
+                    message_data = codec.dumps(message_json)
 
                     # Send the notification by writing to receiver's enqueue file
                     enqueue_path = f"{to_queue_path}/enqueue"
@@ -789,7 +804,7 @@ The key insight is that whether you're reading from a SQL database at /db/users/
                         if params is None:
                             raise ValueError("params is required for skill invocation")
                         if isinstance(params, (dict, list)):
-                            payload = json.dumps(params, ensure_ascii=False)
+                            payload = codec.dumps(params)
                         else:
                             payload = str(params)
                         skill_path = skill_info["path"]
@@ -3,16 +3,54 @@
 __version__ = "0.1.2"
 
 from .client import AGFSClient
-from .exceptions import AGFSClientError, AGFSConnectionError, AGFSTimeoutError, AGFSHTTPError
-from .helpers import cp, upload, download
+from .async_client import AsyncAGFSClient
+from .batch import BatchResult
+from .cache import ContentCache, MetadataCache
+from .fileinfo import FileInfo, FileTable
+from .fileobj import AGFSRawFile
+from .pack import PackReader, pack, unpack
+from .instrumentation import Instrumentation, MetricsCollector, RequestEvent
+from .retry import CircuitBreaker, RetryPolicy
+from .exceptions import (
+    AGFSClientError,
+    AGFSConnectionError,
+    AGFSTimeoutError,
+    AGFSHTTPError,
+    AGFSCircuitOpenError,
+    AGFSTransferError,
+)
+from .helpers import cp, upload, download, parallel_download, TransferProgress, TransferSummary
+from .sync import sync, SyncSummary
 
 __all__ = [
     "AGFSClient",
+    "AsyncAGFSClient",
+    "MetadataCache",
+    "ContentCache",
+    "AGFSRawFile",
+    "FileInfo",
+    "FileTable",
+    "BatchResult",
+    "Instrumentation",
+    "MetricsCollector",
+    "RequestEvent",
+    "RetryPolicy",
+    "CircuitBreaker",
     "AGFSClientError",
     "AGFSConnectionError",
     "AGFSTimeoutError",
     "AGFSHTTPError",
+    "AGFSCircuitOpenError",
+    "AGFSTransferError",
     "cp",
     "upload",
     "download",
+    "parallel_download",
+    "TransferProgress",
+    "TransferSummary",
+    "sync",
+    "SyncSummary",
+    "PackReader",
+    "pack",
+    "unpack",
 ]
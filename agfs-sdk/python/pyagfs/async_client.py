@@ -0,0 +1,396 @@
+"""Asyncio AGFS Server API Client"""
+
+import asyncio
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Union
+
+try:
+    import httpx
+except ImportError:  # httpx is an optional dependency (pip install pyagfs[async])
+    httpx = None
+
+from . import codec
+from .client import _status_error_message
+from .exceptions import AGFSClientError
+from .retry import RetryPolicy
+
+
+class AsyncAGFSClient:
+    """Asyncio client for AGFS Server API
+
+    Mirrors the method surface of AGFSClient, but every call is a coroutine and
+    all requests share one pooled, keep-alive httpx.AsyncClient.  Use it as an
+    async context manager or call aclose() when done:
+
+        >>> async with AsyncAGFSClient("http://localhost:8080") as client:
+        ...     files = await client.ls("/")
+    """
+
+    def __init__(
+        self,
+        api_base_url="http://localhost:8080",
+        timeout=10,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 5.0,
+        retry_policy: Optional[RetryPolicy] = None,
+    ):
+        """
+        Initialize async AGFS client.
+
+        Args:
+            api_base_url: API base URL. Can be either full URL with "/api/v1" or just the base.
+                         If "/api/v1" is not present, it will be automatically appended.
+            timeout: Request timeout in seconds (default: 10)
+            max_connections: Maximum number of concurrent connections (default: 100)
+            max_keepalive_connections: Maximum number of idle keep-alive connections (default: 20)
+            keepalive_expiry: Seconds an idle keep-alive connection is kept open (default: 5.0)
+            retry_policy: RetryPolicy applied to idempotent requests, with its circuit
+                          breaker and hedging, as in AGFSClient (default: RetryPolicy())
+        """
+        if httpx is None:
+            raise ImportError(
+                "AsyncAGFSClient requires httpx. Install it with: pip install pyagfs[async]"
+            )
+        api_base_url = api_base_url.rstrip("/")
+        # Auto-append /api/v1 if not present
+        if not api_base_url.endswith("/api/v1"):
+            api_base_url = api_base_url + "/api/v1"
+        self.api_base = api_base_url
+        self._host = api_base_url.split("://", 1)[-1].split("/", 1)[0]
+        self.timeout = timeout
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.session = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            timeout=timeout,
+        )
+
+    async def __aenter__(self) -> "AsyncAGFSClient":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close all pooled connections"""
+        await self.session.aclose()
+
+    def _handle_request_error(self, e: Exception, operation: str = "request") -> None:
+        """Convert httpx exceptions to the same user-friendly errors as AGFSClient"""
+        if isinstance(e, AGFSClientError):
+            raise e
+        if isinstance(e, httpx.ConnectError):
+            url_parts = self.api_base.split("://")
+            if len(url_parts) > 1:
+                host_port = url_parts[1].split("/")[0]
+            else:
+                host_port = "server"
+            raise AGFSClientError(f"Connection refused - server not running at {host_port}")
+        elif isinstance(e, httpx.TimeoutException):
+            raise AGFSClientError(f"Request timeout after {self.timeout}s")
+        elif isinstance(e, httpx.HTTPStatusError):
+            raise AGFSClientError(self._error_message(e.response))
+        else:
+            raise AGFSClientError(str(e))
+
+    @staticmethod
+    def _error_message(response: "httpx.Response") -> str:
+        """Extract the server's error message from a failed (already read) response"""
+        try:
+            error_msg = codec.loads(response.content).get("error", "")
+            if error_msg:
+                return error_msg
+        except (ValueError, KeyError, TypeError, AttributeError):
+            pass
+        return _status_error_message(response.status_code)
+
+    async def _send(self, operation: str, method: str, endpoint: str, idempotent: Optional[bool] = None,
+                    max_retries: Optional[int] = None, stream: bool = False, **kwargs) -> "httpx.Response":
+        """Send a request under the client's retry policy, like AGFSClient._send
+
+        Idempotent requests (GETs, digest and grep by default) are retried on
+        transient failures, go through the circuit breaker and, for plain GETs,
+        may be hedged. The final response is returned even if it carries an
+        error status; with stream=True the caller owns (and must close) it.
+        """
+        url = f"{self.api_base}/{endpoint}"
+        if idempotent is None:
+            idempotent = method == "GET" or operation in ("digest", "grep")
+        # Only bytes bodies can be replayed
+        content = kwargs.get("content")
+        if content is not None and not isinstance(content, (bytes, bytearray)):
+            idempotent = False
+
+        async def attempt() -> "httpx.Response":
+            if stream:
+                request = self.session.build_request(method, url, **kwargs)
+                return await self.session.send(request, stream=True)
+            return await self.session.request(method, url, **kwargs)
+
+        return await self.retry_policy.acall(
+            attempt,
+            self._host,
+            operation,
+            idempotent=idempotent,
+            hedgeable=method == "GET" and not stream,
+            max_retries=max_retries,
+        )
+
+    async def _request(self, operation: str, method: str, endpoint: str, **kwargs) -> "httpx.Response":
+        """Send a request and raise AGFSClientError on failure"""
+        try:
+            response = await self._send(operation, method, endpoint, **kwargs)
+            response.raise_for_status()
+            return response
+        except Exception as e:
+            self._handle_request_error(e)
+
+    async def _open_stream(self, operation: str, method: str, endpoint: str, **kwargs) -> "httpx.Response":
+        """Send a streaming request; the caller owns (and must close) the response"""
+        try:
+            response = await self._send(operation, method, endpoint, stream=True, **kwargs)
+        except Exception as e:
+            self._handle_request_error(e)
+        if response.is_error:
+            await response.aread()
+            await response.aclose()
+            raise AGFSClientError(self._error_message(response))
+        return response
+
+    async def health(self) -> Dict[str, Any]:
+        """Check server health"""
+        response = await self._request("health", "GET", "health")
+        return codec.loads(response.content)
+
+    async def ls(self, path: str = "/") -> List[Dict[str, Any]]:
+        """List directory contents"""
+        response = await self._request("ls", "GET", "directories", params={"path": path})
+        files = codec.loads(response.content).get("files")
+        return files if files is not None else []
+
+    async def read(self, path: str, offset: int = 0, size: int = -1, stream: bool = False):
+        return await self.cat(path, offset, size, stream)
+
+    async def cat(self, path: str, offset: int = 0, size: int = -1, stream: bool = False):
+        """Read file content with optional offset and size
+
+        Args:
+            path: File path
+            offset: Starting position (default: 0)
+            size: Number of bytes to read (default: -1, read all)
+            stream: Enable streaming mode for continuous reads (default: False)
+
+        Returns:
+            If stream=False: bytes content
+            If stream=True: async iterator yielding chunks of bytes
+
+        Example (stream):
+            >>> async for chunk in await client.cat("/large/file.log", stream=True):
+            ...     process(chunk)
+        """
+        params = {"path": path}
+
+        if stream:
+            params["stream"] = "true"
+            # No timeout for streaming
+            response = await self._open_stream("cat", "GET", "files", params=params, timeout=None)
+            return self._iter_content(response)
+
+        if offset > 0:
+            params["offset"] = str(offset)
+        if size >= 0:
+            params["size"] = str(size)
+        response = await self._request("cat", "GET", "files", params=params)
+        return response.content
+
+    async def _iter_content(self, response: "httpx.Response", chunk_size: int = 8192) -> AsyncIterator[bytes]:
+        """Yield response body chunks, closing the connection when done"""
+        try:
+            async for chunk in response.aiter_bytes(chunk_size):
+                yield chunk
+        finally:
+            await response.aclose()
+
+    @staticmethod
+    async def _aiter_data(data) -> AsyncIterator[bytes]:
+        """Adapt a sync iterator or file-like object into an async byte stream"""
+        if hasattr(data, "read"):
+            # Read in a worker thread so disk I/O doesn't block the event loop
+            loop = asyncio.get_running_loop()
+            while True:
+                chunk = await loop.run_in_executor(None, data.read, 65536)
+                if not chunk:
+                    break
+                yield chunk
+        else:
+            for chunk in data:
+                yield chunk
+
+    async def write(self, path: str, data: Union[bytes, Iterable[bytes], AsyncIterator[bytes]], max_retries: Optional[int] = None) -> str:
+        """Write data to file and return the response message
+
+        Args:
+            path: Path to write the file
+            data: File content as bytes, (async) iterator of bytes, or file-like object
+            max_retries: Override the retry policy's max_retries for this call
+                         (default: None, use the policy). Only bytes payloads are
+                         retried; streams can't be replayed.
+
+        Returns:
+            Response message from server
+        """
+        if isinstance(data, (bytes, bytearray)):
+            data_size_mb = len(data) / (1024 * 1024)
+            write_timeout = max(10, min(300, int(data_size_mb * 1 + 10)))
+            content = bytes(data)
+        else:
+            # For streaming/unknown size, use no timeout; streams can't be replayed
+            write_timeout = None
+            content = data if hasattr(data, "__aiter__") else self._aiter_data(data)
+
+        # Writes replace the whole file, so retrying a bytes payload is safe
+        response = await self._request(
+            "write", "PUT", "files",
+            idempotent=True,
+            max_retries=max_retries,
+            params={"path": path},
+            content=content,
+            timeout=write_timeout,
+        )
+        return codec.loads(response.content).get("message", "OK")
+
+    async def create(self, path: str) -> Dict[str, Any]:
+        """Create a new file"""
+        response = await self._request("create", "POST", "files", params={"path": path})
+        return codec.loads(response.content)
+
+    async def mkdir(self, path: str, mode: str = "755") -> Dict[str, Any]:
+        """Create a directory"""
+        response = await self._request("mkdir", "POST", "directories", params={"path": path, "mode": mode})
+        return codec.loads(response.content)
+
+    async def rm(self, path: str, recursive: bool = False) -> Dict[str, Any]:
+        """Remove a file or directory"""
+        params = {"path": path}
+        if recursive:
+            params["recursive"] = "true"
+        response = await self._request("rm", "DELETE", "files", params=params)
+        return codec.loads(response.content)
+
+    async def stat(self, path: str) -> Dict[str, Any]:
+        """Get file/directory information"""
+        response = await self._request("stat", "GET", "stat", params={"path": path})
+        return codec.loads(response.content)
+
+    async def mv(self, old_path: str, new_path: str) -> Dict[str, Any]:
+        """Rename/move a file or directory"""
+        response = await self._request("mv", "POST", "rename", params={"path": old_path}, json={"newPath": new_path})
+        return codec.loads(response.content)
+
+    async def chmod(self, path: str, mode: int) -> Dict[str, Any]:
+        """Change file permissions"""
+        response = await self._request("chmod", "POST", "chmod", params={"path": path}, json={"mode": mode})
+        return codec.loads(response.content)
+
+    async def touch(self, path: str) -> Dict[str, Any]:
+        """Touch a file (update timestamp by writing empty content)"""
+        response = await self._request("touch", "POST", "touch", params={"path": path})
+        return codec.loads(response.content)
+
+    async def mounts(self) -> List[Dict[str, Any]]:
+        """List all mounted plugins"""
+        response = await self._request("mounts", "GET", "mounts")
+        return codec.loads(response.content).get("mounts", [])
+
+    async def mount(self, fstype: str, path: str, config: Dict[str, Any]) -> Dict[str, Any]:
+        """Mount a plugin dynamically
+
+        Args:
+            fstype: Filesystem type (e.g., 'sqlfs', 's3fs', 'memfs')
+            path: Mount path
+            config: Plugin configuration as dictionary
+
+        Returns:
+            Response with message
+        """
+        response = await self._request("mount", "POST", "mount", json={"fstype": fstype, "path": path, "config": config})
+        return codec.loads(response.content)
+
+    async def unmount(self, path: str) -> Dict[str, Any]:
+        """Unmount a plugin"""
+        response = await self._request("unmount", "POST", "unmount", json={"path": path})
+        return codec.loads(response.content)
+
+    async def load_plugin(self, library_path: str) -> Dict[str, Any]:
+        """Load an external plugin from a shared library or HTTP(S) URL"""
+        response = await self._request("load_plugin", "POST", "plugins/load", json={"library_path": library_path})
+        return codec.loads(response.content)
+
+    async def unload_plugin(self, library_path: str) -> Dict[str, Any]:
+        """Unload an external plugin"""
+        response = await self._request("unload_plugin", "POST", "plugins/unload", json={"library_path": library_path})
+        return codec.loads(response.content)
+
+    async def list_plugins(self) -> List[str]:
+        """List all loaded external plugins"""
+        response = await self._request("list_plugins", "GET", "plugins")
+        return codec.loads(response.content).get("loaded_plugins", [])
+
+    async def grep(self, path: str, pattern: str, recursive: bool = False, case_insensitive: bool = False, stream: bool = False):
+        """Search for a pattern in files using regular expressions
+
+        Args:
+            path: Path to file or directory to search
+            pattern: Regular expression pattern to search for
+            recursive: Whether to search recursively in directories (default: False)
+            case_insensitive: Whether to perform case-insensitive matching (default: False)
+            stream: Whether to stream results as NDJSON (default: False)
+
+        Returns:
+            If stream=False: Dict with 'matches' (list of match objects) and 'count'
+            If stream=True: async iterator yielding match dicts and a final summary dict
+
+        Example (stream):
+            >>> async for item in await client.grep("/local/logs", "error", stream=True):
+            ...     print(item)
+        """
+        body = {
+            "path": path,
+            "pattern": pattern,
+            "recursive": recursive,
+            "case_insensitive": case_insensitive,
+            "stream": stream,
+        }
+        if stream:
+            response = await self._open_stream("grep", "POST", "grep", json=body, timeout=None)
+            return self._parse_ndjson_stream(response)
+        response = await self._request("grep", "POST", "grep", json=body)
+        return codec.loads(response.content)
+
+    async def _parse_ndjson_stream(self, response: "httpx.Response") -> AsyncIterator[Dict[str, Any]]:
+        """Parse NDJSON streaming response line by line, skipping malformed lines"""
+        decoder = codec.NDJSONDecoder()
+        try:
+            async for chunk in response.aiter_bytes():
+                for item in decoder.feed(chunk):
+                    yield item
+            for item in decoder.close():
+                yield item
+        finally:
+            await response.aclose()
+
+    async def digest(self, path: str, algorithm: str = "xxh3") -> Dict[str, Any]:
+        """Calculate the digest of a file using specified algorithm
+
+        Args:
+            path: Path to the file
+            algorithm: Hash algorithm to use - "xxh3" or "md5" (default: "xxh3")
+
+        Returns:
+            Dict with 'algorithm', 'path', and 'digest' keys
+        """
+        response = await self._request("digest", "POST", "digest", json={"algorithm": algorithm, "path": path})
+        return codec.loads(response.content)
@@ -0,0 +1,101 @@
+"""Concurrent batch operations for AGFSClient"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple, Union
+
+if TYPE_CHECKING:
+    from .client import AGFSClient
+
+# Client methods that may appear in a batch
+BATCH_OPERATIONS = frozenset(
+    ["stat", "cat", "ls", "write", "rm", "mkdir", "touch", "create", "digest", "mv", "chmod"]
+)
+
+DEFAULT_BATCH_WORKERS = 16
+
+Operation = Union[Tuple[Any, ...], Dict[str, Any]]
+
+
+class BatchResult:
+    """Outcome of one operation in a batch
+
+    Attributes:
+        op: Operation name (e.g. "stat")
+        path: First argument of the operation, usually the path
+        value: Return value of the operation (None if it failed)
+        error: Exception raised by the operation (None if it succeeded)
+    """
+
+    __slots__ = ("op", "path", "value", "error")
+
+    def __init__(self, op: str, path: Optional[str], value: Any = None, error: Optional[Exception] = None):
+        self.op = op
+        self.path = path
+        self.value = value
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def unwrap(self) -> Any:
+        """Return the value, or raise the operation's error"""
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+    def __repr__(self):
+        if self.error is not None:
+            return f"BatchResult({self.op} {self.path!r}: error={self.error!r})"
+        return f"BatchResult({self.op} {self.path!r}: ok)"
+
+
+def _parse_operation(op: Operation) -> Tuple[str, tuple, dict]:
+    """Split ("cat", "/a", {"size": 10}) or {"op": "cat", "path": "/a"} into name, args, kwargs"""
+    if isinstance(op, dict):
+        kwargs = dict(op)
+        name = kwargs.pop("op", None)
+        args = ()
+    else:
+        if not op:
+            raise ValueError("empty batch operation")
+        name, args = op[0], tuple(op[1:])
+        kwargs = {}
+        if args and isinstance(args[-1], dict):
+            kwargs = args[-1]
+            args = args[:-1]
+    if name not in BATCH_OPERATIONS:
+        raise ValueError(f"unsupported batch operation '{name}' (supported: {', '.join(sorted(BATCH_OPERATIONS))})")
+    return name, args, kwargs
+
+
+def run_batch(client: "AGFSClient", ops: Sequence[Operation], max_workers: int = DEFAULT_BATCH_WORKERS) -> List[BatchResult]:
+    """Run operations concurrently over a bounded thread pool.
+
+    Args:
+        client: AGFSClient instance
+        ops: Operations as tuples ("stat", "/a"), ("cat", "/a", {"size": 10}),
+             ("write", "/a", b"data") or dicts {"op": "rm", "path": "/a"}
+        max_workers: Maximum number of operations in flight (default: 16)
+
+    Returns:
+        One BatchResult per operation, in the order of ops. A failing operation
+        records its exception instead of aborting the batch.
+
+    Raises:
+        ValueError: If an operation is malformed (checked before anything runs)
+    """
+    parsed = [_parse_operation(op) for op in ops]
+
+    def run(item: Tuple[str, tuple, dict]) -> BatchResult:
+        name, args, kwargs = item
+        path = args[0] if args else kwargs.get("path", kwargs.get("old_path"))
+        try:
+            return BatchResult(name, path, value=getattr(client, name)(*args, **kwargs))
+        except Exception as e:
+            return BatchResult(name, path, error=e)
+
+    if len(parsed) <= 1 or max_workers <= 1:
+        return [run(item) for item in parsed]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(parsed))) as pool:
+        return list(pool.map(run, parsed))
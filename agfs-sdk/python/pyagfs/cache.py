@@ -0,0 +1,433 @@
+"""Client-side caches for AGFSClient"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def _normalize_path(path: str) -> str:
+    """Normalize a path so '/a/b/' and '/a/b' share one cache entry"""
+    if not path:
+        return "/"
+    if len(path) > 1:
+        path = path.rstrip("/") or "/"
+    return path
+
+
+def _parent_path(path: str) -> str:
+    """Return the parent directory of a normalized path"""
+    parent = path.rsplit("/", 1)[0]
+    return parent or "/"
+
+
+class MetadataCache:
+    """Bounded LRU cache for stat() and ls() results with per-mount TTLs
+
+    Entries expire after a TTL chosen by the longest matching prefix in
+    mount_ttls (falling back to ttl). A TTL of 0 disables caching below that
+    prefix, which is useful for mounts whose content changes on its own
+    (queuefs, heartbeatfs, streamfs...). "No such file" errors are cached
+    too, for negative_ttl seconds.
+
+    AGFSClient invalidates affected entries on its own mutating calls, but
+    changes made by other clients are only seen once entries expire.
+
+    Example:
+        >>> cache = MetadataCache(ttl=5, mount_ttls={"/queuefs": 0, "/s3": 60})
+        >>> client = AGFSClient("http://localhost:8080", metadata_cache=cache)
+        >>> client.stat("/s3/data.csv")   # miss, fetched from server
+        >>> client.stat("/s3/data.csv")   # hit
+        >>> cache.stats()
+        {'hits': 1, 'misses': 1, 'negative_hits': 0, 'evictions': 0, 'invalidations': 0, 'size': 1}
+    """
+
+    # Cache entry kinds
+    STAT = "stat"
+    LS = "ls"
+
+    def __init__(
+        self,
+        ttl: float = 5.0,
+        max_entries: int = 10000,
+        mount_ttls: Optional[Dict[str, float]] = None,
+        negative_ttl: Optional[float] = None,
+    ):
+        """
+        Initialize a metadata cache.
+
+        Args:
+            ttl: Default time-to-live of an entry in seconds (default: 5.0)
+            max_entries: Maximum number of cached entries before LRU eviction (default: 10000)
+            mount_ttls: Per-path-prefix TTL overrides, e.g. {"/queuefs": 0} (default: None)
+            negative_ttl: TTL for cached "No such file" errors; defaults to ttl
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.negative_ttl = ttl if negative_ttl is None else negative_ttl
+        # Longest prefix first so the most specific mount wins
+        self.mount_ttls = sorted(
+            ((_normalize_path(p), t) for p, t in (mount_ttls or {}).items()),
+            key=lambda item: len(item[0]),
+            reverse=True,
+        )
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, bool, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.negative_hits = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def ttl_for(self, path: str) -> float:
+        """Return the TTL that applies to a path"""
+        for prefix, ttl in self.mount_ttls:
+            if prefix == "/" or path == prefix or path.startswith(prefix + "/"):
+                return ttl
+        return self.ttl
+
+    def get(self, kind: str, path: str) -> Tuple[bool, bool, Any]:
+        """
+        Look up an entry.
+
+        Returns:
+            (found, negative, value): negative is True when the cached result is
+            a "No such file" error whose message is value.
+        """
+        key = (kind, _normalize_path(path))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, False, None
+            expires, negative, value = entry
+            if expires <= time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return False, False, None
+            self._entries.move_to_end(key)
+            if negative:
+                self.negative_hits += 1
+            else:
+                self.hits += 1
+            return True, negative, value
+
+    def put(self, kind: str, path: str, value: Any, negative: bool = False) -> None:
+        """Store an entry (or a negative entry whose value is the error message)"""
+        path = _normalize_path(path)
+        ttl = self.ttl_for(path)
+        if negative:
+            ttl = min(ttl, self.negative_ttl)
+        if ttl <= 0 or self.max_entries <= 0:
+            return
+        key = (kind, path)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, negative, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def put_listing(self, path: str, files: List[Dict[str, Any]]) -> None:
+        """Cache a directory listing and prime stat entries for its children"""
+        path = _normalize_path(path)
+        self.put(self.LS, path, files)
+        base = "" if path == "/" else path
+        for entry in files:
+            name = entry.get("name")
+            if name:
+                self.put(self.STAT, f"{base}/{name}", entry)
+
+    def invalidate(self, path: str, recursive: bool = False) -> None:
+        """
+        Drop entries affected by a change to path.
+
+        Removes the path's own stat/ls entries and its parent's listing. With
+        recursive=True everything below path is dropped as well (rm -r, mv of a
+        directory).
+        """
+        path = _normalize_path(path)
+        parent = _parent_path(path)
+        prefix = path.rstrip("/") + "/"
+        with self._lock:
+            self.invalidations += 1
+            for key in ((self.STAT, path), (self.LS, path), (self.LS, parent), (self.STAT, parent)):
+                self._entries.pop(key, None)
+            if recursive:
+                for key in [k for k in self._entries if k[1].startswith(prefix)]:
+                    del self._entries[key]
+
+    def clear(self) -> None:
+        """Drop all entries (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters and current size"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "negative_hits": self.negative_hits,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "size": len(self._entries),
+            }
+
+    def reset_stats(self) -> None:
+        """Reset hit/miss counters"""
+        with self._lock:
+            self.hits = self.misses = self.negative_hits = 0
+            self.evictions = self.invalidations = 0
+
+
+class ContentCache:
+    """Two-tier (memory + disk) LRU cache of file contents for AGFSClient.cat
+
+    Each entry is stored with the server-side digest of the content it holds.
+    On a cache hit the client asks /api/v1/digest for the current digest and
+    only re-downloads the file when it changed, so repeated reads of a large,
+    rarely-changing file cost one small round-trip.
+
+    Entries evicted from the memory tier are demoted to the disk tier (if a
+    disk_dir is given) instead of being dropped; disk hits are promoted back.
+
+    Note: computing a digest reads the file on the server. Restrict caching
+    with paths= to mounts where reading is side-effect free (not queuefs).
+
+    Example:
+        >>> cache = ContentCache(max_memory_bytes=256 << 20, disk_dir="/tmp/agfs-cache",
+        ...                      paths=["/s3", "/skills"])
+        >>> client = AGFSClient("http://localhost:8080", content_cache=cache)
+        >>> client.cat("/skills/search/SKILL.md")   # downloaded
+        >>> client.cat("/skills/search/SKILL.md")   # digest check only
+    """
+
+    def __init__(
+        self,
+        max_memory_bytes: int = 64 * 1024 * 1024,
+        disk_dir: Optional[str] = None,
+        max_disk_bytes: int = 1024 * 1024 * 1024,
+        algorithm: str = "xxh3",
+        paths: Optional[List[str]] = None,
+    ):
+        """
+        Initialize a content cache.
+
+        Args:
+            max_memory_bytes: Byte budget of the memory tier (default: 64 MiB)
+            disk_dir: Directory of the disk tier; None disables it (default: None)
+            max_disk_bytes: Byte budget of the disk tier (default: 1 GiB)
+            algorithm: Digest algorithm used for revalidation, "xxh3" or "md5" (default: "xxh3")
+            paths: Only cache files below these path prefixes (default: None, cache everything)
+        """
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.algorithm = algorithm
+        self.paths = [_normalize_path(p) for p in paths] if paths is not None else None
+        self.disk_dir = disk_dir
+
+        self._lock = threading.Lock()
+        # path -> (digest, data)
+        self._memory: "OrderedDict[str, Tuple[str, bytes]]" = OrderedDict()
+        self._memory_bytes = 0
+        # path -> (digest, size)
+        self._disk: "OrderedDict[str, Tuple[str, int]]" = OrderedDict()
+        self._disk_bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.evictions = 0
+        self.bytes_saved = 0
+
+        if disk_dir is not None:
+            os.makedirs(disk_dir, exist_ok=True)
+            self._load_disk_index()
+
+    def accepts(self, path: str) -> bool:
+        """Return True if path is eligible for caching"""
+        if self.paths is None:
+            return True
+        path = _normalize_path(path)
+        return any(p == "/" or path == p or path.startswith(p + "/") for p in self.paths)
+
+    # Disk tier
+
+    def _disk_key(self, path: str) -> str:
+        return hashlib.sha256(path.encode("utf-8")).hexdigest()
+
+    def _disk_files(self, path: str) -> Tuple[str, str]:
+        key = self._disk_key(path)
+        return os.path.join(self.disk_dir, key + ".data"), os.path.join(self.disk_dir, key + ".meta")
+
+    def _load_disk_index(self) -> None:
+        """Rebuild the disk tier index from a previous run, oldest first"""
+        entries = []
+        for name in os.listdir(self.disk_dir):
+            if not name.endswith(".meta"):
+                continue
+            meta_file = os.path.join(self.disk_dir, name)
+            data_file = meta_file[:-len(".meta")] + ".data"
+            try:
+                with open(meta_file, "r") as f:
+                    meta = json.load(f)
+                st = os.stat(data_file)
+            except (OSError, ValueError):
+                continue
+            entries.append((st.st_mtime, meta["path"], meta["digest"], st.st_size))
+        for _, path, digest, size in sorted(entries):
+            self._disk[path] = (digest, size)
+            self._disk_bytes += size
+        self._evict_disk()
+
+    def _write_disk(self, path: str, digest: str, data: bytes) -> None:
+        if self.disk_dir is None or len(data) > self.max_disk_bytes:
+            return
+        data_file, meta_file = self._disk_files(path)
+        try:
+            tmp = data_file + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, data_file)
+            with open(meta_file + ".tmp", "w") as f:
+                json.dump({"path": path, "digest": digest}, f)
+            os.replace(meta_file + ".tmp", meta_file)
+        except OSError:
+            return
+        self._drop_disk(path, remove_files=False)
+        self._disk[path] = (digest, len(data))
+        self._disk_bytes += len(data)
+        self._evict_disk()
+
+    def _read_disk(self, path: str) -> Optional[Tuple[str, bytes]]:
+        entry = self._disk.get(path)
+        if entry is None:
+            return None
+        data_file, _ = self._disk_files(path)
+        try:
+            with open(data_file, "rb") as f:
+                data = f.read()
+            os.utime(data_file)
+        except OSError:
+            self._drop_disk(path)
+            return None
+        self._disk.move_to_end(path)
+        return entry[0], data
+
+    def _drop_disk(self, path: str, remove_files: bool = True) -> None:
+        entry = self._disk.pop(path, None)
+        if entry is None:
+            return
+        self._disk_bytes -= entry[1]
+        if remove_files:
+            for name in self._disk_files(path):
+                try:
+                    os.remove(name)
+                except OSError:
+                    pass
+
+    def _evict_disk(self) -> None:
+        while self._disk_bytes > self.max_disk_bytes and self._disk:
+            path = next(iter(self._disk))
+            self._drop_disk(path)
+            self.evictions += 1
+
+    # Memory tier
+
+    def _put_memory(self, path: str, digest: str, data: bytes) -> None:
+        self._drop_memory(path)
+        if len(data) > self.max_memory_bytes:
+            return
+        self._memory[path] = (digest, data)
+        self._memory_bytes += len(data)
+        while self._memory_bytes > self.max_memory_bytes:
+            old_path, (old_digest, old_data) = self._memory.popitem(last=False)
+            self._memory_bytes -= len(old_data)
+            if self.disk_dir is not None and old_path not in self._disk:
+                self._write_disk(old_path, old_digest, old_data)
+            else:
+                self.evictions += 1
+
+    def _drop_memory(self, path: str) -> None:
+        entry = self._memory.pop(path, None)
+        if entry is not None:
+            self._memory_bytes -= len(entry[1])
+
+    # Public API
+
+    def get(self, path: str) -> Optional[Tuple[str, bytes]]:
+        """Return (digest, data) for a cached path, or None"""
+        path = _normalize_path(path)
+        with self._lock:
+            entry = self._memory.get(path)
+            if entry is not None:
+                self._memory.move_to_end(path)
+                return entry
+            entry = self._read_disk(path)
+            if entry is not None:
+                self._put_memory(path, entry[0], entry[1])
+            return entry
+
+    def put(self, path: str, digest: str, data: bytes) -> None:
+        """Store content together with its server-side digest"""
+        path = _normalize_path(path)
+        with self._lock:
+            self._put_memory(path, digest, data)
+            if path not in self._memory:
+                # Too large for the memory tier
+                self._write_disk(path, digest, data)
+            elif path in self._disk and self._disk[path][0] != digest:
+                self._drop_disk(path)
+
+    def record_hit(self, size: int) -> None:
+        """Count a successful revalidation that avoided a download of size bytes"""
+        with self._lock:
+            self.hits += 1
+            self.bytes_saved += size
+
+    def record_miss(self, stale: bool = False) -> None:
+        """Count a download (stale=True when a cached copy was out of date)"""
+        with self._lock:
+            self.misses += 1
+            if stale:
+                self.stale += 1
+
+    def invalidate(self, path: str, recursive: bool = False) -> None:
+        """Drop the cached content of path (and everything below it if recursive)"""
+        path = _normalize_path(path)
+        prefix = path.rstrip("/") + "/"
+        with self._lock:
+            self._drop_memory(path)
+            self._drop_disk(path)
+            if recursive:
+                for p in [p for p in self._memory if p.startswith(prefix)]:
+                    self._drop_memory(p)
+                for p in [p for p in self._disk if p.startswith(prefix)]:
+                    self._drop_disk(p)
+
+    def clear(self) -> None:
+        """Drop all entries from both tiers (counters are kept)"""
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            for path in list(self._disk):
+                self._drop_disk(path)
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters and tier sizes"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "stale": self.stale,
+                "evictions": self.evictions,
+                "bytes_saved": self.bytes_saved,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "disk_entries": len(self._disk),
+                "disk_bytes": self._disk_bytes,
+            }
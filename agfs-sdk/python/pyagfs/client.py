@@ -2,16 +2,58 @@
 
 import requests
 import time
-from typing import List, Dict, Any, Optional, Union, Iterator, BinaryIO
+import traceback
+from typing import List, Dict, Any, Optional, Sequence, Union, Iterator, BinaryIO
 from requests.exceptions import ConnectionError, Timeout, RequestException
 
+from .batch import DEFAULT_BATCH_WORKERS, BatchResult, Operation, run_batch
 from .exceptions import AGFSClientError
+from .cache import ContentCache, MetadataCache
+from . import codec
+from .digest import try_digest_bytes
+from .fileinfo import FileInfo, FileTable
+from .fileobj import open_file
+from .instrumentation import Instrumentation, RequestEvent
+from .jsonstream import DEFAULT_CHUNK_SIZE, iter_array
+from .pack import PackReader
+from .pool import SessionPool
+from .retry import RetryPolicy
+from . import segmented
+from .walk import WalkItem, walk
+
+
+def _status_error_message(status_code: int) -> str:
+    """Map an HTTP status code to a generic, user-friendly error message"""
+    if status_code == 404:
+        return "No such file or directory"
+    elif status_code == 403:
+        return "Permission denied"
+    elif status_code == 409:
+        return "Resource already exists"
+    elif status_code == 500:
+        return "Internal server error"
+    elif status_code == 502:
+        return "Bad Gateway - backend service unavailable"
+    return f"HTTP error {status_code}"
 
 
 class AGFSClient:
     """Client for interacting with AGFS (Plugin-based File System) Server API"""
 
-    def __init__(self, api_base_url="http://localhost:8080", timeout=10):
+    def __init__(
+        self,
+        api_base_url="http://localhost:8080",
+        timeout=10,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        pool_block: bool = False,
+        keep_alive: bool = True,
+        session_strategy: str = "shared",
+        metadata_cache: Union[MetadataCache, bool, None] = None,
+        content_cache: Optional[ContentCache] = None,
+        instrumentation: Optional[Any] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+    ):
         """
         Initialize AGFS client.
 
@@ -20,17 +62,147 @@ class AGFSClient:
                          If "/api/v1" is not present, it will be automatically appended.
                          e.g., "http://localhost:8080" or "http://localhost:8080/api/v1"
             timeout: Request timeout in seconds (default: 10)
+            pool_connections: Number of per-host connection pools to cache (default: 10)
+            pool_maxsize: Maximum connections kept alive per host; set it to at least the
+                          number of threads sharing this client (default: 10)
+            pool_block: Treat pool_maxsize as a hard cap on concurrent connections
+                        per host instead of opening throwaway extras (default: False)
+            keep_alive: Reuse connections between requests (default: True)
+            session_strategy: "shared" (one thread-safe pool for all threads) or
+                              "thread_local" (one session per thread) (default: "shared")
+            metadata_cache: Cache stat()/ls() results. Pass a MetadataCache to tune TTLs
+                            and size, or True for defaults (default: None, no caching)
+            content_cache: ContentCache for cat(); cached files are revalidated with
+                           a digest request instead of being re-downloaded (default: None)
+            instrumentation: Instrumentation receiving a RequestEvent at the start and
+                             end of every request, or a single listener such as a
+                             MetricsCollector (default: None, no overhead)
+            retry_policy: RetryPolicy applied to idempotent requests (default: retry
+                          transient failures 3 times with jittered backoff)
+
+        The client is safe to share across threads and survives os.fork():
+        child processes transparently open their own connections.
         """
         api_base_url = api_base_url.rstrip("/")
         # Auto-append /api/v1 if not present
         if not api_base_url.endswith("/api/v1"):
             api_base_url = api_base_url + "/api/v1"
         self.api_base = api_base_url
-        self.session = requests.Session()
         self.timeout = timeout
+        self._pool = SessionPool(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+            keep_alive=keep_alive,
+            strategy=session_strategy,
+        )
+        if metadata_cache is True:
+            metadata_cache = MetadataCache()
+        self.metadata_cache: Optional[MetadataCache] = metadata_cache or None
+        self.content_cache = content_cache
+        # Pack indexes loaded by open_pack(), dropped when the pack changes
+        self._packs: Dict[str, PackReader] = {}
+        if instrumentation is not None and not isinstance(instrumentation, Instrumentation):
+            instrumentation = Instrumentation([instrumentation])
+        self.instrumentation: Optional[Instrumentation] = instrumentation
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self._host = api_base_url.split("://", 1)[-1].split("/", 1)[0]
+
+    @property
+    def session(self) -> requests.Session:
+        """The pooled requests.Session for the calling thread/process"""
+        return self._pool.get()
+
+    def close(self) -> None:
+        """Close all pooled connections"""
+        self._pool.close()
+
+    def __enter__(self) -> "AGFSClient":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def _send(self, operation: str, method: str, endpoint: str, idempotent: Optional[bool] = None,
+              max_retries: Optional[int] = None, **kwargs) -> requests.Response:
+        """Send a request to an API endpoint under the client's retry policy
+
+        Idempotent requests (GETs, digest and grep by default) are retried on
+        transient failures; the final response is returned even if it carries
+        an error status, for the caller to raise.
+        """
+        url = f"{self.api_base}/{endpoint}"
+        if idempotent is None:
+            idempotent = method == "GET" or operation in ("digest", "grep")
+
+        # Request bodies must be replayable to be retried
+        data = kwargs.get("data")
+        rewind_to = None
+        if data is not None and not isinstance(data, (bytes, bytearray)):
+            try:
+                rewind_to = data.tell() if data.seekable() else None
+            except (AttributeError, OSError, ValueError):
+                rewind_to = None
+            if rewind_to is None:
+                idempotent = False
+
+        def attempt() -> requests.Response:
+            if rewind_to is not None:
+                data.seek(rewind_to)
+            return self._attempt(operation, method, endpoint, url, kwargs)
+
+        return self.retry_policy.call(
+            attempt,
+            self._host,
+            operation,
+            idempotent=idempotent,
+            hedgeable=method == "GET" and not kwargs.get("stream"),
+            max_retries=max_retries,
+        )
+
+    def _attempt(self, operation: str, method: str, endpoint: str, url: str, kwargs: Dict[str, Any]) -> requests.Response:
+        """Make one HTTP request, reporting it to the instrumentation hooks"""
+        instrumentation = self.instrumentation
+        if instrumentation is None:
+            return self.session.request(method, url, **kwargs)
+
+        params = kwargs.get("params") or {}
+        body = kwargs.get("json")
+        path = params.get("path") or (body.get("path") if isinstance(body, dict) else None)
+        data = kwargs.get("data")
+        if isinstance(data, (bytes, bytearray)):
+            bytes_out = len(data)
+        elif data is None and body is None:
+            bytes_out = 0
+        else:
+            bytes_out = None
+        event = RequestEvent(operation, method, endpoint, path, bytes_out)
+        instrumentation.request_start(event)
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, url, **kwargs)
+        except Exception as e:
+            event.duration = time.perf_counter() - start
+            event.error = e
+            instrumentation.request_end(event)
+            raise
+        event.duration = time.perf_counter() - start
+        event.status = response.status_code
+        if kwargs.get("stream"):
+            length = response.headers.get("Content-Length")
+            event.bytes_in = int(length) if length and length.isdigit() else None
+        else:
+            event.bytes_in = len(response.content)
+        if body is not None and bytes_out is None:
+            event.bytes_out = len(response.request.body or b"")
+        instrumentation.request_end(event)
+        return response
 
     def _handle_request_error(self, e: Exception, operation: str = "request") -> None:
         """Convert request exceptions to user-friendly error messages"""
+        if isinstance(e, AGFSClientError):
+            # Already user-friendly (e.g. AGFSCircuitOpenError); keep its type
+            raise e
         if isinstance(e, ConnectionError):
             # Extract host and port from the error message
             url_parts = self.api_base.split("://")
@@ -47,7 +219,7 @@ class AGFSClient:
                 status_code = e.response.status_code
                 # Try to get error message from JSON response first (priority)
                 try:
-                    error_data = e.response.json()
+                    error_data = codec.loads(e.response.content)
                     error_msg = error_data.get("error", "")
                     if error_msg:
                         # Use the server's detailed error message
@@ -60,44 +232,161 @@ class AGFSClient:
                     raise
 
                 # Fallback to generic messages based on status codes
-                if status_code == 404:
-                    raise AGFSClientError("No such file or directory")
-                elif status_code == 403:
-                    raise AGFSClientError("Permission denied")
-                elif status_code == 409:
-                    raise AGFSClientError("Resource already exists")
-                elif status_code == 500:
-                    raise AGFSClientError("Internal server error")
-                elif status_code == 502:
-                    raise AGFSClientError("Bad Gateway - backend service unavailable")
-                else:
-                    raise AGFSClientError(f"HTTP error {status_code}")
+                raise AGFSClientError(_status_error_message(status_code))
             else:
                 raise AGFSClientError("HTTP error")
         else:
             # For other exceptions, re-raise with simplified message
             raise AGFSClientError(str(e))
 
+    def _invalidate(self, path: str, recursive: bool = False) -> None:
+        """Drop cached metadata and content affected by a change to path"""
+        if self.metadata_cache is not None:
+            self.metadata_cache.invalidate(path, recursive=recursive)
+        if self.content_cache is not None:
+            self.content_cache.invalidate(path, recursive=recursive)
+        if self._packs:
+            prefix = path.rstrip("/") + "/"
+            for pack_path in list(self._packs):
+                if pack_path == path or (recursive and pack_path.startswith(prefix)):
+                    self._packs.pop(pack_path, None)
+
+    def _raise_and_cache_missing(self, e: Exception, kind: str, path: str) -> None:
+        """Raise the user-friendly error for e, caching it first if it is a 404"""
+        try:
+            self._handle_request_error(e)
+        except AGFSClientError as err:
+            if (
+                self.metadata_cache is not None
+                and isinstance(e, requests.exceptions.HTTPError)
+                and e.response is not None
+                and e.response.status_code == 404
+            ):
+                self.metadata_cache.put(kind, path, str(err), negative=True)
+            raise
+
     def health(self) -> Dict[str, Any]:
         """Check server health"""
-        response = self.session.get(f"{self.api_base}/health", timeout=self.timeout)
+        response = self._send("health", "GET", "health", timeout=self.timeout)
         response.raise_for_status()
-        return response.json()
+        return codec.loads(response.content)
 
-    def ls(self, path: str = "/") -> List[Dict[str, Any]]:
-        """List directory contents"""
+    def ls(self, path: str = "/", typed: bool = False) -> Union[List[Dict[str, Any]], List[FileInfo]]:
+        """List directory contents
+
+        Args:
+            path: Directory path
+            typed: Return FileInfo records instead of dicts (default: False)
+        """
+        if typed:
+            # Built page by page, without a dict list for the whole directory
+            return list(self.iter_ls(path, typed=True))
+        return self._ls(path)
+
+    def ls_table(self, path: str = "/") -> FileTable:
+        """List directory contents as parallel columns
+
+        Much more compact than ls() for directories with many entries.
+
+        Returns:
+            FileTable with names, sizes, modes, is_dir and mod_times columns
+        """
+        return FileTable(self.iter_ls(path))
+
+    def iter_ls(self, path: str = "/", page_size: Optional[int] = None,
+                typed: bool = False) -> Iterator[Union[Dict[str, Any], FileInfo]]:
+        """Iterate over directory contents as they arrive
+
+        Unlike ls(), the response is parsed incrementally, so memory stays
+        flat and the first entry is available before the listing has been
+        fully received, however large the directory is. A listing iterated to
+        the end fills the metadata cache just like ls().
+
+        Args:
+            path: Directory path
+            page_size: Fetch the listing in pages of this many entries, sorted
+                       by name (default: None, one request for the whole directory)
+            typed: Yield FileInfo records instead of dicts (default: False)
+
+        Yields:
+            One entry per file or directory
+
+        Example:
+            >>> for entry in client.iter_ls("/queuefs/jobs", page_size=10000):
+            ...     process(entry["name"])
+        """
+        cache = self.metadata_cache
+        if cache is not None:
+            found, negative, value = cache.get(MetadataCache.LS, path)
+            if found:
+                if negative:
+                    raise AGFSClientError(value)
+                for entry in value:
+                    yield FileInfo.from_dict(entry) if typed else dict(entry)
+                return
+
+        # Once fully consumed, the listing fills the cache like ls() does,
+        # unless it has more entries than the cache could hold anyway
+        listing: Optional[List[Dict[str, Any]]] = None
+        if cache is not None and cache.ttl_for(path) > 0:
+            listing = []
+        cursor = None
+        while True:
+            params = {"path": path}
+            if page_size:
+                params["limit"] = str(page_size)
+            if cursor:
+                params["cursor"] = cursor
+            rest: Dict[str, Any] = {}
+            try:
+                response = self._send("ls", "GET", "directories", params=params, stream=True,
+                                      timeout=self.timeout)
+                # Raised before closing, so the error body can still be read
+                response.raise_for_status()
+                try:
+                    for entry in iter_array(response.iter_content(chunk_size=DEFAULT_CHUNK_SIZE), "files", rest):
+                        if listing is not None:
+                            if len(listing) < cache.max_entries:
+                                listing.append(entry)
+                            else:
+                                listing = None
+                        yield FileInfo.from_dict(entry) if typed else entry
+                finally:
+                    response.close()
+            except Exception as e:
+                self._raise_and_cache_missing(e, MetadataCache.LS, path)
+            # Servers without pagination ignore limit and never send a cursor
+            cursor = rest.get("nextCursor")
+            if not page_size or not cursor:
+                break
+        if listing is not None:
+            cache.put_listing(path, listing)
+
+    def _ls(self, path: str) -> List[Dict[str, Any]]:
+        """List directory contents as dicts, through the metadata cache"""
+        cache = self.metadata_cache
+        if cache is not None:
+            found, negative, value = cache.get(MetadataCache.LS, path)
+            if found:
+                if negative:
+                    raise AGFSClientError(value)
+                return list(value)
         try:
-            response = self.session.get(
-                f"{self.api_base}/directories",
+            response = self._send(
+                "ls", "GET", "directories",
                 params={"path": path},
                 timeout=self.timeout
             )
             response.raise_for_status()
-            data = response.json()
+            data = codec.loads(response.content)
             files = data.get("files")
-            return files if files is not None else []
+            files = files if files is not None else []
         except Exception as e:
-            self._handle_request_error(e)
+            self._raise_and_cache_missing(e, MetadataCache.LS, path)
+        if cache is not None:
+            cache.put_listing(path, files)
+            return list(files)
+        return files
 
     def read(self, path: str, offset: int = 0, size: int = -1, stream: bool = False):
         return self.cat(path, offset, size, stream)
@@ -121,38 +410,229 @@ class AGFSClient:
             if stream:
                 params["stream"] = "true"
                 # Streaming mode - return response object for iteration
-                response = self.session.get(
-                    f"{self.api_base}/files",
+                response = self._send(
+                    "cat", "GET", "files",
                     params=params,
                     stream=True,
                     timeout=None  # No timeout for streaming
                 )
+                manifest = self._segmented_manifest(response, path)
+                if manifest is not None:
+                    return segmented.SegmentedStream(self, path, manifest, offset, size)
                 response.raise_for_status()
                 return response
+            elif self.content_cache is not None and self.content_cache.accepts(path):
+                return self._cached_cat(path, offset, size)
             else:
                 # Normal mode - return content
-                if offset > 0:
-                    params["offset"] = str(offset)
-                if size >= 0:
-                    params["size"] = str(size)
+                return self._get_content(path, offset, size)
+        except Exception as e:
+            self._handle_request_error(e)
 
-                response = self.session.get(
-                    f"{self.api_base}/files",
-                    params=params,
-                    timeout=self.timeout
-                )
-                response.raise_for_status()
-                return response.content
+    def _cached_cat(self, path: str, offset: int, size: int) -> bytes:
+        """Read through the content cache, revalidating with a digest request
+
+        Ranged reads are served from a cached copy when one is valid, but a
+        miss only populates the cache for whole-file reads.
+        """
+        cache = self.content_cache
+        entry = cache.get(path)
+        whole_file = offset <= 0 and size < 0
+        if entry is None and not whole_file:
+            cache.record_miss()
+            return self._get_content(path, offset, size)
+
+        try:
+            # Taken before the download: if the file changes in between, the
+            # stored digest won't match next time and we simply refetch
+            current = self.digest(path, cache.algorithm).get("digest")
+        except AGFSClientError:
+            cache.invalidate(path)
+            if segmented.read_manifest(self, path) is not None:
+                # Segmented files have no server-side digest; read them uncached
+                return self._get_content(path, offset, size)
+            raise
+
+        if entry is not None and entry[0] == current:
+            data = entry[1]
+            cache.record_hit(len(data))
+        else:
+            cache.record_miss(stale=entry is not None)
+            data = self._get_content(path, 0, -1)
+            # Prefer the exact digest of what we downloaded when it's cheap
+            current = try_digest_bytes(data, cache.algorithm) or current
+            cache.put(path, current, data)
+
+        if whole_file:
+            return data
+        end = None if size < 0 else offset + size
+        return data[offset:end]
+
+    def _get_content(self, path: str, offset: int = 0, size: int = -1) -> bytes:
+        """Plain (uncached) read of file content"""
+        params = {"path": path}
+        if offset > 0:
+            params["offset"] = str(offset)
+        if size >= 0:
+            params["size"] = str(size)
+        response = self._send(
+            "cat", "GET", "files",
+            params=params,
+            timeout=self.timeout
+        )
+        manifest = self._segmented_manifest(response, path)
+        if manifest is not None:
+            return segmented.read(self, path, manifest, offset, size)
+        response.raise_for_status()
+        return response.content
+
+    def _segmented_manifest(self, response: requests.Response, path: str) -> Optional[Dict[str, Any]]:
+        """If a request on path failed because it is a segmented file, return its manifest
+
+        Only consulted after a non-404 error, so regular files never pay for it.
+        """
+        if response.status_code < 400 or response.status_code == 404:
+            return None
+        manifest = segmented.read_manifest(self, path)
+        if manifest is not None:
+            response.close()
+        return manifest
+
+    def readinto(self, path: str, buffer, offset: int = 0) -> int:
+        """Read file content directly into a caller-provided buffer
+
+        The response body is streamed straight into buffer (a bytearray,
+        memoryview, mmap or any writable buffer) without building an
+        intermediate bytes object, so reading N bytes needs about N bytes of
+        memory.
+
+        Args:
+            path: File path
+            buffer: Writable buffer; up to len(buffer) bytes are read
+            offset: Starting position in the file (default: 0)
+
+        Returns:
+            Number of bytes read (less than len(buffer) at end of file)
+
+        Example:
+            >>> buf = bytearray(client.stat("/data/big.bin")["size"])
+            >>> n = client.readinto("/data/big.bin", buf)
+        """
+        # Views of buffer must not outlive the call, not even in a traceback:
+        # they would stop the caller from closing or resizing it (e.g. an mmap)
+        with memoryview(buffer).cast("B") as view:
+            if len(view) == 0:
+                return 0
+            try:
+                response = self._open_range(path, offset, len(view))
+                try:
+                    return self._fill(response.raw, view)
+                finally:
+                    response.close()
+            except Exception as e:
+                traceback.clear_frames(e.__traceback__)
+                self._handle_request_error(e)
+
+    def iter_buffers(self, path: str, buffer_size: int = 1024 * 1024, offset: int = 0, size: int = -1) -> Iterator[memoryview]:
+        """Stream a file as memoryviews over one reusable buffer
+
+        Each yielded memoryview is only valid until the next iteration; copy it
+        (bytes(view)) if it must outlive the loop.
+
+        Args:
+            path: File path
+            buffer_size: Size of the reusable buffer in bytes (default: 1 MiB)
+            offset: Starting position in the file (default: 0)
+            size: Number of bytes to read (default: -1, read all)
+
+        Example:
+            >>> with open("/tmp/copy.bin", "wb") as f:
+            ...     for view in client.iter_buffers("/data/big.bin"):
+            ...         f.write(view)
+        """
+        try:
+            # Opened eagerly so errors surface here rather than on first next()
+            response = self._open_range(path, offset, size)
         except Exception as e:
             self._handle_request_error(e)
+        return self._iter_buffers(response, memoryview(bytearray(buffer_size)))
+
+    def _iter_buffers(self, response: requests.Response, view: memoryview) -> Iterator[memoryview]:
+        """Yield filled slices of view until the response body ends"""
+        try:
+            while True:
+                n = self._fill(response.raw, view)
+                if n == 0:
+                    break
+                yield view[:n]
+                if n < len(view):
+                    break
+        finally:
+            response.close()
+
+    def _open_range(self, path: str, offset: int, size: int) -> requests.Response:
+        """Start a ranged GET whose body is read incrementally from response.raw"""
+        params = {"path": path}
+        if offset > 0:
+            params["offset"] = str(offset)
+        if size >= 0:
+            params["size"] = str(size)
+        response = self._send(
+            "cat", "GET", "files",
+            params=params,
+            stream=True,
+            timeout=self.timeout
+        )
+        manifest = self._segmented_manifest(response, path)
+        if manifest is not None:
+            return segmented.SegmentedStream(self, path, manifest, offset, size)
+        response.raise_for_status()
+        return response
 
-    def write(self, path: str, data: Union[bytes, Iterator[bytes], BinaryIO], max_retries: int = 3) -> str:
+    @staticmethod
+    def _fill(raw, view: memoryview, chunk_size: int = 256 * 1024) -> int:
+        """Read from a raw HTTP response until view is full or the body ends"""
+        filled = 0
+        total = len(view)
+        while filled < total:
+            n = raw.readinto(view[filled:min(total, filled + chunk_size)])
+            if not n:
+                break
+            filled += n
+        return filled
+
+    def open(self, path: str, mode: str = "rb", buffering: int = -1, **kwargs):
+        """Open a file for reading as a seekable file object
+
+        Reads are served by ranged GETs with sequential readahead and a small
+        block cache, so only the parts of the file that are touched are
+        transferred.
+
+        Args:
+            path: File path
+            mode: "rb" (default) or "r" for text
+            buffering: 0 for the raw io.RawIOBase object, otherwise the size of
+                       the io.BufferedReader buffer (-1: one block)
+            **kwargs: encoding/errors/newline for text mode, and block_size,
+                      max_readahead, cache_blocks or size for the raw file
+
+        Example:
+            >>> with client.open("/s3/archive.zip") as f:
+            ...     f.seek(-22, io.SEEK_END)
+            ...     end_of_central_dir = f.read(22)
+        """
+        return open_file(self, path, mode, buffering, **kwargs)
+
+    def write(self, path: str, data: Union[bytes, Iterator[bytes], BinaryIO], max_retries: Optional[int] = None) -> str:
         """Write data to file and return the response message
 
         Args:
             path: Path to write the file
             data: File content as bytes, iterator of bytes, or file-like object
-            max_retries: Maximum number of retry attempts (default: 3)
+            max_retries: Override the retry policy's max_retries for this call
+                         (default: None, use the policy). Iterators can't be
+                         replayed and are never retried; seekable files are
+                         rewound before each retry.
 
         Returns:
             Response message from server
@@ -166,101 +646,108 @@ class AGFSClient:
             # For streaming/unknown size, use no timeout
             write_timeout = None
 
-        last_error = None
-
-        for attempt in range(max_retries + 1):
-            try:
-                response = self.session.put(
-                    f"{self.api_base}/files",
+        try:
+            # A full PUT replaces the file, so repeating it is safe
+            response = self._send(
+                "write", "PUT", "files",
+                idempotent=True,
+                max_retries=max_retries,
+                params={"path": path},
+                data=data,  # requests supports bytes, iterator, or file-like object
+                timeout=write_timeout
+            )
+            if isinstance(data, bytes) and self._segmented_manifest(response, path) is not None:
+                # Overwriting a segmented file replaces it with a regular one
+                self.rm(path, recursive=True)
+                response = self._send(
+                    "write", "PUT", "files",
+                    idempotent=True,
+                    max_retries=max_retries,
                     params={"path": path},
-                    data=data,  # requests supports bytes, iterator, or file-like object
+                    data=data,
                     timeout=write_timeout
                 )
-                response.raise_for_status()
-                result = response.json()
-
-                # If we succeeded after retrying, let user know
-                if attempt > 0:
-                    print(f"✓ Upload succeeded after {attempt} retry(ies)")
-
-                return result.get("message", "OK")
-
-            except (ConnectionError, Timeout) as e:
-                # Network errors and timeouts are retryable
-                last_error = e
-
-                if attempt < max_retries:
-                    # Exponential backoff: 1s, 2s, 4s
-                    wait_time = 2 ** attempt
-                    print(f"⚠ Upload failed (attempt {attempt + 1}/{max_retries + 1}): {type(e).__name__}")
-                    print(f"  Retrying in {wait_time} seconds...")
-                    time.sleep(wait_time)
-                else:
-                    # Last attempt failed
-                    print(f"✗ Upload failed after {max_retries + 1} attempts")
-                    self._handle_request_error(e)
-
-            except requests.exceptions.HTTPError as e:
-                # Check if it's a server error (5xx) which might be retryable
-                if hasattr(e, 'response') and e.response is not None:
-                    status_code = e.response.status_code
-
-                    # Only retry specific server errors that indicate temporary issues
-                    # 502 Bad Gateway, 503 Service Unavailable, 504 Gateway Timeout
-                    # Do NOT retry 500 Internal Server Error (usually indicates business logic errors)
-                    retryable_5xx = [502, 503, 504]
-
-                    if status_code in retryable_5xx:
-                        last_error = e
-
-                        if attempt < max_retries:
-                            wait_time = 2 ** attempt
-                            print(f"⚠ Server error {status_code} (attempt {attempt + 1}/{max_retries + 1})")
-                            print(f"  Retrying in {wait_time} seconds...")
-                            time.sleep(wait_time)
-                        else:
-                            print(f"✗ Upload failed after {max_retries + 1} attempts")
-                            self._handle_request_error(e)
-                    else:
-                        # 500 and other errors (including 4xx) are not retryable
-                        # They usually indicate business logic errors or client mistakes
-                        self._handle_request_error(e)
-                else:
-                    self._handle_request_error(e)
+            response.raise_for_status()
+            result = codec.loads(response.content)
+            return result.get("message", "OK")
+        except Exception as e:
+            self._handle_request_error(e)
+        finally:
+            self._invalidate(path)
 
-            except Exception as e:
-                # Other exceptions are not retryable
-                self._handle_request_error(e)
+    def append(self, path: str, data: Union[bytes, Iterator[bytes], BinaryIO], **kwargs) -> int:
+        """Append data to a file
+
+        A regular file is rewritten with the data appended. With convert=True,
+        a file that would grow past a threshold (256 KiB by default) is
+        converted to the segmented format instead: each append writes one new
+        segment plus a small manifest, and reads through this client still see
+        one file, but stat(), ls() and other clients see a directory. Appends
+        to an already segmented file always add a segment. See pyagfs.segmented
+        for the format and its options (segment_threshold, max_segments,
+        background, convert).
+
+        Args:
+            path: File path
+            data: Data to append as bytes, iterator of bytes, or file-like object
+            **kwargs: Passed to pyagfs.segmented.append
+
+        Returns:
+            Number of bytes appended
+
+        Example:
+            >>> for line in lines:
+            ...     client.append("/logs/app.log", line.encode(), convert=True)
+        """
+        try:
+            return segmented.append(self, path, data, **kwargs)
+        finally:
+            self._invalidate(path, recursive=True)
 
-        # Should not reach here, but just in case
-        if last_error:
-            self._handle_request_error(last_error)
+    def compact(self, path: str, full: bool = False) -> bool:
+        """Merge the segments of a segmented file (see append())
+
+        Args:
+            path: Segmented file path
+            full: Merge all segments into one instead of just the trailing run
+
+        Returns:
+            True if segments were merged
+        """
+        try:
+            return segmented.compact(self, path, full=full)
+        finally:
+            self._invalidate(path, recursive=True)
 
     def create(self, path: str) -> Dict[str, Any]:
         """Create a new file"""
         try:
-            response = self.session.post(
-                f"{self.api_base}/files",
+            response = self._send(
+                "create", "POST", "files",
                 params={"path": path},
                 timeout=self.timeout
             )
             response.raise_for_status()
-            return response.json()
+            return codec.loads(response.content)
         except Exception as e:
             self._handle_request_error(e)
+        finally:
+            self._invalidate(path)
 
     def mkdir(self, path: str, mode: str = "755") -> Dict[str, Any]:
         """Create a directory"""
         try:
-            response = self.session.post(
-                f"{self.api_base}/directories",
+            response = self._send(
+                "mkdir", "POST", "directories",
                 params={"path": path, "mode": mode},
                 timeout=self.timeout
             )
             response.raise_for_status()
-            return response.json()
+            return codec.loads(response.content)
         except Exception as e:
             self._handle_request_error(e)
+        finally:
+            self._invalidate(path)
 
     def rm(self, path: str, recursive: bool = False) -> Dict[str, Any]:
         """Remove a file or directory"""
@@ -268,76 +755,115 @@ class AGFSClient:
             params = {"path": path}
             if recursive:
                 params["recursive"] = "true"
-            response = self.session.delete(
-                f"{self.api_base}/files",
+            response = self._send(
+                "rm", "DELETE", "files",
                 params=params,
                 timeout=self.timeout
             )
+            if not recursive and self._segmented_manifest(response, path) is not None:
+                # A segmented file is one file to its users, though stored as a directory
+                recursive = True
+                params["recursive"] = "true"
+                response = self._send(
+                    "rm", "DELETE", "files",
+                    params=params,
+                    timeout=self.timeout
+                )
             response.raise_for_status()
-            return response.json()
+            return codec.loads(response.content)
         except Exception as e:
             self._handle_request_error(e)
+        finally:
+            self._invalidate(path, recursive=recursive)
+
+    def stat(self, path: str, typed: bool = False) -> Union[Dict[str, Any], FileInfo]:
+        """Get file/directory information
 
-    def stat(self, path: str) -> Dict[str, Any]:
-        """Get file/directory information"""
+        Args:
+            path: File or directory path
+            typed: Return a FileInfo record instead of a dict (default: False)
+        """
+        info = self._stat(path)
+        return FileInfo.from_dict(info) if typed else info
+
+    def _stat(self, path: str) -> Dict[str, Any]:
+        """Get file/directory information as a dict, through the metadata cache"""
+        cache = self.metadata_cache
+        if cache is not None:
+            found, negative, value = cache.get(MetadataCache.STAT, path)
+            if found:
+                if negative:
+                    raise AGFSClientError(value)
+                return dict(value)
         try:
-            response = self.session.get(
-                f"{self.api_base}/stat",
+            response = self._send(
+                "stat", "GET", "stat",
                 params={"path": path},
                 timeout=self.timeout
             )
             response.raise_for_status()
-            return response.json()
+            info = codec.loads(response.content)
         except Exception as e:
-            self._handle_request_error(e)
+            self._raise_and_cache_missing(e, MetadataCache.STAT, path)
+        if cache is not None:
+            cache.put(MetadataCache.STAT, path, info)
+            return dict(info)
+        return info
 
     def mv(self, old_path: str, new_path: str) -> Dict[str, Any]:
         """Rename/move a file or directory"""
         try:
-            response = self.session.post(
-                f"{self.api_base}/rename",
+            response = self._send(
+                "mv", "POST", "rename",
                 params={"path": old_path},
                 json={"newPath": new_path},
                 timeout=self.timeout
             )
             response.raise_for_status()
-            return response.json()
+            return codec.loads(response.content)
         except Exception as e:
             self._handle_request_error(e)
+        finally:
+            self._invalidate(old_path, recursive=True)
+            self._invalidate(new_path, recursive=True)
 
     def chmod(self, path: str, mode: int) -> Dict[str, Any]:
         """Change file permissions"""
         try:
-            response = self.session.post(
-                f"{self.api_base}/chmod",
+            response = self._send(
+                "chmod", "POST", "chmod",
                 params={"path": path},
                 json={"mode": mode},
                 timeout=self.timeout
             )
             response.raise_for_status()
-            return response.json()
+            return codec.loads(response.content)
         except Exception as e:
             self._handle_request_error(e)
+        finally:
+            self._invalidate(path)
 
     def touch(self, path: str) -> Dict[str, Any]:
         """Touch a file (update timestamp by writing empty content)"""
         try:
-            response = self.session.post(
-                f"{self.api_base}/touch",
+            response = self._send(
+                "touch", "POST", "touch",
                 params={"path": path},
                 timeout=self.timeout
             )
             response.raise_for_status()
-            return response.json()
+            return codec.loads(response.content)
         except Exception as e:
             self._handle_request_error(e)
+        finally:
+            self._invalidate(path)
 
     def mounts(self) -> List[Dict[str, Any]]:
         """List all mounted plugins"""
         try:
-            response = self.session.get(f"{self.api_base}/mounts", timeout=self.timeout)
+            response = self._send("mounts", "GET", "mounts", timeout=self.timeout)
             response.raise_for_status()
-            data = response.json()
+            data = codec.loads(response.content)
             return data.get("mounts", [])
         except Exception as e:
             self._handle_request_error(e)
@@ -354,28 +880,32 @@ class AGFSClient:
             Response with message
         """
         try:
-            response = self.session.post(
-                f"{self.api_base}/mount",
+            response = self._send(
+                "mount", "POST", "mount",
                 json={"fstype": fstype, "path": path, "config": config},
                 timeout=self.timeout
             )
             response.raise_for_status()
-            return response.json()
+            return codec.loads(response.content)
         except Exception as e:
             self._handle_request_error(e)
+        finally:
+            self._invalidate(path, recursive=True)
 
     def unmount(self, path: str) -> Dict[str, Any]:
         """Unmount a plugin"""
         try:
-            response = self.session.post(
-                f"{self.api_base}/unmount",
+            response = self._send(
+                "unmount", "POST", "unmount",
                 json={"path": path},
                 timeout=self.timeout
             )
             response.raise_for_status()
-            return response.json()
+            return codec.loads(response.content)
         except Exception as e:
             self._handle_request_error(e)
+        finally:
+            self._invalidate(path, recursive=True)
 
     def load_plugin(self, library_path: str) -> Dict[str, Any]:
         """Load an external plugin from a shared library or HTTP(S) URL
@@ -387,13 +917,13 @@ class AGFSClient:
             Response with message and plugin name
         """
         try:
-            response = self.session.post(
-                f"{self.api_base}/plugins/load",
+            response = self._send(
+                "load_plugin", "POST", "plugins/load",
                 json={"library_path": library_path},
                 timeout=self.timeout
             )
             response.raise_for_status()
-            return response.json()
+            return codec.loads(response.content)
         except Exception as e:
             self._handle_request_error(e)
 
@@ -407,13 +937,13 @@ class AGFSClient:
             Response with message
         """
         try:
-            response = self.session.post(
-                f"{self.api_base}/plugins/unload",
+            response = self._send(
+                "unload_plugin", "POST", "plugins/unload",
                 json={"library_path": library_path},
                 timeout=self.timeout
             )
             response.raise_for_status()
-            return response.json()
+            return codec.loads(response.content)
         except Exception as e:
             self._handle_request_error(e)
 
@@ -424,12 +954,12 @@ class AGFSClient:
             List of plugin library paths
         """
         try:
-            response = self.session.get(
-                f"{self.api_base}/plugins",
+            response = self._send(
+                "list_plugins", "GET", "plugins",
                 timeout=self.timeout
             )
             response.raise_for_status()
-            data = response.json()
+            data = codec.loads(response.content)
             return data.get("loaded_plugins", [])
         except Exception as e:
             self._handle_request_error(e)
@@ -461,8 +991,8 @@ class AGFSClient:
             ...         print(f"{item['file']}:{item['line']}: {item['content']}")
         """
         try:
-            response = self.session.post(
-                f"{self.api_base}/grep",
+            response = self._send(
+                "grep", "POST", "grep",
                 json={
                     "path": path,
                     "pattern": pattern,
@@ -480,20 +1010,16 @@ class AGFSClient:
                 return self._parse_ndjson_stream(response)
             else:
                 # Return complete result
-                return response.json()
+                return codec.loads(response.content)
         except Exception as e:
             self._handle_request_error(e)
 
     def _parse_ndjson_stream(self, response):
-        """Parse NDJSON streaming response line by line"""
-        import json
-        for line in response.iter_lines():
-            if line:
-                try:
-                    yield json.loads(line)
-                except json.JSONDecodeError as e:
-                    # Skip malformed lines
-                    continue
+        """Parse NDJSON streaming response line by line, skipping malformed lines"""
+        try:
+            yield from codec.iter_ndjson(response.iter_content(chunk_size=DEFAULT_CHUNK_SIZE))
+        finally:
+            response.close()
 
     def digest(self, path: str, algorithm: str = "xxh3") -> Dict[str, Any]:
         """Calculate the digest of a file using specified algorithm
@@ -515,12 +1041,82 @@ class AGFSClient:
             5d41402abc4b2a76b9719d911017c592
         """
         try:
-            response = self.session.post(
-                f"{self.api_base}/digest",
+            response = self._send(
+                "digest", "POST", "digest",
                 json={"algorithm": algorithm, "path": path},
                 timeout=self.timeout
             )
             response.raise_for_status()
-            return response.json()
+            return codec.loads(response.content)
         except Exception as e:
             self._handle_request_error(e)
+
+    def open_pack(self, path: str) -> PackReader:
+        """Open a pack file (see pyagfs.pack) for random access to its members
+
+        The index is loaded on first use and cached on the client until the
+        pack is written, moved or removed through this client, so listing a
+        pack costs no requests and reading a member costs one ranged read.
+
+        Args:
+            path: Path of the pack file
+
+        Returns:
+            PackReader with names(), ls(), stat(), read() and read_many()
+
+        Example:
+            >>> pack = client.open_pack("/s3/outputs.pack")
+            >>> for entry in pack.ls("run-17"):
+            ...     print(entry["name"], entry["size"])
+            >>> data = pack.read("run-17/result.json")
+        """
+        reader = self._packs.get(path)
+        if reader is None:
+            reader = PackReader(self, path)
+            self._packs[path] = reader
+        return reader
+
+    def batch(self, ops: Sequence[Operation], max_workers: int = DEFAULT_BATCH_WORKERS) -> List[BatchResult]:
+        """Run many operations concurrently and return their results in order
+
+        Args:
+            ops: Operations as tuples or dicts, e.g. ("stat", "/a"),
+                 ("cat", "/a", {"offset": 0, "size": 100}), ("write", "/b", b"data"),
+                 {"op": "rm", "path": "/c", "recursive": True}.
+                 Supported: stat, cat, ls, write, rm, mkdir, touch, create, digest, mv, chmod
+            max_workers: Maximum number of requests in flight (default: 16). Keep
+                         it at or below the client's pool_maxsize.
+
+        Returns:
+            List of BatchResult (ok/value/error); one failure doesn't abort the batch
+
+        Example:
+            >>> results = client.batch([("stat", "/a"), ("cat", "/b"), ("rm", "/c")])
+            >>> [r.ok for r in results]
+            [True, True, False]
+        """
+        return run_batch(self, ops, max_workers=max_workers)
+
+    def stat_many(self, paths: Sequence[str], max_workers: int = DEFAULT_BATCH_WORKERS) -> List[BatchResult]:
+        """stat() many paths concurrently; results are in the order of paths"""
+        return run_batch(self, [("stat", path) for path in paths], max_workers=max_workers)
+
+    def cat_many(self, paths: Sequence[str], max_workers: int = DEFAULT_BATCH_WORKERS) -> List[BatchResult]:
+        """cat() many files concurrently; results are in the order of paths"""
+        return run_batch(self, [("cat", path) for path in paths], max_workers=max_workers)
+
+    def walk(self, path: str = "/", max_depth: Optional[int] = None, concurrency: int = 8,
+             follow_mounts: bool = True, **kwargs) -> Iterator[WalkItem]:
+        """Walk a directory tree, yielding (dirpath, dirs, files) as listings arrive
+
+        Directories are listed breadth-first with up to `concurrency` requests
+        in flight. dirs and files are ls() entry dicts; prune the traversal by
+        removing entries from dirs. See pyagfs.walk.walk for dir_filter,
+        file_filter and onerror.
+
+        Example:
+            >>> for dirpath, dirs, files in client.walk("/s3/data", max_depth=2):
+            ...     print(dirpath, len(files))
+        """
+        return walk(self, path, max_depth=max_depth, concurrency=concurrency,
+                    follow_mounts=follow_mounts, **kwargs)
@@ -0,0 +1,186 @@
+"""Pluggable JSON codec
+
+Directory listings and streamed grep results are CPU-bound on JSON parsing.
+The SDK routes its JSON through the codec chosen here: orjson when it is
+installed (pip install pyagfs[fast]), the standard library otherwise. Input
+orjson refuses but the standard library accepts (NaN, non-string keys) falls
+back to the standard library. The one visible difference is that orjson reads
+integers beyond 64 bits as floats; call set_codec("json") if that matters.
+"""
+
+import json
+from typing import Any, Iterable, Iterator, List, Optional, Union
+
+try:
+    import orjson
+except ImportError:  # orjson is optional (pip install pyagfs[fast])
+    orjson = None
+
+_SKIP = object()
+
+
+def _stdlib_dumps(obj: Any, indent: Optional[int], sort_keys: bool, compact: bool, ensure_ascii: bool) -> str:
+    return json.dumps(obj, indent=indent, sort_keys=sort_keys, ensure_ascii=ensure_ascii,
+                      separators=(",", ":") if compact and not indent else None)
+
+
+class StdlibCodec:
+    """JSON through the standard library's json module"""
+
+    name = "json"
+
+    def loads(self, data: Union[bytes, bytearray, memoryview, str]) -> Any:
+        if isinstance(data, memoryview):
+            data = bytes(data)
+        return json.loads(data)
+
+    def dumps(self, obj: Any, indent: Optional[int] = None, sort_keys: bool = False,
+              compact: bool = False, ensure_ascii: bool = False) -> str:
+        return _stdlib_dumps(obj, indent, sort_keys, compact, ensure_ascii)
+
+    def dumpb(self, obj: Any, indent: Optional[int] = None, sort_keys: bool = False,
+              compact: bool = False, ensure_ascii: bool = False) -> bytes:
+        return _stdlib_dumps(obj, indent, sort_keys, compact, ensure_ascii).encode("utf-8")
+
+
+class OrjsonCodec(StdlibCodec):
+    """JSON through orjson, falling back to the standard library where orjson refuses
+
+    orjson only writes compact or 2-space indented JSON without escaping
+    non-ASCII; other layouts go through the standard library so the output
+    never depends on which codec is installed.
+    """
+
+    name = "orjson"
+
+    def loads(self, data: Union[bytes, bytearray, memoryview, str]) -> Any:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            return super().loads(data)
+
+    def dumps(self, obj: Any, indent: Optional[int] = None, sort_keys: bool = False,
+              compact: bool = False, ensure_ascii: bool = False) -> str:
+        return self.dumpb(obj, indent, sort_keys, compact, ensure_ascii).decode("utf-8")
+
+    def dumpb(self, obj: Any, indent: Optional[int] = None, sort_keys: bool = False,
+              compact: bool = False, ensure_ascii: bool = False) -> bytes:
+        if ensure_ascii or not (indent == 2 or (compact and not indent)):
+            return super().dumpb(obj, indent, sort_keys, compact, ensure_ascii)
+        option = (orjson.OPT_INDENT_2 if indent else 0) | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+        try:
+            return orjson.dumps(obj, option=option)
+        except TypeError:
+            return super().dumpb(obj, indent, sort_keys, compact, ensure_ascii)
+
+
+_codec = OrjsonCodec() if orjson is not None else StdlibCodec()
+
+
+def get_codec() -> StdlibCodec:
+    """Return the codec in use"""
+    return _codec
+
+
+def set_codec(codec: Union[str, StdlibCodec]) -> None:
+    """Choose the codec: "json", "orjson" or an object with loads/dumps/dumpb
+
+    Raises:
+        ImportError: If "orjson" is requested but not installed
+        ValueError: If the name is unknown
+    """
+    global _codec
+    if isinstance(codec, str):
+        if codec == "orjson":
+            if orjson is None:
+                raise ImportError("orjson is not installed. Install it with: pip install pyagfs[fast]")
+            codec = OrjsonCodec()
+        elif codec == "json":
+            codec = StdlibCodec()
+        else:
+            raise ValueError(f"unknown JSON codec: {codec} (supported: json, orjson)")
+    _codec = codec
+
+
+def loads(data: Union[bytes, bytearray, memoryview, str]) -> Any:
+    """Parse JSON from bytes or str"""
+    return _codec.loads(data)
+
+
+def dumps(obj: Any, indent: Optional[int] = None, sort_keys: bool = False,
+          compact: bool = False, ensure_ascii: bool = False) -> str:
+    """Serialize obj to a JSON str
+
+    The layout is json.dumps's (", " and ": " separators unless indented);
+    compact=True drops the spaces. Non-ASCII is kept as is unless ensure_ascii.
+    """
+    return _codec.dumps(obj, indent, sort_keys, compact, ensure_ascii)
+
+
+def dumpb(obj: Any, indent: Optional[int] = None, sort_keys: bool = False,
+          compact: bool = False, ensure_ascii: bool = False) -> bytes:
+    """Serialize obj to UTF-8 encoded JSON bytes (same options as dumps)"""
+    return _codec.dumpb(obj, indent, sort_keys, compact, ensure_ascii)
+
+
+class NDJSONDecoder:
+    """Incremental newline-delimited JSON parser over byte chunks
+
+    Lines are split and parsed as bytes, without decoding the stream to str.
+    feed() returns the values completed by a chunk; close() returns the last
+    value if the stream didn't end with a newline.
+    """
+
+    def __init__(self, skip_invalid: bool = True):
+        self.skip_invalid = skip_invalid
+        self._parts: List[bytes] = []
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        lines = chunk.split(b"\n")
+        if len(lines) == 1:
+            if chunk:
+                self._parts.append(chunk)
+            return []
+        if self._parts:
+            self._parts.append(lines[0])
+            lines[0] = b"".join(self._parts)
+            self._parts = []
+        tail = lines.pop()
+        if tail:
+            self._parts.append(tail)
+        values = []
+        for line in lines:
+            if line.strip():
+                value = self._parse(line)
+                if value is not _SKIP:
+                    values.append(value)
+        return values
+
+    def close(self) -> List[Any]:
+        line = b"".join(self._parts)
+        self._parts = []
+        if not line.strip():
+            return []
+        value = self._parse(line)
+        return [] if value is _SKIP else [value]
+
+    def _parse(self, line: bytes) -> Any:
+        try:
+            return _codec.loads(line)
+        except ValueError:
+            if self.skip_invalid:
+                return _SKIP
+            raise
+
+
+def iter_ndjson(chunks: Iterable[bytes], skip_invalid: bool = True) -> Iterator[Any]:
+    """Parse newline-delimited JSON from a stream of byte chunks
+
+    Args:
+        chunks: e.g. response.iter_content(65536)
+        skip_invalid: Skip lines that aren't valid JSON instead of raising (default: True)
+    """
+    decoder = NDJSONDecoder(skip_invalid)
+    for chunk in chunks:
+        yield from decoder.feed(chunk)
+    yield from decoder.close()
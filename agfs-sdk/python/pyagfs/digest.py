@@ -0,0 +1,73 @@
+"""Local digests compatible with the server's /api/v1/digest endpoint"""
+
+import hashlib
+from typing import Optional
+
+try:
+    import xxhash
+except ImportError:  # xxhash is optional (pip install pyagfs[xxhash])
+    xxhash = None
+
+_LOW_64_BITS = (1 << 64) - 1
+
+
+class _XXH3Hasher:
+    """Incremental XXH3 matching the server: low 64 bits of XXH3-128, hex encoded"""
+
+    def __init__(self):
+        self._hasher = xxhash.xxh3_128()
+
+    def update(self, data: bytes) -> None:
+        self._hasher.update(data)
+
+    def hexdigest(self) -> str:
+        return f"{self._hasher.intdigest() & _LOW_64_BITS:016x}"
+
+
+def local_digest_available(algorithm: str) -> bool:
+    """Return True if digests for algorithm can be computed locally"""
+    if algorithm == "xxh3":
+        return xxhash is not None
+    return algorithm == "md5"
+
+
+def new_hasher(algorithm: str = "xxh3"):
+    """Return an incremental hasher (update()/hexdigest()) for algorithm"""
+    if algorithm == "xxh3":
+        if xxhash is None:
+            raise ImportError("xxh3 digests require xxhash. Install it with: pip install pyagfs[xxhash]")
+        return _XXH3Hasher()
+    if algorithm == "md5":
+        return hashlib.md5()
+    raise ValueError(f"unsupported algorithm: {algorithm} (supported: xxh3, md5)")
+
+
+def digest_bytes(data: bytes, algorithm: str = "xxh3") -> str:
+    """Digest of in-memory data, as the server would report it"""
+    hasher = new_hasher(algorithm)
+    hasher.update(data)
+    return hasher.hexdigest()
+
+
+def digest_file(local_path: str, algorithm: str = "xxh3", chunk_size: int = 1024 * 1024) -> str:
+    """Digest of a local file, read in chunks"""
+    hasher = new_hasher(algorithm)
+    with open(local_path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def preferred_algorithm() -> str:
+    """xxh3 when xxhash is installed, otherwise md5 (both supported by the server)"""
+    return "xxh3" if xxhash is not None else "md5"
+
+
+def try_digest_bytes(data: bytes, algorithm: str) -> Optional[str]:
+    """Digest of data, or None if algorithm can't be computed locally"""
+    if not local_digest_available(algorithm):
+        return None
+    return digest_bytes(data, algorithm)
@@ -22,3 +22,16 @@ class AGFSHTTPError(AGFSClientError):
     def __init__(self, message, status_code=None):
         super().__init__(message)
         self.status_code = status_code
+
+
+class AGFSCircuitOpenError(AGFSConnectionError):
+    """Raised without contacting the server while its circuit breaker is open"""
+    pass
+
+
+class AGFSTransferError(AGFSClientError):
+    """Some files of a recursive cp/upload/download failed; see summary.failures"""
+
+    def __init__(self, message, summary=None):
+        super().__init__(message)
+        self.summary = summary
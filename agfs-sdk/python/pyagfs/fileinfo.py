@@ -0,0 +1,149 @@
+"""Compact, typed records for ls() and stat() results
+
+The server describes every file as a JSON object, which the client hands out
+as a dict per entry. For large listings FileInfo keeps the same information
+in a __slots__ record with normalized fields, and FileTable keeps a whole
+listing as parallel columns for bulk analysis.
+"""
+
+import re
+from array import array
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+_FRACTION = re.compile(r"(\.\d{6})\d+")
+
+
+def parse_mod_time(value: Optional[str]) -> Optional[datetime]:
+    """Parse the server's RFC 3339 modTime, or return None if it is missing or malformed"""
+    if not value:
+        return None
+    # datetime.fromisoformat() before Python 3.11 accepts neither "Z" nor nanoseconds
+    text = _FRACTION.sub(r"\1", value.replace("Z", "+00:00"))
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        return None
+
+
+def _entry_is_dir(entry: Dict[str, Any]) -> bool:
+    return bool(entry.get("isDir", False)) or entry.get("type") == "directory"
+
+
+class FileInfo:
+    """One ls() entry or stat() result
+
+    Attributes:
+        name: File name
+        size: Size in bytes
+        mode: Permission bits as reported by the server
+        is_dir: True for directories
+        mod_time: Modification time as sent by the server (RFC 3339 string)
+        meta: Plugin-specific metadata, or None
+
+    The mtime property parses mod_time on first use.
+    """
+
+    __slots__ = ("name", "size", "mode", "is_dir", "mod_time", "meta", "_mtime")
+
+    def __init__(self, name: str, size: int = 0, mode: int = 0, is_dir: bool = False,
+                 mod_time: str = "", meta: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.size = size
+        self.mode = mode
+        self.is_dir = is_dir
+        self.mod_time = mod_time
+        self.meta = meta
+        self._mtime = None
+
+    @classmethod
+    def from_dict(cls, entry: Dict[str, Any]) -> "FileInfo":
+        """Build a record from the server's JSON representation"""
+        return cls(
+            entry.get("name", ""),
+            entry.get("size") or 0,
+            entry.get("mode") or 0,
+            _entry_is_dir(entry),
+            entry.get("modTime") or "",
+            entry.get("meta") or None,
+        )
+
+    @property
+    def mtime(self) -> Optional[datetime]:
+        """Modification time as a datetime, or None if the server didn't send one"""
+        if self._mtime is None and self.mod_time:
+            self._mtime = parse_mod_time(self.mod_time)
+        return self._mtime
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The server's JSON representation, as returned by ls()/stat() by default"""
+        entry = {"name": self.name, "size": self.size, "mode": self.mode,
+                 "modTime": self.mod_time, "isDir": self.is_dir}
+        if self.meta:
+            entry["meta"] = self.meta
+        return entry
+
+    def __eq__(self, other):
+        if not isinstance(other, FileInfo):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        kind = "dir" if self.is_dir else f"{self.size} bytes"
+        return f"FileInfo({self.name!r}, {kind}, mode={self.mode:o})"
+
+
+class FileTable:
+    """A directory listing stored column by column
+
+    Sizes and modes are kept in typed arrays, and names, modification times
+    and directory flags in one list or bytearray each, which is much smaller
+    than a dict per entry and convenient for bulk analysis:
+
+        >>> table = client.ls_table("/s3/bucket/logs")
+        >>> total = sum(table.sizes)
+        >>> big = [n for n, s in zip(table.names, table.sizes) if s > 1 << 30]
+
+    Attributes:
+        names: File names
+        sizes: array('q') of sizes in bytes
+        modes: array('L') of permission bits
+        is_dir: bytearray, 1 for directories
+        mod_times: Modification times as sent by the server (RFC 3339 strings)
+    """
+
+    __slots__ = ("names", "sizes", "modes", "is_dir", "mod_times")
+
+    def __init__(self, entries: Iterable[Dict[str, Any]] = ()):
+        self.names: List[str] = []
+        self.sizes = array("q")
+        self.modes = array("L")
+        self.is_dir = bytearray()
+        self.mod_times: List[str] = []
+        for entry in entries:
+            self.append(entry)
+
+    def append(self, entry: Dict[str, Any]) -> None:
+        """Add one entry in the server's JSON representation"""
+        self.names.append(entry.get("name", ""))
+        self.sizes.append(entry.get("size") or 0)
+        self.modes.append(entry.get("mode") or 0)
+        self.is_dir.append(_entry_is_dir(entry))
+        self.mod_times.append(entry.get("modTime") or "")
+
+    def mtimes(self) -> List[Optional[datetime]]:
+        """Parse every modification time"""
+        return [parse_mod_time(value) for value in self.mod_times]
+
+    def row(self, i: int) -> FileInfo:
+        """Entry i as a FileInfo"""
+        return FileInfo(self.names[i], self.sizes[i], self.modes[i], bool(self.is_dir[i]), self.mod_times[i])
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __iter__(self) -> Iterator[FileInfo]:
+        return (self.row(i) for i in range(len(self.names)))
+
+    def __repr__(self):
+        return f"FileTable({len(self.names)} entries, {sum(self.is_dir)} directories)"
@@ -0,0 +1,220 @@
+"""Seekable, read-only file objects over AGFS files"""
+
+import io
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Optional
+
+from .segmented import read_manifest
+
+if TYPE_CHECKING:
+    from .client import AGFSClient
+
+DEFAULT_BLOCK_SIZE = 64 * 1024
+DEFAULT_MAX_READAHEAD = 4 * 1024 * 1024
+
+
+class AGFSRawFile(io.RawIOBase):
+    """Read-only raw file object backed by ranged AGFS reads
+
+    Data is fetched in blocks with cat(path, offset, size) and kept in a small
+    LRU block cache, so code that only touches a file's header or footer
+    transfers kilobytes instead of the whole file. While reads stay
+    sequential the readahead window doubles (up to max_readahead) to cut the
+    number of round-trips; a seek elsewhere resets it to one block.
+
+    Usually created through AGFSClient.open():
+        >>> with client.open("/s3/data.parquet", "rb") as f:
+        ...     f.seek(-8, io.SEEK_END)
+        ...     footer = f.read(8)
+    """
+
+    def __init__(
+        self,
+        client: "AGFSClient",
+        path: str,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+        max_readahead: int = DEFAULT_MAX_READAHEAD,
+        cache_blocks: int = 64,
+        size: Optional[int] = None,
+    ):
+        """
+        Open a remote file for reading.
+
+        Args:
+            client: AGFSClient instance
+            path: File path in AGFS
+            block_size: Unit of fetching and caching in bytes (default: 64 KiB)
+            max_readahead: Upper bound of the sequential readahead window (default: 4 MiB)
+            cache_blocks: Number of blocks kept in the LRU block cache (default: 64)
+            size: File size if already known; otherwise it is fetched with stat
+        """
+        super().__init__()
+        self.client = client
+        self.name = path
+        self.block_size = block_size
+        self.max_readahead = max(max_readahead, block_size)
+        self.cache_blocks = max(cache_blocks, self.max_readahead // block_size + 1)
+        if size is None:
+            info = client.stat(path)
+            size = info.get("size", 0)
+            if info.get("isDir", False):
+                # Segmented files are stored as directories; their manifest has the size
+                manifest = read_manifest(client, path)
+                if manifest is None:
+                    raise IsADirectoryError(f"Is a directory: {path}")
+                size = manifest["size"]
+        self.size = size
+        self._pos = 0
+        self._blocks: "OrderedDict[int, bytes]" = OrderedDict()
+        self._readahead = block_size
+        self._next_sequential = 0
+
+    @property
+    def mode(self) -> str:
+        return "rb"
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        self._checkClosed()
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        self._checkClosed()
+        if whence == io.SEEK_SET:
+            pos = offset
+        elif whence == io.SEEK_CUR:
+            pos = self._pos + offset
+        elif whence == io.SEEK_END:
+            pos = self.size + offset
+        else:
+            raise ValueError(f"invalid whence ({whence}, should be 0, 1 or 2)")
+        if pos < 0:
+            raise ValueError(f"negative seek position {pos}")
+        self._pos = pos
+        return pos
+
+    def _fetch(self, block_index: int) -> None:
+        """Fetch block_index plus the current readahead window into the cache"""
+        start = block_index * self.block_size
+        if start == self._next_sequential:
+            self._readahead = min(self._readahead * 2, self.max_readahead)
+        else:
+            self._readahead = self.block_size
+        # Don't refetch blocks that are already cached at the end of the window
+        nblocks = max(1, self._readahead // self.block_size)
+        while nblocks > 1 and (block_index + nblocks - 1) in self._blocks:
+            nblocks -= 1
+        length = min(nblocks * self.block_size, self.size - start)
+        data = self.client.cat(self.name, offset=start, size=length)
+        self._next_sequential = start + len(data)
+
+        for i in range(0, max(len(data), 1), self.block_size):
+            index = block_index + i // self.block_size
+            self._blocks[index] = data[i:i + self.block_size]
+            self._blocks.move_to_end(index)
+        while len(self._blocks) > self.cache_blocks:
+            self._blocks.popitem(last=False)
+
+    def _block(self, block_index: int) -> bytes:
+        block = self._blocks.get(block_index)
+        if block is None:
+            self._fetch(block_index)
+            block = self._blocks.get(block_index, b"")
+        else:
+            self._blocks.move_to_end(block_index)
+        return block
+
+    def readinto(self, b) -> int:
+        self._checkClosed()
+        view = memoryview(b).cast("B")
+        want = min(len(view), max(0, self.size - self._pos))
+        done = 0
+        while done < want:
+            index, within = divmod(self._pos, self.block_size)
+            block = self._block(index)
+            chunk = block[within:within + want - done]
+            if not chunk:
+                # File shrank since we stat'ed it
+                break
+            view[done:done + len(chunk)] = chunk
+            done += len(chunk)
+            self._pos += len(chunk)
+        return done
+
+    def readall(self) -> bytes:
+        self._checkClosed()
+        remaining = max(0, self.size - self._pos)
+        buf = bytearray(remaining)
+        n = self.readinto(buf)
+        del buf[n:]
+        return bytes(buf)
+
+    def readline(self, size: Optional[int] = -1) -> bytes:
+        self._checkClosed()
+        if size is None:
+            size = -1
+        parts = []
+        total = 0
+        while self._pos < self.size and (size < 0 or total < size):
+            index, within = divmod(self._pos, self.block_size)
+            block = self._block(index)
+            end = len(block) if size < 0 else min(len(block), within + size - total)
+            newline = block.find(b"\n", within, end)
+            if newline >= 0:
+                end = newline + 1
+            chunk = block[within:end]
+            if not chunk:
+                break
+            parts.append(chunk)
+            total += len(chunk)
+            self._pos += len(chunk)
+            if newline >= 0:
+                break
+        return b"".join(parts)
+
+    def close(self) -> None:
+        self._blocks.clear()
+        super().close()
+
+
+def open_file(
+    client: "AGFSClient",
+    path: str,
+    mode: str = "rb",
+    buffering: int = -1,
+    encoding: Optional[str] = None,
+    errors: Optional[str] = None,
+    newline: Optional[str] = None,
+    **kwargs,
+):
+    """Open an AGFS file for reading, like the builtin open()
+
+    Args:
+        client: AGFSClient instance
+        path: File path in AGFS
+        mode: "rb" or "r" (text) (default: "rb")
+        buffering: 0 returns the raw AGFSRawFile (binary only), otherwise the
+                   buffer size of the io.BufferedReader (-1: block size)
+        encoding, errors, newline: Passed to io.TextIOWrapper in text mode
+        **kwargs: Passed to AGFSRawFile (block_size, max_readahead, cache_blocks, size)
+
+    Returns:
+        AGFSRawFile, io.BufferedReader or io.TextIOWrapper
+    """
+    if set(mode) - set("rbt") or "r" not in mode or ("b" in mode and "t" in mode):
+        raise ValueError(f"invalid mode '{mode}': AGFS files can only be opened for reading ('rb' or 'r')")
+    binary = "b" in mode
+    raw = AGFSRawFile(client, path, **kwargs)
+    if buffering == 0:
+        if not binary:
+            raise ValueError("can't have unbuffered text I/O")
+        return raw
+    buffered = io.BufferedReader(raw, buffer_size=buffering if buffering > 0 else raw.block_size)
+    if binary:
+        return buffered
+    return io.TextIOWrapper(buffered, encoding=encoding or "utf-8", errors=errors, newline=newline)
@@ -4,17 +4,100 @@ This module provides high-level helper functions for common operations:
 - cp: Copy files/directories within AGFS
 - upload: Upload files/directories from local filesystem to AGFS
 - download: Download files/directories from AGFS to local filesystem
+- parallel_download: Download one large file as concurrent byte ranges
+
+Recursive transfers can run over a worker pool (concurrency=N), report
+aggregated progress and return a TransferSummary.
 """
 
+import mmap
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+from urllib3.exceptions import ProtocolError, ReadTimeoutError
+
+from .exceptions import AGFSClientError, AGFSTransferError
+from .walk import walk
 
 if TYPE_CHECKING:
     from .client import AGFSClient
 
 
-def cp(client: "AGFSClient", src: str, dst: str, recursive: bool = False, stream: bool = False) -> None:
+class TransferProgress:
+    """Aggregated progress of a transfer, passed to progress callbacks
+
+    Attributes:
+        files_done: Files finished so far, including failed ones
+        files_total: Files in the transfer
+        bytes_done: Bytes of successfully transferred files
+        bytes_total: Total size of the files, as far as known up front
+        failed: Files that failed so far
+        elapsed: Seconds since the transfer started
+        path: Source path of the file that just finished
+    """
+
+    __slots__ = ("files_done", "files_total", "bytes_done", "bytes_total", "failed", "elapsed", "path")
+
+    def __init__(self, files_total: int = 0, bytes_total: int = 0):
+        self.files_done = 0
+        self.files_total = files_total
+        self.bytes_done = 0
+        self.bytes_total = bytes_total
+        self.failed = 0
+        self.elapsed = 0.0
+        self.path = None
+
+    @property
+    def bytes_per_sec(self) -> float:
+        return self.bytes_done / self.elapsed if self.elapsed else 0.0
+
+    def __repr__(self):
+        return (f"TransferProgress({self.files_done}/{self.files_total} files, "
+                f"{self.bytes_done}/{self.bytes_total} bytes, {self.failed} failed)")
+
+
+class TransferSummary:
+    """Outcome of cp, upload or download
+
+    Attributes:
+        files: Files transferred successfully
+        directories: Directories created (or found to exist)
+        bytes: Bytes transferred
+        failures: (path, exception) for every file or directory listing that failed
+        elapsed: Seconds the transfer took
+    """
+
+    __slots__ = ("files", "directories", "bytes", "failures", "elapsed")
+
+    def __init__(self):
+        self.files = 0
+        self.directories = 0
+        self.bytes = 0
+        self.failures: List[Tuple[str, Exception]] = []
+        self.elapsed = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return not self.failures
+
+    @property
+    def bytes_per_sec(self) -> float:
+        return self.bytes / self.elapsed if self.elapsed else 0.0
+
+    def __repr__(self):
+        return (f"TransferSummary({self.files} files, {self.directories} directories, {self.bytes} bytes, "
+                f"{len(self.failures)} failures, {self.elapsed:.2f}s)")
+
+
+ProgressCallback = Callable[[TransferProgress], Any]
+
+
+def cp(client: "AGFSClient", src: str, dst: str, recursive: bool = False, stream: bool = False,
+       concurrency: int = 1, progress: Optional[ProgressCallback] = None) -> TransferSummary:
     """Copy a file or directory within AGFS.
 
     Args:
@@ -22,29 +105,45 @@ def cp(client: "AGFSClient", src: str, dst: str, recursive: bool = False, stream
         src: Source path in AGFS
         dst: Destination path in AGFS
         recursive: If True, copy directories recursively
-        stream: If True, use streaming for large files (memory efficient)
+        stream: If True, transfer in STREAM_CHUNK_SIZE chunks without buffering whole
+                files, so files larger than memory can be copied
+        concurrency: Number of files transferred at once in recursive mode (default: 1)
+        progress: Called with a TransferProgress after every finished file
+
+    Returns:
+        TransferSummary of the copy
 
     Raises:
         AGFSClientError: If source doesn't exist or operation fails
+        AGFSTransferError: If some files of a recursive copy failed; the others
+                           are still copied and e.summary lists the failures
 
     Examples:
         >>> client = AGFSClient("http://localhost:8080")
         >>> cp(client, "/file.txt", "/backup/file.txt")  # Copy file
         >>> cp(client, "/dir", "/backup/dir", recursive=True)  # Copy directory
+        >>> cp(client, "/s3/dir", "/local/dir", recursive=True, concurrency=16)
     """
     # Check if source exists and get its type
     src_info = client.stat(src)
     is_dir = src_info.get('isDir', False)
 
+    # Directories created or seen during this copy, shared by all workers
+    known_dirs = _KnownDirectories(client)
+
+    def copy(src_path, dst_path, size):
+        _copy_file(client, src_path, dst_path, stream, known_dirs)
+
     if is_dir:
         if not recursive:
             raise ValueError(f"Cannot copy directory '{src}' without recursive=True")
-        _copy_directory(client, src, dst, stream)
-    else:
-        _copy_file(client, src, dst, stream)
+        levels, files, failures = _plan_remote_tree(client, src, dst, concurrency)
+        return _run_transfer(levels, files, known_dirs.create, copy, concurrency, progress, failures)
+    return _run_transfer([], [(src, dst, src_info.get('size'))], None, copy, 1, progress, single=True)
 
 
-def upload(client: "AGFSClient", local_path: str, remote_path: str, recursive: bool = False, stream: bool = False) -> None:
+def upload(client: "AGFSClient", local_path: str, remote_path: str, recursive: bool = False, stream: bool = False,
+           concurrency: int = 1, progress: Optional[ProgressCallback] = None) -> TransferSummary:
     """Upload a file or directory from local filesystem to AGFS.
 
     Args:
@@ -52,31 +151,56 @@ def upload(client: "AGFSClient", local_path: str, remote_path: str, recursive: b
         local_path: Path to local file or directory
         remote_path: Destination path in AGFS
         recursive: If True, upload directories recursively
-        stream: If True, use streaming for large files (memory efficient)
+        stream: If True, transfer in STREAM_CHUNK_SIZE chunks without buffering whole
+                files, so files larger than memory can be copied
+        concurrency: Number of files transferred at once in recursive mode (default: 1)
+        progress: Called with a TransferProgress after every finished file
+
+    Returns:
+        TransferSummary of the upload
 
     Raises:
         FileNotFoundError: If local path doesn't exist
         AGFSClientError: If upload fails
+        AGFSTransferError: If some files of a recursive upload failed; the others
+                           are still uploaded and e.summary lists the failures
 
     Examples:
         >>> client = AGFSClient("http://localhost:8080")
         >>> upload(client, "/tmp/file.txt", "/remote/file.txt")  # Upload file
         >>> upload(client, "/tmp/data", "/remote/data", recursive=True)  # Upload directory
+        >>> upload(client, "/tmp/data", "/remote/data", recursive=True, concurrency=16,
+        ...        progress=lambda p: print(f"{p.files_done}/{p.files_total} {p.bytes_per_sec:.0f} B/s"))
     """
     local = Path(local_path)
 
     if not local.exists():
         raise FileNotFoundError(f"Local path does not exist: {local_path}")
 
+    # Directories created or seen during this upload, shared by all workers
+    known_dirs = _KnownDirectories(client)
+
+    def copy(local_file, remote_file, size):
+        _upload_file(client, Path(local_file), remote_file, stream, known_dirs)
+
     if local.is_dir():
         if not recursive:
             raise ValueError(f"Cannot upload directory '{local_path}' without recursive=True")
-        _upload_directory(client, local, remote_path, stream)
-    else:
-        _upload_file(client, local, remote_path, stream)
+        levels, files = _plan_local_tree(local, remote_path)
+        return _run_transfer(levels, files, known_dirs.create, copy, concurrency, progress)
+    return _run_transfer([], [(str(local), remote_path, local.stat().st_size)], None, copy, 1, progress,
+                         single=True)
+
+
+DEFAULT_RANGE_SIZE = 8 * 1024 * 1024
 
+# Chunk size used by stream=True transfers; bounds their memory use per file
+STREAM_CHUNK_SIZE = 64 * 1024
 
-def download(client: "AGFSClient", remote_path: str, local_path: str, recursive: bool = False, stream: bool = False) -> None:
+
+def download(client: "AGFSClient", remote_path: str, local_path: str, recursive: bool = False, stream: bool = False,
+             range_concurrency: int = 1, range_size: int = DEFAULT_RANGE_SIZE, concurrency: int = 1,
+             progress: Optional[ProgressCallback] = None) -> TransferSummary:
     """Download a file or directory from AGFS to local filesystem.
 
     Args:
@@ -84,10 +208,21 @@ def download(client: "AGFSClient", remote_path: str, local_path: str, recursive:
         remote_path: Path in AGFS
         local_path: Destination path on local filesystem
         recursive: If True, download directories recursively
-        stream: If True, use streaming for large files (memory efficient)
+        stream: If True, transfer in STREAM_CHUNK_SIZE chunks without buffering whole
+                files, so files larger than memory can be copied
+        range_concurrency: If > 1, files larger than range_size are fetched as
+                           this many concurrent byte ranges (see parallel_download)
+        range_size: Size of each byte range in bytes (default: 8 MiB)
+        concurrency: Number of files transferred at once in recursive mode (default: 1)
+        progress: Called with a TransferProgress after every finished file
+
+    Returns:
+        TransferSummary of the download
 
     Raises:
         AGFSClientError: If remote path doesn't exist or download fails
+        AGFSTransferError: If some files of a recursive download failed; the others
+                           are still downloaded and e.summary lists the failures
 
     Examples:
         >>> client = AGFSClient("http://localhost:8080")
@@ -98,79 +233,185 @@ def download(client: "AGFSClient", remote_path: str, local_path: str, recursive:
     remote_info = client.stat(remote_path)
     is_dir = remote_info.get('isDir', False)
 
+    def copy(remote_file, local_file, size):
+        _download_file(client, remote_file, Path(local_file), stream, range_concurrency, range_size, size=size)
+
     if is_dir:
         if not recursive:
             raise ValueError(f"Cannot download directory '{remote_path}' without recursive=True")
-        _download_directory(client, remote_path, Path(local_path), stream)
-    else:
-        _download_file(client, remote_path, Path(local_path), stream)
+        levels, files, failures = _plan_remote_tree(client, remote_path, local_path, concurrency, local=True)
+        return _run_transfer(levels, files, _make_local_dir, copy, concurrency, progress, failures)
+    return _run_transfer([], [(remote_path, local_path, remote_info.get('size'))], None, copy, 1, progress,
+                         single=True)
+
+
+def parallel_download(client: "AGFSClient", remote_path: str, local_path: str, range_size: int = DEFAULT_RANGE_SIZE,
+                      concurrency: int = 8, max_retries: int = 3, size: Optional[int] = None) -> int:
+    """Download a single file as concurrent byte ranges.
+
+    The file is split into range_size pieces that are fetched with ranged
+    reads (cat with offset/size) over the client's connection pool and written
+    straight into a preallocated, memory-mapped local file at their offset.
+    A failed range is retried on its own without restarting the download.
+    The data lands in "<local_path>.part" and is renamed into place once every
+    range has arrived, so an interrupted download never leaves a truncated file.
+    Failed requests are retried by the client's retry policy; a range whose
+    transfer breaks off midway is fetched again on its own.
+
+    Give the client a pool at least as large as concurrency
+    (AGFSClient(pool_maxsize=...)) to keep every connection alive.
+
+    Args:
+        client: AGFSClient instance
+        remote_path: Path of the file in AGFS
+        local_path: Destination path on local filesystem
+        range_size: Size of each byte range in bytes (default: 8 MiB)
+        concurrency: Number of ranges fetched at once (default: 8)
+        max_retries: Refetches of a range whose transfer broke off midway (default: 3)
+        size: File size if already known; otherwise it is fetched with stat
+
+    Returns:
+        Number of bytes downloaded
+
+    Raises:
+        AGFSClientError: If a range fails for good (missing file, permission
+                         denied, retries exhausted...)
+
+    Examples:
+        >>> client = AGFSClient("http://localhost:8080", pool_maxsize=16)
+        >>> parallel_download(client, "/s3/dump.tar", "/tmp/dump.tar", concurrency=16)
+    """
+    if size is None:
+        size = client.stat(remote_path).get('size', 0)
+    local_file = Path(local_path)
+    local_file.parent.mkdir(parents=True, exist_ok=True)
+    part_file = local_file.with_name(local_file.name + ".part")
+
+    try:
+        with open(part_file, 'w+b') as f:
+            f.truncate(size)
+            if size > 0:
+                with mmap.mmap(f.fileno(), size) as mm:
+                    ranges = [(offset, min(range_size, size - offset)) for offset in range(0, size, range_size)]
+
+                    def fetch(byte_range):
+                        _fetch_range(client, remote_path, mm, byte_range[0], byte_range[1], max_retries)
+
+                    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+                        # list() re-raises the first range that failed for good
+                        list(pool.map(fetch, ranges))
+                    mm.flush()
+        os.replace(part_file, local_file)
+    except BaseException:
+        try:
+            os.remove(part_file)
+        except OSError:
+            pass
+        raise
+    return size
 
 
 # Internal helper functions
 
-def _copy_file(client: "AGFSClient", src: str, dst: str, stream: bool) -> None:
+class _KnownDirectories:
+    """Remote directories known to exist during one transfer (thread-safe mkdir -p).
+
+    Each distinct directory costs at most one stat and one mkdir for the whole
+    operation. Workers needing a directory another worker is already checking
+    or creating wait for it instead of racing it.
+    """
+
+    def __init__(self, client: "AGFSClient"):
+        self.client = client
+        self._known = {'/'}
+        self._in_progress: Dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+
+    def _once(self, path: str, action: Callable[[str], None]) -> None:
+        """Run action(path) unless path is known or another thread is already on it."""
+        with self._lock:
+            if path in self._known:
+                return
+            event = self._in_progress.get(path)
+            owner = event is None
+            if owner:
+                event = self._in_progress[path] = threading.Event()
+        if not owner:
+            event.wait()
+            return
+        try:
+            action(path)
+        finally:
+            with self._lock:
+                self._known.add(path)
+                del self._in_progress[path]
+            event.set()
+
+    def ensure(self, path: str) -> None:
+        """mkdir -p: stat path and create it (and missing ancestors) if needed."""
+        path = path.rstrip('/') or '/'
+        if path not in self._known:
+            self._once(path, self._stat_or_create)
+
+    def create(self, path: str) -> None:
+        """Create a directory whose parent is (made) known, without stat'ing it first."""
+        path = path.rstrip('/') or '/'
+        if path not in self._known:
+            self.ensure(_parent(path))
+            self._once(path, self._mkdir)
+
+    def _stat_or_create(self, path: str) -> None:
+        try:
+            if self.client.stat(path).get('isDir', False):
+                return
+        except Exception:
+            # Directory doesn't exist, need to create it
+            pass
+        self.ensure(_parent(path))
+        self._mkdir(path)
+
+    def _mkdir(self, path: str) -> None:
+        try:
+            self.client.mkdir(path)
+        except Exception:
+            # Might already exist; if not, writing below it reports the error
+            pass
+
+
+def _parent(path: str) -> str:
+    return path.rstrip('/').rsplit('/', 1)[0] or '/'
+
+
+def _copy_file(client: "AGFSClient", src: str, dst: str, stream: bool,
+               known_dirs: Optional[_KnownDirectories] = None) -> None:
     """Copy a single file within AGFS."""
     # Ensure parent directory exists
-    _ensure_remote_parent_dir(client, dst)
+    _ensure_remote_parent_dir(client, dst, known_dirs)
 
     if stream:
-        # Stream the file content for memory efficiency
+        # Pipe the source straight into the upload; memory stays bounded by one chunk
         response = client.cat(src, stream=True)
-        # Read and write in chunks
-        chunk_size = 8192
-        chunks = []
-        for chunk in response.iter_content(chunk_size=chunk_size):
-            chunks.append(chunk)
-        data = b''.join(chunks)
-        client.write(dst, data)
+        try:
+            client.write(dst, response.iter_content(chunk_size=STREAM_CHUNK_SIZE))
+        finally:
+            response.close()
     else:
         # Read entire file and write
         data = client.cat(src)
         client.write(dst, data)
 
 
-def _copy_directory(client: "AGFSClient", src: str, dst: str, stream: bool) -> None:
-    """Recursively copy a directory within AGFS."""
-    # Create destination directory
-    try:
-        client.mkdir(dst)
-    except Exception:
-        # Directory might already exist, continue
-        pass
-
-    # List source directory contents
-    items = client.ls(src)
-
-    for item in items:
-        item_name = item['name']
-        src_path = f"{src.rstrip('/')}/{item_name}"
-        dst_path = f"{dst.rstrip('/')}/{item_name}"
-
-        if item.get('isDir', False):
-            # Recursively copy subdirectory
-            _copy_directory(client, src_path, dst_path, stream)
-        else:
-            # Copy file
-            _copy_file(client, src_path, dst_path, stream)
-
-
-def _upload_file(client: "AGFSClient", local_file: Path, remote_path: str, stream: bool) -> None:
+def _upload_file(client: "AGFSClient", local_file: Path, remote_path: str, stream: bool,
+                 known_dirs: Optional[_KnownDirectories] = None) -> None:
     """Upload a single file to AGFS."""
     # Ensure parent directory exists in AGFS
-    _ensure_remote_parent_dir(client, remote_path)
+    _ensure_remote_parent_dir(client, remote_path, known_dirs)
 
     if stream:
-        # Read file in chunks for memory efficiency
-        chunk_size = 8192
-        chunks = []
+        # Hand the open file to the upload, which reads it in blocks as it sends.
+        # Being seekable, it is rewound if the write has to be retried.
         with open(local_file, 'rb') as f:
-            while True:
-                chunk = f.read(chunk_size)
-                if not chunk:
-                    break
-                chunks.append(chunk)
-        data = b''.join(chunks)
-        client.write(remote_path, data)
+            client.write(remote_path, f)
     else:
         # Read entire file
         with open(local_file, 'rb') as f:
@@ -178,38 +419,52 @@ def _upload_file(client: "AGFSClient", local_file: Path, remote_path: str, strea
         client.write(remote_path, data)
 
 
-def _upload_directory(client: "AGFSClient", local_dir: Path, remote_path: str, stream: bool) -> None:
-    """Recursively upload a directory to AGFS."""
-    # Create remote directory
-    try:
-        client.mkdir(remote_path)
-    except Exception:
-        # Directory might already exist, continue
-        pass
-
-    # Walk through local directory
-    for item in local_dir.iterdir():
-        remote_item_path = f"{remote_path.rstrip('/')}/{item.name}"
-
-        if item.is_dir():
-            # Recursively upload subdirectory
-            _upload_directory(client, item, remote_item_path, stream)
-        else:
-            # Upload file
-            _upload_file(client, item, remote_item_path, stream)
+def _fetch_range(client: "AGFSClient", remote_path: str, mm: mmap.mmap, offset: int, length: int,
+                 max_retries: int) -> None:
+    """Fetch one byte range into the mapped file, refetching just this range if its body breaks off."""
+    delay = None
+    for attempt in range(max_retries + 1):
+        try:
+            # Stream the range straight into the mapped file, no intermediate copy
+            with memoryview(mm)[offset:offset + length] as view:
+                n = client.readinto(remote_path, view, offset=offset)
+        except AGFSClientError as e:
+            # The request itself was already retried by the client's policy;
+            # only a body cut off after a good response is worth another go
+            if attempt >= max_retries or not isinstance(e.__context__, (ProtocolError, ReadTimeoutError)):
+                raise
+            delay = client.retry_policy.next_delay(delay)
+            time.sleep(delay)
+            continue
+        if n != length:
+            raise AGFSClientError(
+                f"Short read at offset {offset}: expected {length} bytes, got {n} "
+                f"(file changed during download?)"
+            )
+        return
 
 
-def _download_file(client: "AGFSClient", remote_path: str, local_file: Path, stream: bool) -> None:
+def _download_file(client: "AGFSClient", remote_path: str, local_file: Path, stream: bool,
+                   range_concurrency: int = 1, range_size: int = DEFAULT_RANGE_SIZE,
+                   size: Optional[int] = None) -> None:
     """Download a single file from AGFS."""
+    if range_concurrency > 1 and size is not None and size > range_size:
+        parallel_download(client, remote_path, str(local_file), range_size=range_size,
+                          concurrency=range_concurrency, size=size)
+        return
+
     # Ensure parent directory exists locally
     local_file.parent.mkdir(parents=True, exist_ok=True)
 
     if stream:
         # Stream the file content
         response = client.cat(remote_path, stream=True)
-        with open(local_file, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
+        try:
+            with open(local_file, 'wb') as f:
+                for chunk in response.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+                    f.write(chunk)
+        finally:
+            response.close()
     else:
         # Read entire file
         data = client.cat(remote_path)
@@ -217,57 +472,150 @@ def _download_file(client: "AGFSClient", remote_path: str, local_file: Path, str
             f.write(data)
 
 
-def _download_directory(client: "AGFSClient", remote_path: str, local_dir: Path, stream: bool) -> None:
-    """Recursively download a directory from AGFS."""
-    # Create local directory
-    local_dir.mkdir(parents=True, exist_ok=True)
-
-    # List remote directory contents
-    items = client.ls(remote_path)
+def _make_local_dir(path: str) -> None:
+    """Create a local directory; failures surface when its files are written."""
+    try:
+        Path(path).mkdir(parents=True, exist_ok=True)
+    except OSError:
+        pass
 
-    for item in items:
-        item_name = item['name']
-        remote_item_path = f"{remote_path.rstrip('/')}/{item_name}"
-        local_item_path = local_dir / item_name
 
-        if item.get('isDir', False):
-            # Recursively download subdirectory
-            _download_directory(client, remote_item_path, local_item_path, stream)
+def _plan_local_tree(local_dir: Path, remote_path: str) -> Tuple[List[List[str]], List[Tuple[str, str, int]]]:
+    """List a local tree as remote directories grouped by depth and (local, remote, size) files."""
+    levels: Dict[int, List[str]] = {}
+    files = []
+    for root, _, filenames in os.walk(local_dir, followlinks=True):
+        rel = os.path.relpath(root, local_dir)
+        if rel == '.':
+            depth, remote_root = 0, remote_path
         else:
-            # Download file
-            _download_file(client, remote_item_path, local_item_path, stream)
-
+            depth = rel.count(os.sep) + 1
+            remote_root = f"{remote_path.rstrip('/')}/{rel.replace(os.sep, '/')}"
+        levels.setdefault(depth, []).append(remote_root)
+        for name in filenames:
+            local_file = os.path.join(root, name)
+            try:
+                size = os.stat(local_file).st_size
+            except OSError:
+                # Broken symlink and the like; the upload reports the error
+                size = 0
+            files.append((local_file, f"{remote_root.rstrip('/')}/{name}", size))
+    return [levels[depth] for depth in sorted(levels)], files
+
+
+def _plan_remote_tree(client: "AGFSClient", src: str, dst: str, concurrency: int, local: bool = False):
+    """List a remote tree (concurrently) as destination directories grouped by depth,
+    (src, dst, size) files and listing failures."""
+    levels: Dict[int, List[str]] = {}
+    files = []
+    failures: List[Tuple[str, Exception]] = []
+    root = src.rstrip('/') or '/'
+
+    def onerror(path, e):
+        failures.append((path, e))
+
+    for dirpath, _, entries in walk(client, root, concurrency=max(1, concurrency), onerror=onerror):
+        rel = dirpath[len(root):].strip('/')
+        depth = rel.count('/') + 1 if rel else 0
+        if local:
+            dst_dir = str(Path(dst, *rel.split('/'))) if rel else dst
+        else:
+            dst_dir = f"{dst.rstrip('/')}/{rel}" if rel else dst
+        levels.setdefault(depth, []).append(dst_dir)
+        for entry in entries:
+            src_file = f"{dirpath.rstrip('/')}/{entry['name']}"
+            dst_file = str(Path(dst_dir, entry['name'])) if local else f"{dst_dir.rstrip('/')}/{entry['name']}"
+            files.append((src_file, dst_file, entry.get('size')))
+    return [levels[depth] for depth in sorted(levels)], files, failures
+
+
+def _run_transfer(levels: List[List[str]], files: List[Tuple[str, str, Optional[int]]],
+                  make_dir: Optional[Callable[[str], None]], copy_file: Callable[[str, str, Optional[int]], None],
+                  concurrency: int, progress: Optional[ProgressCallback],
+                  failures: Optional[List[Tuple[str, Exception]]] = None, single: bool = False) -> TransferSummary:
+    """Create directories level by level, then copy files over a worker pool.
+
+    Every directory of one depth exists before any directory below it is
+    created, and all directories exist before the first file is copied. A
+    failing file is recorded and the rest keep going; AGFSTransferError is
+    raised at the end if anything failed (for single-file transfers the
+    original error is re-raised instead).
+    """
+    start = time.monotonic()
+    summary = TransferSummary()
+    summary.failures.extend(failures or [])
+    state = TransferProgress(len(files), sum(size or 0 for _, _, size in files))
+    state.failed = len(summary.failures)
+    lock = threading.Lock()
+    pool = ThreadPoolExecutor(max_workers=concurrency) if concurrency > 1 else None
+
+    def run(item):
+        src, dst, size = item
+        try:
+            copy_file(src, dst, size)
+            error = None
+        except Exception as e:
+            if single:
+                raise
+            error = e
+        with lock:
+            state.files_done += 1
+            if error is None:
+                summary.files += 1
+                summary.bytes += size or 0
+                state.bytes_done += size or 0
+            else:
+                summary.failures.append((src, error))
+                state.failed += 1
+            state.elapsed = time.monotonic() - start
+            state.path = src
+            # Called under the lock so callbacks see monotonically growing counts
+            if progress is not None:
+                progress(state)
 
-def _ensure_remote_parent_dir(client: "AGFSClient", path: str) -> None:
+    try:
+        for level in levels:
+            if pool is not None and len(level) > 1:
+                list(pool.map(make_dir, level))
+            else:
+                for path in level:
+                    make_dir(path)
+            summary.directories += len(level)
+        if pool is not None:
+            list(pool.map(run, files))
+        else:
+            for item in files:
+                run(item)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    summary.elapsed = time.monotonic() - start
+
+    if summary.failures:
+        details = "; ".join(f"{path}: {e}" for path, e in summary.failures[:3])
+        more = f" (and {len(summary.failures) - 3} more)" if len(summary.failures) > 3 else ""
+        raise AGFSTransferError(
+            f"{len(summary.failures)} of {len(files) + len(failures or [])} transfers failed: {details}{more}",
+            summary
+        )
+    return summary
+
+
+def _ensure_remote_parent_dir(client: "AGFSClient", path: str,
+                              known_dirs: Optional[_KnownDirectories] = None) -> None:
     """Ensure the parent directory exists for a remote path."""
-    parent = '/'.join(path.rstrip('/').split('/')[:-1])
-    if parent and parent != '/':
+    parent = _parent(path)
+    if parent != '/':
         # Try to create parent directory (and its parents)
-        _ensure_remote_dir_recursive(client, parent)
+        _ensure_remote_dir_recursive(client, parent, known_dirs)
 
 
-def _ensure_remote_dir_recursive(client: "AGFSClient", path: str) -> None:
-    """Recursively ensure a directory exists in AGFS."""
-    if not path or path == '/':
-        return
+def _ensure_remote_dir_recursive(client: "AGFSClient", path: str,
+                                 known_dirs: Optional[_KnownDirectories] = None) -> None:
+    """Recursively ensure a directory exists in AGFS.
 
-    # Check if directory already exists
-    try:
-        info = client.stat(path)
-        if info.get('isDir', False):
-            return  # Directory exists
-    except Exception:
-        # Directory doesn't exist, need to create it
-        pass
-
-    # Ensure parent exists first
-    parent = '/'.join(path.rstrip('/').split('/')[:-1])
-    if parent and parent != '/':
-        _ensure_remote_dir_recursive(client, parent)
-
-    # Create this directory
-    try:
-        client.mkdir(path)
-    except Exception:
-        # Might already exist due to race condition, ignore
-        pass
+    Pass the transfer's known_dirs so directories already seen cost nothing.
+    """
+    if known_dirs is None:
+        known_dirs = _KnownDirectories(client)
+    known_dirs.ensure(path)
@@ -0,0 +1,274 @@
+"""Request instrumentation hooks and an in-process metrics collector for AGFSClient"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+
+class RequestEvent:
+    """Describes one HTTP request made by AGFSClient
+
+    Attributes:
+        operation: Client operation, e.g. "cat", "write", "stat"
+        method: HTTP method
+        endpoint: API endpoint below /api/v1, e.g. "files"
+        path: AGFS path the request is about (None for e.g. health or mounts)
+        bytes_out: Request body size in bytes (None if unknown, e.g. streamed uploads)
+        bytes_in: Response body size in bytes (for streamed responses, the
+                  Content-Length if the server sent one)
+        status: HTTP status code (None if no response was received)
+        duration: Seconds from sending the request until the response body was
+                  read (for streamed responses, until the headers arrived)
+        error: Exception raised while sending, if any
+        start_time: time.time() when the request started
+    """
+
+    __slots__ = (
+        "operation", "method", "endpoint", "path", "bytes_out", "bytes_in",
+        "status", "duration", "error", "start_time",
+    )
+
+    def __init__(self, operation: str, method: str, endpoint: str, path: Optional[str] = None,
+                 bytes_out: Optional[int] = None):
+        self.operation = operation
+        self.method = method
+        self.endpoint = endpoint
+        self.path = path
+        self.bytes_out = bytes_out
+        self.bytes_in = None
+        self.status = None
+        self.duration = None
+        self.error = None
+        self.start_time = time.time()
+
+    def __repr__(self):
+        return (f"RequestEvent({self.operation} {self.method} /{self.endpoint} path={self.path!r} "
+                f"status={self.status} duration={self.duration})")
+
+
+class Instrumentation:
+    """Dispatches request start/end events to registered hooks
+
+    A hook is either a callable taking a RequestEvent, registered with
+    add_start_hook()/add_end_hook(), or an object with request_start(event)
+    and/or request_end(event) methods (such as MetricsCollector) passed to the
+    constructor or add_listener(). Exceptions raised by hooks are swallowed so
+    instrumentation can never break a request.
+
+    When a client has no instrumentation configured, no events are built at all.
+
+    Example:
+        >>> metrics = MetricsCollector()
+        >>> inst = Instrumentation([metrics])
+        >>> inst.add_end_hook(lambda e: e.duration > 1 and print("slow:", e))
+        >>> client = AGFSClient("http://localhost:8080", instrumentation=inst)
+    """
+
+    def __init__(self, listeners: Optional[List[Any]] = None):
+        self._start_hooks: List[Callable[[RequestEvent], Any]] = []
+        self._end_hooks: List[Callable[[RequestEvent], Any]] = []
+        for listener in listeners or []:
+            self.add_listener(listener)
+
+    def add_listener(self, listener: Any) -> None:
+        """Register an object's request_start/request_end methods"""
+        if hasattr(listener, "request_start"):
+            self.add_start_hook(listener.request_start)
+        if hasattr(listener, "request_end"):
+            self.add_end_hook(listener.request_end)
+
+    def add_start_hook(self, hook: Callable[[RequestEvent], Any]) -> None:
+        # Copy-on-write so dispatch never needs a lock
+        self._start_hooks = self._start_hooks + [hook]
+
+    def add_end_hook(self, hook: Callable[[RequestEvent], Any]) -> None:
+        self._end_hooks = self._end_hooks + [hook]
+
+    def remove_hook(self, hook: Callable[[RequestEvent], Any]) -> None:
+        self._start_hooks = [h for h in self._start_hooks if h != hook]
+        self._end_hooks = [h for h in self._end_hooks if h != hook]
+
+    def request_start(self, event: RequestEvent) -> None:
+        for hook in self._start_hooks:
+            try:
+                hook(event)
+            except Exception:
+                pass
+
+    def request_end(self, event: RequestEvent) -> None:
+        for hook in self._end_hooks:
+            try:
+                hook(event)
+            except Exception:
+                pass
+
+
+class LatencyHistogram:
+    """HDR-style log-linear histogram of durations
+
+    Values are recorded in microseconds into buckets that keep
+    `significant_bits` significant bits, so every recorded value is off by at
+    most 2 ** -(significant_bits - 1) (about 1.6% with the default of 7),
+    whatever its magnitude. Buckets are sparse, so memory grows with the
+    spread of values, not their count.
+    """
+
+    def __init__(self, significant_bits: int = 7):
+        self.significant_bits = significant_bits
+        self._buckets: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def _bucket(self, micros: int) -> int:
+        shift = micros.bit_length() - self.significant_bits
+        if shift <= 0:
+            return micros
+        return (micros >> shift) << shift
+
+    def record(self, seconds: float) -> None:
+        """Record a duration in seconds"""
+        key = self._bucket(max(0, int(seconds * 1_000_000)))
+        with self._lock:
+            self._buckets[key] = self._buckets.get(key, 0) + 1
+            self.count += 1
+            self.sum += seconds
+            if self.min is None or seconds < self.min:
+                self.min = seconds
+            if self.max is None or seconds > self.max:
+                self.max = seconds
+
+    def percentile(self, p: float) -> float:
+        """Return the p-th percentile (0-100) in seconds, 0.0 if empty"""
+        with self._lock:
+            if not self.count:
+                return 0.0
+            target = max(1, int(round(self.count * p / 100.0)))
+            seen = 0
+            for key in sorted(self._buckets):
+                seen += self._buckets[key]
+                if seen >= target:
+                    shift = max(0, key.bit_length() - self.significant_bits)
+                    # Midpoint of the bucket, clamped to the observed range
+                    value = (key + ((1 << shift) - 1) / 2.0) / 1_000_000
+                    return min(max(value, self.min), self.max)
+            return self.max
+
+    def snapshot(self, percentiles=(50, 90, 95, 99, 99.9)) -> Dict[str, Any]:
+        """Return count, sum, min, max, mean and percentiles (seconds) as a dict"""
+        result = {
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min or 0.0,
+            "max": self.max or 0.0,
+            "mean": self.sum / self.count if self.count else 0.0,
+        }
+        for p in percentiles:
+            result[f"p{p:g}"] = self.percentile(p)
+        return result
+
+
+class _OperationStats:
+    __slots__ = ("latency", "requests", "errors", "bytes_in", "bytes_out", "statuses")
+
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.requests = 0
+        self.errors = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.statuses: Dict[str, int] = {}
+
+
+class MetricsCollector:
+    """In-process per-operation latency histograms and traffic counters
+
+    Example:
+        >>> metrics = MetricsCollector()
+        >>> client = AGFSClient("http://localhost:8080", instrumentation=metrics)
+        >>> client.cat("/file.txt")
+        >>> metrics.snapshot()["cat"]["latency"]["p99"]
+        0.0042
+        >>> print(metrics.to_prometheus())
+    """
+
+    def __init__(self):
+        self._ops: Dict[str, _OperationStats] = {}
+        self._lock = threading.Lock()
+
+    def request_end(self, event: RequestEvent) -> None:
+        stats = self._ops.get(event.operation)
+        if stats is None:
+            with self._lock:
+                stats = self._ops.setdefault(event.operation, _OperationStats())
+        if event.duration is not None:
+            stats.latency.record(event.duration)
+        status = str(event.status) if event.status is not None else "error"
+        with self._lock:
+            stats.requests += 1
+            if event.error is not None or (event.status is not None and event.status >= 400):
+                stats.errors += 1
+            stats.bytes_in += event.bytes_in or 0
+            stats.bytes_out += event.bytes_out or 0
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+
+    def reset(self) -> None:
+        """Drop all collected data"""
+        with self._lock:
+            self._ops = {}
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Return collected metrics as {operation: {...}} dicts"""
+        with self._lock:
+            ops = dict(self._ops)
+        result = {}
+        for name, stats in sorted(ops.items()):
+            latency = stats.latency.snapshot()
+            elapsed = latency["sum"]
+            result[name] = {
+                "requests": stats.requests,
+                "errors": stats.errors,
+                "statuses": dict(stats.statuses),
+                "bytes_in": stats.bytes_in,
+                "bytes_out": stats.bytes_out,
+                "throughput_in": stats.bytes_in / elapsed if elapsed else 0.0,
+                "throughput_out": stats.bytes_out / elapsed if elapsed else 0.0,
+                "latency": latency,
+            }
+        return result
+
+    def to_prometheus(self, prefix: str = "agfs_client") -> str:
+        """Render collected metrics in the Prometheus text exposition format"""
+        snapshot = self.snapshot()
+        lines = [
+            f"# HELP {prefix}_request_duration_seconds AGFS request latency by operation",
+            f"# TYPE {prefix}_request_duration_seconds summary",
+        ]
+        for op, data in snapshot.items():
+            latency = data["latency"]
+            for q in ("50", "90", "95", "99", "99.9"):
+                lines.append(
+                    f'{prefix}_request_duration_seconds{{operation="{op}",quantile="{float(q) / 100:g}"}} '
+                    f'{latency["p" + q]:.6f}'
+                )
+            lines.append(f'{prefix}_request_duration_seconds_sum{{operation="{op}"}} {latency["sum"]:.6f}')
+            lines.append(f'{prefix}_request_duration_seconds_count{{operation="{op}"}} {latency["count"]}')
+
+        counters = [
+            ("requests_total", "AGFS requests by operation and status", None),
+            ("request_errors_total", "Failed AGFS requests by operation", "errors"),
+            ("received_bytes_total", "Response bytes received by operation", "bytes_in"),
+            ("sent_bytes_total", "Request bytes sent by operation", "bytes_out"),
+        ]
+        for name, help_text, key in counters:
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} counter")
+            for op, data in snapshot.items():
+                if key is None:
+                    for status, count in sorted(data["statuses"].items()):
+                        lines.append(f'{prefix}_{name}{{operation="{op}",status="{status}"}} {count}')
+                else:
+                    lines.append(f'{prefix}_{name}{{operation="{op}"}} {data[key]}')
+        return "\n".join(lines) + "\n"
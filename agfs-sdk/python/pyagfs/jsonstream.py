@@ -0,0 +1,111 @@
+"""Incremental parsing of large JSON responses
+
+Directory listings arrive as {"files": [{...}, {...}, ...], ...}. Parsing
+them with response.json() holds the whole body and the whole object graph in
+memory before the first entry can be used. iter_array() instead decodes the
+body chunk by chunk and yields the elements of one top-level array as soon as
+each is complete, so memory stays proportional to a single element.
+"""
+
+import codecs
+import json
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+# Bytes read from the response at a time
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = " \t\n\r"
+_decoder = json.JSONDecoder()
+
+
+class _Scanner:
+    """Text buffer over a byte stream, refilled on demand"""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self) -> None:
+        """Append the next chunk to the buffer, dropping what was consumed"""
+        for chunk in self._chunks:
+            text = self._utf8.decode(chunk)
+            if text:
+                self.buf = self.buf[self.pos:] + text
+                self.pos = 0
+                return
+        self.buf = self.buf[self.pos:] + self._utf8.decode(b"", final=True)
+        self.pos = 0
+        self.eof = True
+
+    def peek(self) -> str:
+        """Next non-whitespace character, or "" at the end of input"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if self.eof:
+                return ""
+            self.fill()
+
+    def expect(self, chars: str) -> str:
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError(f"Malformed JSON: expected one of {chars!r} at {char!r}")
+        self.pos += 1
+        return char
+
+    def value(self) -> Any:
+        """Decode one complete JSON value"""
+        self.peek()
+        while True:
+            try:
+                obj, end = _decoder.raw_decode(self.buf, self.pos)
+                # A number at the very end of the buffer might continue in the next chunk
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return obj
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self.fill()
+
+
+def iter_array(chunks: Iterable[bytes], key: str, rest: Optional[Dict[str, Any]] = None) -> Iterator[Any]:
+    """Yield the elements of the array at key in a streamed JSON object
+
+    Args:
+        chunks: The response body, e.g. response.iter_content(65536)
+        key: Top-level key holding the array; null or a missing key yields nothing
+        rest: If given, the object's other top-level fields are stored in it
+
+    Raises:
+        ValueError: If the body is not a JSON object or key is not an array
+    """
+    scanner = _Scanner(chunks)
+    scanner.expect("{")
+    if scanner.peek() == "}":
+        return
+    while True:
+        name = scanner.value()
+        scanner.expect(":")
+        if name == key and scanner.peek() == "[":
+            scanner.pos += 1
+            if scanner.peek() == "]":
+                scanner.pos += 1
+            else:
+                while True:
+                    yield scanner.value()
+                    if scanner.expect(",]") == "]":
+                        break
+        else:
+            value = scanner.value()
+            if name == key and value is not None:
+                raise ValueError(f"Malformed JSON: {key!r} is not an array")
+            if rest is not None:
+                rest[name] = value
+        if scanner.expect(",}") == "}":
+            return
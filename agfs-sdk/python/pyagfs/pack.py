@@ -0,0 +1,300 @@
+"""Pack many small files into one AGFS object with a random-access index
+
+Listing and reading thousands of tiny files costs one round-trip each. A pack
+stores them back to back in a single object followed by an index, so a
+member costs one small ranged cat(offset, size) and listings come from the
+index instead of ls.
+
+Layout:
+    member data, concatenated in index order
+    index: JSON {"version": 1, "members": {name: [offset, size], ...}}
+    footer (24 bytes): index offset (u64 LE), index length (u64 LE), b"AGFSPAK1"
+"""
+
+import os
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from . import codec
+from .exceptions import AGFSClientError
+from .helpers import _KnownDirectories
+from .walk import walk
+
+if TYPE_CHECKING:
+    from .client import AGFSClient
+
+MAGIC = b"AGFSPAK1"
+_FOOTER = struct.Struct("<QQ8s")
+
+# Read this much of the pack's tail when opening it: usually footer and index in one request
+DEFAULT_TAIL_READ = 64 * 1024
+# Ranged reads of members closer together than this are merged into one request
+DEFAULT_MAX_GAP = 64 * 1024
+
+
+def _is_safe_member_name(name: Any) -> bool:
+    """Whether name is a safe member name: a relative "/"-separated path
+
+    Extraction joins member names onto the destination directory, so names
+    that are absolute, contain empty, "." or ".." components, or contain
+    backslashes (or NUL) could write outside it and are rejected.
+    """
+    if not isinstance(name, str) or not name or name.startswith("/") or "\\" in name or "\0" in name:
+        return False
+    return all(part not in ("", ".", "..") for part in name.split("/"))
+
+
+def build(members: Iterable[Tuple[str, bytes]]) -> Iterator[bytes]:
+    """Yield the bytes of a pack holding members, given as (name, data) pairs
+
+    The pack is produced incrementally, so it can be passed straight to
+    client.write() without holding all members in memory.
+
+    Raises:
+        ValueError: If a name appears twice or is not a safe relative path
+    """
+    offset = 0
+    index: Dict[str, List[int]] = {}
+    for name, data in members:
+        if not _is_safe_member_name(name):
+            raise ValueError(f"invalid pack member name: {name!r}")
+        if name in index:
+            raise ValueError(f"duplicate pack member: {name}")
+        index[name] = [offset, len(data)]
+        offset += len(data)
+        yield data
+    blob = codec.dumpb({"version": 1, "members": index}, compact=True)
+    yield blob
+    yield _FOOTER.pack(offset, len(blob), MAGIC)
+
+
+class PackReader:
+    """Random access to the members of a pack
+
+    The index is loaded once (a stat plus usually one ranged read) and kept,
+    so listings cost no requests and each member read is one ranged cat.
+
+    Usually obtained through AGFSClient.open_pack(), which caches readers:
+        >>> pack = client.open_pack("/s3/results.pack")
+        >>> pack.ls("2024/")
+        >>> pack.read("2024/run-17.json")
+    """
+
+    def __init__(self, client: "AGFSClient", path: str, tail_read: int = DEFAULT_TAIL_READ):
+        self.client = client
+        self.path = path
+        size = client.stat(path).get("size", 0)
+        if size < _FOOTER.size:
+            raise AGFSClientError(f"Not a pack file: {path}")
+        tail_start = max(0, size - max(tail_read, _FOOTER.size))
+        tail = client.cat(path, offset=tail_start, size=size - tail_start)
+        index_offset, index_length, magic = _FOOTER.unpack(tail[-_FOOTER.size:])
+        if magic != MAGIC or index_offset + index_length + _FOOTER.size != size:
+            raise AGFSClientError(f"Not a pack file: {path}")
+        if index_offset >= tail_start:
+            blob = tail[index_offset - tail_start:index_offset - tail_start + index_length]
+        else:
+            blob = client.cat(path, offset=index_offset, size=index_length)
+        try:
+            index = codec.loads(blob)
+        except ValueError:
+            raise AGFSClientError(f"Corrupt pack index: {path}")
+        members = index.get("members", {}) if isinstance(index, dict) else None
+        if not isinstance(members, dict):
+            raise AGFSClientError(f"Corrupt pack index: {path}")
+        self.size = size
+        self.members: Dict[str, Tuple[int, int]] = {}
+        for name, entry in members.items():
+            if not _is_safe_member_name(name):
+                raise AGFSClientError(f"Unsafe member name in pack {path}: {name!r}")
+            if (not isinstance(entry, list) or len(entry) != 2
+                    or not all(isinstance(n, int) and n >= 0 for n in entry)
+                    or entry[0] + entry[1] > index_offset):
+                raise AGFSClientError(f"Corrupt pack index entry in {path}: {name!r}")
+            self.members[name] = (entry[0], entry[1])
+
+    def __len__(self) -> int:
+        return len(self.members)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.members
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.members)
+
+    def names(self) -> List[str]:
+        """All member names, in pack order"""
+        return list(self.members)
+
+    def stat(self, name: str) -> Dict[str, Any]:
+        """Size and offset of a member"""
+        try:
+            offset, size = self.members[name]
+        except KeyError:
+            raise AGFSClientError(f"{self.path}: no such member: {name}")
+        return {"name": name, "size": size, "offset": offset, "isDir": False}
+
+    def ls(self, prefix: str = "") -> List[Dict[str, Any]]:
+        """List the members and sub-directories directly below prefix, like client.ls()"""
+        prefix = prefix.strip("/")
+        if prefix:
+            prefix += "/"
+        files = []
+        dirs = set()
+        for name, (_, size) in self.members.items():
+            if not name.startswith(prefix):
+                continue
+            rest = name[len(prefix):]
+            head, sep, _ = rest.partition("/")
+            if sep:
+                dirs.add(head)
+            else:
+                files.append({"name": rest, "size": size, "isDir": False})
+        return [{"name": d, "size": 0, "isDir": True} for d in sorted(dirs)] + files
+
+    def read(self, name: str) -> bytes:
+        """Read one member with a single ranged request"""
+        offset, size = self.stat(name)["offset"], self.members[name][1]
+        if size == 0:
+            return b""
+        return self.client.cat(self.path, offset=offset, size=size)
+
+    def read_many(self, names: Sequence[str], max_gap: int = DEFAULT_MAX_GAP,
+                  max_workers: int = 16) -> Dict[str, bytes]:
+        """Read several members, merging nearby ranges into fewer requests
+
+        Args:
+            names: Member names
+            max_gap: Ranges at most this many bytes apart share a request (default: 64 KiB)
+            max_workers: Merged ranges fetched at once (default: 16)
+
+        Returns:
+            Dict of name -> content
+        """
+        wanted = sorted({name: self.stat(name)["offset"] for name in names}.items(), key=lambda item: item[1])
+        spans: List[Tuple[int, int, List[str]]] = []
+        for name, offset in wanted:
+            end = offset + self.members[name][1]
+            if spans and offset - spans[-1][1] <= max_gap:
+                start, span_end, span_names = spans[-1]
+                spans[-1] = (start, max(span_end, end), span_names + [name])
+            else:
+                spans.append((offset, end, [name]))
+
+        results: Dict[str, bytes] = {}
+        fetch = [span for span in spans if span[1] > span[0]]
+        datas = [r.unwrap() for r in self.client.batch(
+            [("cat", self.path, {"offset": start, "size": end - start}) for start, end, _ in fetch],
+            max_workers=max_workers,
+        )]
+        for (start, _, span_names), data in zip(fetch, datas):
+            for name in span_names:
+                offset, size = self.members[name]
+                results[name] = data[offset - start:offset - start + size]
+        for name, _ in wanted:
+            results.setdefault(name, b"")
+        return results
+
+
+def _local_members(root: str) -> Iterator[Tuple[str, bytes]]:
+    for dirpath, dirnames, filenames in os.walk(root, followlinks=True):
+        dirnames.sort()
+        rel_dir = os.path.relpath(dirpath, root)
+        for name in sorted(filenames):
+            rel = name if rel_dir == "." else f"{rel_dir.replace(os.sep, '/')}/{name}"
+            with open(os.path.join(dirpath, name), "rb") as f:
+                yield rel, f.read()
+
+
+def _remote_members(client: "AGFSClient", root: str, concurrency: int) -> Iterator[Tuple[str, bytes]]:
+    root = root.rstrip("/") or "/"
+    names = []
+    for dirpath, _, files in walk(client, root, concurrency=concurrency):
+        rel_dir = dirpath[len(root):].strip("/")
+        names.extend(f"{rel_dir}/{entry['name']}" if rel_dir else entry["name"] for entry in files)
+    names.sort()
+    # Fetch ahead in batches so at most a few batches of members are in memory
+    batch_size = max(1, concurrency) * 4
+    for i in range(0, len(names), batch_size):
+        batch = names[i:i + batch_size]
+        results = client.cat_many([f"{root.rstrip('/')}/{name}" for name in batch], max_workers=concurrency)
+        for name, result in zip(batch, results):
+            yield name, result.unwrap()
+
+
+def pack(client: "AGFSClient", src: str, dst: str, local: bool = False, concurrency: int = 16) -> int:
+    """Pack every file below a directory into one pack object
+
+    Args:
+        client: AGFSClient instance
+        src: Directory to pack: an AGFS path, or a local path with local=True
+        dst: AGFS path of the pack to write
+        local: If True, src is on the local filesystem (default: False)
+        concurrency: AGFS reads in flight while collecting members (default: 16)
+
+    Returns:
+        Number of members packed
+
+    Example:
+        >>> pack(client, "/local/agent-outputs", "/s3/archive/outputs.pack")
+    """
+    members = _local_members(src) if local else _remote_members(client, src, concurrency)
+    count = [0]
+
+    def counted():
+        for member in members:
+            count[0] += 1
+            yield member
+
+    client.write(dst, build(counted()))
+    return count[0]
+
+
+def unpack(client: "AGFSClient", src: str, dst: str, local: bool = False, concurrency: int = 16,
+           names: Optional[Sequence[str]] = None) -> int:
+    """Extract members of a pack into a directory
+
+    Args:
+        client: AGFSClient instance
+        src: AGFS path of the pack
+        dst: Destination directory: an AGFS path, or a local path with local=True
+        local: If True, extract to the local filesystem (default: False)
+        concurrency: Reads and writes in flight (default: 16)
+        names: Only extract these members (default: all)
+
+    Returns:
+        Number of members extracted
+
+    Raises:
+        AGFSClientError: If a member name is not a safe relative path
+    """
+    reader = client.open_pack(src)
+    selected = list(names) if names is not None else reader.names()
+    # PackReader already rejects such names; check again right before joining them onto dst
+    for name in selected:
+        if not _is_safe_member_name(name):
+            raise AGFSClientError(f"Unsafe member name in pack {src}: {name!r}")
+    known_dirs = _KnownDirectories(client)
+    lock = threading.Lock()
+
+    def store(item: Tuple[str, bytes]) -> None:
+        name, data = item
+        if local:
+            target = os.path.join(dst, *name.split("/"))
+            with lock:
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+            with open(target, "wb") as f:
+                f.write(data)
+        else:
+            target = f"{dst.rstrip('/')}/{name}"
+            known_dirs.ensure(target.rsplit("/", 1)[0] or "/")
+            client.write(target, data)
+
+    batch_size = max(1, concurrency) * 4
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        for i in range(0, len(selected), batch_size):
+            contents = reader.read_many(selected[i:i + batch_size], max_workers=concurrency)
+            list(pool.map(store, contents.items()))
+    return len(selected)
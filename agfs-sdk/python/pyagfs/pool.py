@@ -0,0 +1,125 @@
+"""HTTP connection pooling for AGFSClient"""
+
+import os
+import threading
+import weakref
+
+import requests
+from requests.adapters import HTTPAdapter
+
+SESSION_STRATEGIES = ("shared", "thread_local")
+
+
+class SessionPool:
+    """Hands out pooled requests.Session objects to an AGFSClient
+
+    Strategies:
+        shared:       one Session (and one urllib3 pool per host) shared by all
+                      threads. urllib3's pool is thread-safe, so this is the
+                      cheapest option once pool_maxsize covers the thread count.
+        thread_local: one Session per thread, so no state at all is shared
+                      between threads.
+
+    The pool is fork-safe: a child process never reuses sockets inherited from
+    its parent. Sessions are rebuilt lazily the first time the child makes a
+    request, detected with a cheap pid comparison on every access.
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        pool_block: bool = False,
+        keep_alive: bool = True,
+        strategy: str = "shared",
+    ):
+        """
+        Initialize a session pool.
+
+        Args:
+            pool_connections: Number of per-host connection pools to cache (default: 10)
+            pool_maxsize: Maximum number of connections kept per host (default: 10)
+            pool_block: If True, pool_maxsize is a hard limit on concurrent connections
+                        per host and extra requests wait for a free connection instead
+                        of opening (and then discarding) a new one (default: False)
+            keep_alive: Reuse connections between requests (default: True)
+            strategy: "shared" or "thread_local" (default: "shared")
+        """
+        if strategy not in SESSION_STRATEGIES:
+            raise ValueError(
+                f"Unknown session strategy '{strategy}', expected one of {SESSION_STRATEGIES}"
+            )
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.keep_alive = keep_alive
+        self.strategy = strategy
+
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._local = threading.local()
+        self._shared = None
+        # Weak so sessions of finished threads can be garbage collected
+        self._sessions = weakref.WeakSet()
+
+    def _new_session(self) -> requests.Session:
+        """Create a Session with an adapter sized to this pool's configuration"""
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            pool_block=self.pool_block,
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        if not self.keep_alive:
+            session.headers["Connection"] = "close"
+        return session
+
+    def _reset_after_fork(self) -> None:
+        """Drop every session inherited from the parent process.
+
+        The inherited sockets are still in use by the parent; reusing them here
+        would interleave two processes' requests on one connection.
+        """
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._shared = None
+        self._sessions = weakref.WeakSet()
+        self._pid = os.getpid()
+
+    def get(self) -> requests.Session:
+        """Return the session the calling thread should use"""
+        if self._pid != os.getpid():
+            self._reset_after_fork()
+
+        if self.strategy == "thread_local":
+            session = getattr(self._local, "session", None)
+            if session is None:
+                session = self._new_session()
+                self._local.session = session
+                with self._lock:
+                    self._sessions.add(session)
+            return session
+
+        session = self._shared
+        if session is None:
+            with self._lock:
+                if self._shared is None:
+                    self._shared = self._new_session()
+                    self._sessions.add(self._shared)
+                session = self._shared
+        return session
+
+    def close(self) -> None:
+        """Close all sessions created by this pool in the current process"""
+        if self._pid != os.getpid():
+            self._reset_after_fork()
+            return
+        with self._lock:
+            sessions = list(self._sessions)
+            self._sessions = weakref.WeakSet()
+            self._shared = None
+            self._local = threading.local()
+        for session in sessions:
+            session.close()
@@ -0,0 +1,354 @@
+"""Retry policy, circuit breaker and hedged requests for AGFSClient and AsyncAGFSClient"""
+
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Callable, Dict, Optional, Sequence
+
+from requests.exceptions import ConnectionError, Timeout
+
+try:
+    import httpx
+except ImportError:  # httpx is only needed by AsyncAGFSClient
+    httpx = None
+
+from .exceptions import AGFSCircuitOpenError
+
+# Exceptions from a request attempt that are worth retrying
+_TRANSIENT_ERRORS = (ConnectionError, Timeout)
+if httpx is not None:
+    _TRANSIENT_ERRORS += (httpx.ConnectError, httpx.TimeoutException)
+
+
+class CircuitBreaker:
+    """Per-host circuit breaker
+
+    After failure_threshold consecutive transient failures (connection errors,
+    timeouts, retryable 5xx) against a host the circuit opens and requests fail
+    immediately with AGFSCircuitOpenError instead of waiting on a dead backend.
+    After reset_timeout seconds one trial request is let through (half-open):
+    success closes the circuit, failure opens it again, and any other outcome
+    (an exception that says nothing about the host) lets the next request be
+    the trial.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        # host -> [state, consecutive failures, opened at, trial in flight]
+        self._hosts: Dict[str, list] = {}
+
+    def state(self, host: str) -> str:
+        with self._lock:
+            return self._hosts.get(host, [self.CLOSED])[0]
+
+    def before_request(self, host: str) -> None:
+        """Raise AGFSCircuitOpenError if requests to host should fail fast"""
+        with self._lock:
+            entry = self._hosts.get(host)
+            if entry is None or entry[0] == self.CLOSED:
+                return
+            if entry[0] == self.OPEN and time.monotonic() - entry[2] >= self.reset_timeout:
+                entry[0] = self.HALF_OPEN
+                entry[3] = False
+            if entry[0] == self.HALF_OPEN and not entry[3]:
+                entry[3] = True
+                return
+            retry_in = max(0.0, self.reset_timeout - (time.monotonic() - entry[2]))
+        raise AGFSCircuitOpenError(
+            f"Circuit open for {host} after repeated failures; retrying in {retry_in:.0f}s"
+        )
+
+    def record_success(self, host: str) -> None:
+        with self._lock:
+            self._hosts.pop(host, None)
+
+    def release_trial(self, host: str) -> None:
+        """End a request that neither succeeded nor failed transiently"""
+        with self._lock:
+            entry = self._hosts.get(host)
+            if entry is not None:
+                entry[3] = False
+
+    def record_failure(self, host: str) -> None:
+        with self._lock:
+            entry = self._hosts.setdefault(host, [self.CLOSED, 0, 0.0, False])
+            entry[1] += 1
+            if entry[0] == self.HALF_OPEN or entry[1] >= self.failure_threshold:
+                entry[0] = self.OPEN
+                entry[2] = time.monotonic()
+                entry[3] = False
+
+
+class RetryPolicy:
+    """Retry policy shared by all idempotent AGFSClient operations
+
+    Transient failures (connection errors, timeouts and the statuses in
+    retry_statuses) are retried up to max_retries times. Sleeps use
+    "decorrelated jitter": each delay is uniform in [base_delay, 3 * previous
+    delay], capped at max_delay, so clients that failed together don't retry in
+    lockstep.
+
+    Optionally:
+      - circuit_breaker fails fast while a host keeps failing
+      - hedge=True sends a duplicate of a slow idempotent GET once it has been
+        outstanding longer than hedge_delay (or, if hedge_delay is None, the
+        hedge_percentile latency observed for that operation) and uses
+        whichever response arrives first
+
+    Example:
+        >>> policy = RetryPolicy(max_retries=5, circuit_breaker=CircuitBreaker(), hedge=True)
+        >>> client = AGFSClient("http://localhost:8080", retry_policy=policy)
+    """
+
+    def __init__(
+        self,
+        max_retries: int = 3,
+        base_delay: float = 0.1,
+        max_delay: float = 10.0,
+        retry_statuses: Sequence[int] = (502, 503, 504),
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        hedge: bool = False,
+        hedge_delay: Optional[float] = None,
+        hedge_percentile: float = 95.0,
+        hedge_min_samples: int = 20,
+        hedge_workers: int = 16,
+    ):
+        """
+        Initialize a retry policy.
+
+        Args:
+            max_retries: Retries after the first attempt; 0 disables retrying (default: 3)
+            base_delay: Minimum delay between attempts in seconds (default: 0.1)
+            max_delay: Maximum delay between attempts in seconds (default: 10.0)
+            retry_statuses: HTTP statuses treated as transient (default: 502, 503, 504).
+                            500 is deliberately excluded: it usually reports a real error.
+            circuit_breaker: Optional per-host CircuitBreaker (default: None)
+            hedge: Send hedged duplicates of slow idempotent reads (default: False)
+            hedge_delay: Fixed hedging delay in seconds; None adapts to observed latency
+            hedge_percentile: Latency percentile used as the adaptive delay (default: 95)
+            hedge_min_samples: Samples needed before adaptive hedging starts (default: 20)
+            hedge_workers: Threads available for hedged requests (default: 16)
+        """
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_statuses = frozenset(retry_statuses)
+        self.circuit_breaker = circuit_breaker
+        self.hedge = hedge
+        self.hedge_delay = hedge_delay
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.hedge_workers = hedge_workers
+        self._latencies: Dict[str, deque] = {}
+        self._lock = threading.Lock()
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    def next_delay(self, previous: Optional[float]) -> float:
+        """Decorrelated jitter: uniform in [base_delay, 3 * previous], capped"""
+        previous = previous or self.base_delay
+        return min(self.max_delay, random.uniform(self.base_delay, previous * 3))
+
+    def is_transient(self, response=None, error: Optional[Exception] = None) -> bool:
+        """Return True if an attempt's outcome is worth retrying"""
+        if error is not None:
+            return isinstance(error, _TRANSIENT_ERRORS)
+        return response is not None and response.status_code in self.retry_statuses
+
+    # Hedging
+
+    def _record_latency(self, operation: str, seconds: float) -> None:
+        window = self._latencies.get(operation)
+        if window is None:
+            with self._lock:
+                window = self._latencies.setdefault(operation, deque(maxlen=256))
+        window.append(seconds)
+
+    def _hedge_after(self, operation: str) -> Optional[float]:
+        if self.hedge_delay is not None:
+            return self.hedge_delay
+        window = self._latencies.get(operation)
+        if window is None or len(window) < self.hedge_min_samples:
+            return None
+        samples = sorted(window)
+        index = min(len(samples) - 1, int(len(samples) * self.hedge_percentile / 100.0))
+        return samples[index]
+
+    def _hedge_pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(
+                        max_workers=self.hedge_workers, thread_name_prefix="agfs-hedge"
+                    )
+        return self._pool
+
+    def _timed(self, operation: str, attempt: Callable):
+        start = time.perf_counter()
+        response = attempt()
+        if not self.is_transient(response=response):
+            self._record_latency(operation, time.perf_counter() - start)
+        return response
+
+    def _hedged(self, operation: str, attempt: Callable):
+        """Run attempt, racing a duplicate against it if it is slower than usual"""
+        delay = self._hedge_after(operation)
+        if delay is None:
+            return self._timed(operation, attempt)
+        pool = self._hedge_pool()
+        primary = pool.submit(self._timed, operation, attempt)
+        try:
+            return primary.result(timeout=delay)
+        except FutureTimeoutError:
+            pass
+        backup = pool.submit(self._timed, operation, attempt)
+        pending = {primary, backup}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None and not self.is_transient(response=future.result()):
+                    return future.result()
+        # Both failed: report the primary's outcome
+        return primary.result()
+
+    # Execution
+
+    def call(self, attempt: Callable, host: str, operation: str, idempotent: bool,
+             hedgeable: bool = False, max_retries: Optional[int] = None):
+        """
+        Run attempt() (one HTTP request returning a response) under this policy.
+
+        Returns the last response, which may still carry an error status for the
+        caller to handle; re-raises the last exception if every attempt raised.
+        """
+        retries = self.max_retries if max_retries is None else max_retries
+        if not idempotent:
+            retries = 0
+        delay = None
+        attempt_no = 0
+        while True:
+            if self.circuit_breaker is not None:
+                self.circuit_breaker.before_request(host)
+            error = response = None
+            try:
+                if hedgeable and self.hedge:
+                    response = self._hedged(operation, attempt)
+                else:
+                    response = self._timed(operation, attempt)
+            except Exception as e:
+                error = e
+            except BaseException:
+                # Interrupted or cancelled: the host's health is unknown
+                if self.circuit_breaker is not None:
+                    self.circuit_breaker.release_trial(host)
+                raise
+
+            transient = self._record_outcome(host, response, error)
+
+            if not transient or attempt_no >= retries:
+                if error is not None:
+                    raise error
+                return response
+
+            if response is not None:
+                response.close()
+            attempt_no += 1
+            delay = self.next_delay(delay)
+            time.sleep(delay)
+
+    def _record_outcome(self, host: str, response, error: Optional[Exception]) -> bool:
+        """Report an attempt to the circuit breaker; return True if it was transient"""
+        transient = self.is_transient(response=response, error=error)
+        breaker = self.circuit_breaker
+        if breaker is not None:
+            if transient:
+                breaker.record_failure(host)
+            elif error is None:
+                breaker.record_success(host)
+            else:
+                breaker.release_trial(host)
+        return transient
+
+    # Asyncio execution (AsyncAGFSClient)
+
+    async def _atimed(self, operation: str, attempt: Callable):
+        start = time.perf_counter()
+        response = await attempt()
+        if not self.is_transient(response=response):
+            self._record_latency(operation, time.perf_counter() - start)
+        return response
+
+    async def _ahedged(self, operation: str, attempt: Callable):
+        """Like _hedged, racing tasks on the running event loop"""
+        delay = self._hedge_after(operation)
+        if delay is None:
+            return await self._atimed(operation, attempt)
+        primary = asyncio.ensure_future(self._atimed(operation, attempt))
+        tasks = [primary]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done:
+                return primary.result()
+            tasks.append(asyncio.ensure_future(self._atimed(operation, attempt)))
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None and not self.is_transient(response=task.result()):
+                        return task.result()
+            # Both failed: report the primary's outcome
+            return primary.result()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def acall(self, attempt: Callable, host: str, operation: str, idempotent: bool,
+                    hedgeable: bool = False, max_retries: Optional[int] = None):
+        """
+        Coroutine version of call(): attempt is a coroutine function making one
+        request, and backoff sleeps don't block the event loop.
+        """
+        retries = self.max_retries if max_retries is None else max_retries
+        if not idempotent:
+            retries = 0
+        delay = None
+        attempt_no = 0
+        while True:
+            if self.circuit_breaker is not None:
+                self.circuit_breaker.before_request(host)
+            error = response = None
+            try:
+                if hedgeable and self.hedge:
+                    response = await self._ahedged(operation, attempt)
+                else:
+                    response = await self._atimed(operation, attempt)
+            except Exception as e:
+                error = e
+            except BaseException:
+                # Interrupted or cancelled: the host's health is unknown
+                if self.circuit_breaker is not None:
+                    self.circuit_breaker.release_trial(host)
+                raise
+
+            transient = self._record_outcome(host, response, error)
+
+            if not transient or attempt_no >= retries:
+                if error is not None:
+                    raise error
+                return response
+
+            if response is not None:
+                await response.aclose()
+            attempt_no += 1
+            delay = self.next_delay(delay)
+            await asyncio.sleep(delay)
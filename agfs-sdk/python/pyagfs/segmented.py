@@ -0,0 +1,391 @@
+"""Append-optimized segmented files
+
+The AGFS API can only replace whole files, so appending to a regular file
+means downloading and re-uploading all of it. A segmented file turns the
+path into a directory holding an ordered log of segment objects plus a
+small manifest:
+
+    /logs/app.log/.agfs-segments    {"format": "agfs-segmented", "segments": [...], ...}
+    /logs/app.log/seg-0000000000
+    /logs/app.log/seg-0000000001
+
+Appending writes one new segment and rewrites the manifest, so its cost
+depends on the appended chunk, not on the file. AGFSClient reads segmented
+files transparently: cat(), readinto(), iter_buffers() and open() see one
+logical file. The check only happens when a plain read of the path fails, so
+regular files pay nothing for it.
+
+The conversion is opt-in (append(..., convert=True)): to stat(), ls(),
+cp/download helpers and other AGFS clients a segmented file is a directory.
+
+Compaction merges the trailing run of segments whose combined size has
+caught up with the segment before them (size-tiered, like an LSM tree), so
+every byte is rewritten O(log n) times and reads touch few segments.
+
+A segmented file must have a single writer at a time; appends and
+compactions from one process are serialized per path.
+"""
+
+import threading
+import weakref
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from . import codec
+from .exceptions import AGFSClientError
+
+if TYPE_CHECKING:
+    from .client import AGFSClient
+
+FORMAT = "agfs-segmented"
+MANIFEST_NAME = ".agfs-segments"
+
+# Appends that keep a regular file below this size just rewrite it
+DEFAULT_SEGMENT_THRESHOLD = 256 * 1024
+# Compaction runs once a file has more segments than this
+DEFAULT_MAX_SEGMENTS = 32
+
+Piece = Tuple[str, int, int]  # segment name, offset within it, length
+
+
+class _PathLock:
+    __slots__ = ("lock", "__weakref__")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+
+
+_locks: "weakref.WeakValueDictionary[Tuple[str, str], _PathLock]" = weakref.WeakValueDictionary()
+_locks_guard = threading.Lock()
+_compactor: Optional[ThreadPoolExecutor] = None
+_pending_compactions = set()
+
+
+def _lock_for(client: "AGFSClient", path: str) -> _PathLock:
+    key = (client.api_base, path)
+    with _locks_guard:
+        lock = _locks.get(key)
+        if lock is None:
+            lock = _locks[key] = _PathLock()
+        return lock
+
+
+def _manifest_path(path: str) -> str:
+    return f"{path.rstrip('/')}/{MANIFEST_NAME}"
+
+
+def _segment_path(path: str, name: str) -> str:
+    return f"{path.rstrip('/')}/{name}"
+
+
+def read_manifest(client: "AGFSClient", path: str) -> Optional[Dict[str, Any]]:
+    """Return the manifest of a segmented file, or None if path isn't one"""
+    try:
+        response = client._send("cat", "GET", "files", params={"path": _manifest_path(path)},
+                                timeout=client.timeout)
+    except Exception:
+        return None
+    if response.status_code != 200:
+        return None
+    try:
+        manifest = codec.loads(response.content)
+    except ValueError:
+        return None
+    if not isinstance(manifest, dict) or manifest.get("format") != FORMAT:
+        return None
+    return manifest
+
+
+def _write_manifest(client: "AGFSClient", path: str, manifest: Dict[str, Any]) -> None:
+    manifest["size"] = sum(segment["size"] for segment in manifest["segments"])
+    client.write(_manifest_path(path), codec.dumpb(manifest, compact=True))
+
+
+def _new_manifest() -> Dict[str, Any]:
+    return {"format": FORMAT, "version": 1, "size": 0, "next": 0, "segments": []}
+
+
+def _locate(manifest: Dict[str, Any], offset: int = 0, size: int = -1) -> List[Piece]:
+    """Map a logical byte range onto (segment, offset, length) pieces"""
+    end = manifest["size"] if size < 0 else min(manifest["size"], offset + size)
+    pieces = []
+    position = 0
+    for segment in manifest["segments"]:
+        seg_start, seg_end = position, position + segment["size"]
+        position = seg_end
+        if seg_end <= offset or segment["size"] == 0:
+            continue
+        if seg_start >= end:
+            break
+        start = max(offset, seg_start)
+        pieces.append((segment["name"], start - seg_start, min(end, seg_end) - start))
+    return pieces
+
+
+def read(client: "AGFSClient", path: str, manifest: Dict[str, Any], offset: int = 0, size: int = -1) -> bytes:
+    """Read a logical byte range, fetching the segments it spans concurrently"""
+    pieces = _locate(manifest, offset, size)
+    if not pieces:
+        return b""
+    results = client.batch([
+        ("cat", _segment_path(path, name), {"offset": start, "size": length})
+        for name, start, length in pieces
+    ])
+    return b"".join(result.unwrap() for result in results)
+
+
+class SegmentedStream:
+    """Streaming reader over a segmented file, shaped like a streamed response
+
+    Supports what AGFSClient hands out for streamed reads: iter_content(),
+    raw.readinto()/raw.read() and close(). One segment is open at a time.
+    """
+
+    status_code = 200
+
+    def __init__(self, client: "AGFSClient", path: str, manifest: Dict[str, Any], offset: int = 0,
+                 size: int = -1):
+        self._client = client
+        self._path = path
+        self._pieces = deque(_locate(manifest, offset, size))
+        self._current = None
+        self.headers = {"Content-Length": str(sum(length for _, _, length in self._pieces))}
+        self.raw = self
+
+    def raise_for_status(self) -> None:
+        pass
+
+    def readinto(self, buffer) -> int:
+        view = memoryview(buffer).cast("B")
+        while True:
+            if self._current is None:
+                if not self._pieces:
+                    return 0
+                name, start, length = self._pieces.popleft()
+                self._current = self._client._open_range(_segment_path(self._path, name), start, length)
+            n = self._current.raw.readinto(view)
+            if n:
+                return n
+            self._current.close()
+            self._current = None
+
+    def read(self, n: int = -1) -> bytes:
+        if n is None or n < 0:
+            chunks = []
+            buffer = bytearray(1024 * 1024)
+            while True:
+                got = self.readinto(buffer)
+                if not got:
+                    return b"".join(chunks)
+                chunks.append(bytes(buffer[:got]))
+        buffer = bytearray(n)
+        got = self.readinto(buffer)
+        return bytes(buffer[:got])
+
+    def iter_content(self, chunk_size: Optional[int] = 1, decode_unicode: bool = False) -> Iterator[bytes]:
+        buffer = bytearray(chunk_size or 64 * 1024)
+        try:
+            while True:
+                n = self.readinto(buffer)
+                if not n:
+                    break
+                yield bytes(buffer[:n])
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        if self._current is not None:
+            self._current.close()
+            self._current = None
+        self._pieces.clear()
+
+
+def _counted(data: Any, counter: List[int]) -> Union[bytes, Iterator[bytes]]:
+    """Pass data through to write() while counting its bytes into counter[0]"""
+    if isinstance(data, (bytes, bytearray)):
+        counter[0] = len(data)
+        return bytes(data)
+
+    def chunks():
+        if hasattr(data, "read"):
+            source = iter(lambda: data.read(1024 * 1024), b"")
+        else:
+            source = data
+        for chunk in source:
+            counter[0] += len(chunk)
+            yield chunk
+
+    return chunks()
+
+
+def _start_segmented(client: "AGFSClient", path: str, data: Any, segment_threshold: int,
+                     convert: bool) -> Union[int, Dict[str, Any]]:
+    """Prepare an append to a path that isn't segmented yet
+
+    Without convert, and for appends that leave a file below
+    segment_threshold, the file is rewritten with the data appended and the
+    number of bytes appended is returned. Otherwise the file becomes the first
+    segment of a new segmented file, whose manifest is returned.
+    """
+    try:
+        info = client.stat(path)
+    except AGFSClientError:
+        info = None
+    if info is not None and info.get("isDir", False):
+        raise AGFSClientError(f"Cannot append to directory: {path}")
+    existing = info.get("size", 0) if info is not None else 0
+    is_bytes = isinstance(data, (bytes, bytearray))
+
+    # The size of streamed data isn't known up front; only the file's counts
+    if not convert or existing + (len(data) if is_bytes else 0) <= segment_threshold:
+        # Read fully before writing: the write replaces the file being read
+        old = client.cat(path) if info is not None else b""
+        if is_bytes:
+            client.write(path, old + bytes(data))
+            return len(data)
+        counter = [0]
+        client.write(path, chain((old,), _counted(data, counter)))
+        return counter[0]
+
+    manifest = _new_manifest()
+    if info is not None:
+        parent, _, name = path.rstrip("/").rpartition("/")
+        staging = f"{parent}/.{name}.agfs-segmenting"
+        client.mv(path, staging)
+        client.mkdir(path)
+        client.mv(staging, _segment_path(path, "seg-0000000000"))
+        manifest["segments"].append({"name": "seg-0000000000", "size": existing})
+        manifest["next"] = 1
+    else:
+        client.mkdir(path)
+    return manifest
+
+
+def append(
+    client: "AGFSClient",
+    path: str,
+    data: Union[bytes, Iterator[bytes], Any],
+    segment_threshold: int = DEFAULT_SEGMENT_THRESHOLD,
+    max_segments: int = DEFAULT_MAX_SEGMENTS,
+    background: bool = True,
+    convert: bool = False,
+) -> int:
+    """Append data to path, adding a segment if it is a segmented file
+
+    A regular file is rewritten with the data appended, unless convert is
+    set and the file would grow past segment_threshold: then it becomes a
+    segmented file, which is a directory to anything but this SDK's readers.
+
+    Args:
+        client: AGFSClient instance
+        path: File path in AGFS
+        data: bytes, iterator of bytes or file-like object
+        segment_threshold: With convert, regular files that stay below this
+                           size are simply rewritten; for streamed data only the
+                           file's current size counts (default: 256 KiB)
+        max_segments: Compact once the file has more segments than this (default: 32)
+        background: Run compaction on a background thread (default: True)
+        convert: Convert a regular file growing past segment_threshold (default: False)
+
+    Returns:
+        Number of bytes appended
+    """
+    lock = _lock_for(client, path)
+    with lock.lock:
+        manifest = read_manifest(client, path)
+        if manifest is None:
+            manifest = _start_segmented(client, path, data, segment_threshold, convert)
+            if isinstance(manifest, int):
+                return manifest
+
+        name = f"seg-{manifest['next']:010d}"
+        counter = [0]
+        client.write(_segment_path(path, name), _counted(data, counter))
+        manifest["segments"].append({"name": name, "size": counter[0]})
+        manifest["next"] += 1
+        _write_manifest(client, path, manifest)
+        needs_compaction = len(manifest["segments"]) > max_segments
+
+    if needs_compaction:
+        if background:
+            _schedule_compaction(client, path)
+        else:
+            compact(client, path)
+    return counter[0]
+
+
+def _compaction_start(segments: List[Dict[str, Any]]) -> int:
+    """Index where the trailing run to merge begins (size-tiered)"""
+    start = len(segments) - 1
+    total = segments[start]["size"]
+    while start > 0 and segments[start - 1]["size"] <= total:
+        start -= 1
+        total += segments[start]["size"]
+    # Always merge at least two segments so compaction makes progress
+    return min(start, len(segments) - 2)
+
+
+def compact(client: "AGFSClient", path: str, full: bool = False) -> bool:
+    """Merge segments of a segmented file
+
+    Args:
+        client: AGFSClient instance
+        path: Segmented file path
+        full: Merge all segments into one instead of just the trailing run
+
+    Returns:
+        True if segments were merged, False if there was nothing to merge
+
+    Raises:
+        AGFSClientError: If path is not a segmented file
+    """
+    lock = _lock_for(client, path)
+    with lock.lock:
+        manifest = read_manifest(client, path)
+        if manifest is None:
+            raise AGFSClientError(f"Not a segmented file: {path}")
+        segments = manifest["segments"]
+        if len(segments) < 2:
+            return False
+        start = 0 if full else _compaction_start(segments)
+        run = segments[start:]
+
+        # Streamed segment to segment, so memory stays bounded whatever the run's size
+        name = f"seg-{manifest['next']:010d}"
+        stream = SegmentedStream(client, path, {"segments": run, "size": sum(s["size"] for s in run)})
+        client.write(_segment_path(path, name), stream.iter_content(1024 * 1024))
+        manifest["segments"] = segments[:start] + [{"name": name, "size": sum(s["size"] for s in run)}]
+        manifest["next"] += 1
+        _write_manifest(client, path, manifest)
+
+        for segment in run:
+            try:
+                client.rm(_segment_path(path, segment["name"]))
+            except AGFSClientError:
+                # An orphaned segment wastes space but is never read
+                pass
+    return True
+
+
+def _schedule_compaction(client: "AGFSClient", path: str) -> None:
+    global _compactor
+    key = (client.api_base, path)
+    with _locks_guard:
+        if key in _pending_compactions:
+            return
+        _pending_compactions.add(key)
+        if _compactor is None:
+            _compactor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="agfs-compact")
+
+    def run():
+        with _locks_guard:
+            _pending_compactions.discard(key)
+        try:
+            compact(client, path)
+        except Exception:
+            # The next append that finds too many segments tries again
+            pass
+
+    _compactor.submit(run)
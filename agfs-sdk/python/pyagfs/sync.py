@@ -0,0 +1,319 @@
+"""Incremental one-way synchronization between a local tree and AGFS"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+from .digest import digest_file, preferred_algorithm
+from .exceptions import AGFSTransferError
+from .helpers import (
+    ProgressCallback,
+    _KnownDirectories,
+    _download_file,
+    _run_transfer,
+    _upload_file,
+)
+from .walk import walk
+
+if TYPE_CHECKING:
+    from .client import AGFSClient
+
+MANIFEST_VERSION = 1
+
+DIRECTIONS = ("push", "pull")
+
+
+class SyncSummary:
+    """Outcome of sync()
+
+    Attributes:
+        transferred: Relative paths of files copied (or to be copied, with dry_run)
+        unchanged: Number of files found identical and skipped
+        deleted: Relative paths removed from the destination (delete=True)
+        bytes: Bytes transferred
+        failures: (path, exception) for every file or listing that failed
+        elapsed: Seconds the sync took
+    """
+
+    __slots__ = ("transferred", "unchanged", "deleted", "bytes", "failures", "elapsed")
+
+    def __init__(self):
+        self.transferred: List[str] = []
+        self.unchanged = 0
+        self.deleted: List[str] = []
+        self.bytes = 0
+        self.failures: List[Tuple[str, Exception]] = []
+        self.elapsed = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return not self.failures
+
+    def __repr__(self):
+        return (f"SyncSummary({len(self.transferred)} transferred, {self.unchanged} unchanged, "
+                f"{len(self.deleted)} deleted, {len(self.failures)} failures, {self.elapsed:.2f}s)")
+
+
+def default_manifest_path(client: "AGFSClient", local: str, remote: str) -> str:
+    """Manifest location for a (server, local, remote) triple under the user cache dir"""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    key = "\n".join([client.api_base, os.path.abspath(local), remote.rstrip("/") or "/"])
+    return os.path.join(cache_home, "pyagfs", "sync", hashlib.sha256(key.encode()).hexdigest() + ".json")
+
+
+def _load_manifest(path: str, local: str, remote: str, algorithm: str) -> Dict[str, Dict[str, Any]]:
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    # A manifest written for another tree or algorithm is useless, not wrong
+    if (data.get("version") != MANIFEST_VERSION or data.get("local") != local
+            or data.get("remote") != remote or data.get("algorithm") != algorithm):
+        return {}
+    return data.get("files", {})
+
+
+def _save_manifest(path: str, local: str, remote: str, algorithm: str, files: Dict[str, Dict[str, Any]]) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump({"version": MANIFEST_VERSION, "local": local, "remote": remote,
+                   "algorithm": algorithm, "files": files}, f)
+    os.replace(tmp, path)
+
+
+def _scan_local(root: str) -> Dict[str, Tuple[int, int]]:
+    """Relative path -> (size, mtime_ns) of every file below root"""
+    result = {}
+    if not os.path.isdir(root):
+        return result
+    for dirpath, _, filenames in os.walk(root, followlinks=True):
+        rel_dir = os.path.relpath(dirpath, root)
+        for name in filenames:
+            full = os.path.join(dirpath, name)
+            try:
+                st = os.stat(full)
+            except OSError:
+                continue
+            rel = name if rel_dir == "." else f"{rel_dir.replace(os.sep, '/')}/{name}"
+            result[rel] = (st.st_size, st.st_mtime_ns)
+    return result
+
+
+def _scan_remote(client: "AGFSClient", root: str, concurrency: int, failures: List[Tuple[str, Exception]],
+                 missing_ok: bool = False) -> Dict[str, Tuple[int, str]]:
+    """Relative path -> (size, modTime) of every file below root, listed concurrently"""
+    result = {}
+
+    def onerror(path, e):
+        # A push destination that doesn't exist yet is simply empty
+        if not (missing_ok and path == root):
+            failures.append((path, e))
+
+    for dirpath, _, files in walk(client, root, concurrency=max(1, concurrency), onerror=onerror):
+        rel_dir = dirpath[len(root):].strip("/")
+        for entry in files:
+            rel = f"{rel_dir}/{entry['name']}" if rel_dir else entry["name"]
+            result[rel] = (entry.get("size", 0), entry.get("modTime", ""))
+    return result
+
+
+def sync(
+    client: "AGFSClient",
+    local: str,
+    remote: str,
+    direction: str = "push",
+    delete: bool = False,
+    concurrency: int = 8,
+    manifest: Optional[str] = None,
+    algorithm: Optional[str] = None,
+    dry_run: bool = False,
+    progress: Optional[ProgressCallback] = None,
+) -> SyncSummary:
+    """Mirror a local directory into AGFS ("push") or an AGFS directory to disk ("pull").
+
+    Only files that changed are transferred. A file is considered unchanged
+    when, in order:
+      1. the manifest from the previous sync still matches its size and
+         mtime on both sides (no network calls for the file at all), or
+      2. both sides have the same size and the local digest equals the
+         server's /api/v1/digest for the remote copy.
+    Everything else is transferred over `concurrency` workers and recorded in
+    the manifest, so the next sync skips it without asking the server.
+
+    Pushes trust the manifest for files that didn't change locally: files
+    changed on the server behind sync's back are not detected until the local
+    copy changes. Use a fresh manifest path to force a full comparison.
+    Only files are mirrored; empty directories are not.
+
+    Args:
+        client: AGFSClient instance
+        local: Local directory
+        remote: AGFS directory
+        direction: "push" (local -> AGFS) or "pull" (AGFS -> local) (default: "push")
+        delete: Remove destination files that don't exist at the source (default: False)
+        concurrency: Number of listings, digests and transfers in flight (default: 8)
+        manifest: Manifest file path (default: one per server/local/remote under ~/.cache/pyagfs/sync)
+        algorithm: Digest algorithm, "xxh3" or "md5" (default: xxh3 if xxhash is installed, else md5)
+        dry_run: Only report what would be transferred or deleted (default: False)
+        progress: Called with a TransferProgress after every transferred file
+
+    Returns:
+        SyncSummary
+
+    Raises:
+        ValueError: If direction is invalid
+        FileNotFoundError: If pushing from a local directory that doesn't exist
+        AGFSTransferError: If some files failed; the rest are synced and recorded
+                           in the manifest, and e.summary is the SyncSummary
+
+    Example:
+        >>> summary = sync(client, "./site", "/s3/www", "push", delete=True)
+        >>> print(summary.transferred, summary.unchanged)
+    """
+    if direction not in DIRECTIONS:
+        raise ValueError(f"invalid direction '{direction}' (expected 'push' or 'pull')")
+    local = os.path.abspath(local)
+    remote = remote.rstrip("/") or "/"
+    if direction == "push" and not os.path.isdir(local):
+        raise FileNotFoundError(f"Local directory does not exist: {local}")
+    algorithm = algorithm or preferred_algorithm()
+    manifest_path = manifest or default_manifest_path(client, local, remote)
+    known = _load_manifest(manifest_path, local, remote, algorithm)
+
+    start = time.monotonic()
+    summary = SyncSummary()
+    local_files = _scan_local(local)
+    # Pulls always need the remote listing; pushes only if something may have changed
+    remote_files: Optional[Dict[str, Tuple[int, str]]] = None
+    if direction == "pull":
+        remote_files = _scan_remote(client, remote, concurrency, summary.failures)
+
+    def remote_path(rel: str) -> str:
+        return f"{remote.rstrip('/')}/{rel}"
+
+    def local_path(rel: str) -> str:
+        return os.path.join(local, *rel.split("/"))
+
+    def unchanged_by_manifest(rel: str) -> bool:
+        entry = known.get(rel)
+        if entry is None or rel not in local_files:
+            return False
+        if (entry.get("size"), entry.get("mtime_ns")) != local_files[rel]:
+            return False
+        if direction == "pull":
+            return [entry.get("remote_size"), entry.get("remote_mtime")] == list(remote_files[rel])
+        return True
+
+    sources = local_files if direction == "push" else remote_files
+    candidates = []
+    new_manifest: Dict[str, Dict[str, Any]] = {}
+    for rel in sorted(sources):
+        if unchanged_by_manifest(rel):
+            new_manifest[rel] = known[rel]
+            summary.unchanged += 1
+        else:
+            candidates.append(rel)
+
+    if direction == "push" and (candidates or delete):
+        remote_files = _scan_remote(client, remote, concurrency, summary.failures, missing_ok=True)
+
+    def manifest_entry(rel: str, digest: Optional[str]) -> Dict[str, Any]:
+        size, mtime_ns = local_files[rel]
+        remote_size, remote_mtime = remote_files.get(rel, (size, ""))
+        return {"size": size, "mtime_ns": mtime_ns, "remote_size": remote_size,
+                "remote_mtime": remote_mtime, "digest": digest}
+
+    # Same size on both sides: compare digests before deciding to transfer
+    def same_content(rel: str) -> Tuple[bool, Optional[str]]:
+        local_digest = digest_file(local_path(rel), algorithm)
+        remote_digest = client.digest(remote_path(rel), algorithm).get("digest")
+        return local_digest == remote_digest, local_digest
+
+    to_compare = [rel for rel in candidates
+                  if rel in local_files and rel in remote_files and local_files[rel][0] == remote_files[rel][0]]
+    compare_set = set(to_compare)
+    to_transfer = [rel for rel in candidates if rel not in compare_set]
+    if to_compare:
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+            results = list(pool.map(lambda rel: _try(same_content, rel), to_compare))
+        for rel, (result, error) in zip(to_compare, results):
+            if error is None and result[0]:
+                new_manifest[rel] = manifest_entry(rel, result[1])
+                summary.unchanged += 1
+            else:
+                to_transfer.append(rel)
+
+    extraneous = []
+    # A failed listing would make everything below it look extraneous
+    if delete and not summary.failures:
+        destination = remote_files if direction == "push" else local_files
+        extraneous = sorted(rel for rel in destination if rel not in sources)
+
+    summary.transferred = sorted(to_transfer)
+    if dry_run:
+        summary.deleted = extraneous
+        summary.elapsed = time.monotonic() - start
+        return summary
+
+    # Transfer
+    lock = threading.Lock()
+    known_dirs = _KnownDirectories(client)
+
+    def copy(rel: str, _dst: str, size: Optional[int]) -> None:
+        if direction == "push":
+            _upload_file(client, Path(local_path(rel)), remote_path(rel), stream=True, known_dirs=known_dirs)
+            size, mtime_ns = local_files[rel]
+            # The new remote modTime is unknown without another request; a later
+            # pull through this manifest verifies such files by digest once
+            entry = {"size": size, "mtime_ns": mtime_ns, "remote_size": size, "remote_mtime": None,
+                     "digest": None}
+        else:
+            _download_file(client, remote_path(rel), Path(local_path(rel)), stream=True)
+            st = os.stat(local_path(rel))
+            remote_size, remote_mtime = remote_files[rel]
+            entry = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "remote_size": remote_size,
+                     "remote_mtime": remote_mtime, "digest": None}
+        with lock:
+            new_manifest[rel] = entry
+
+    files = [(rel, rel, sources[rel][0]) for rel in summary.transferred]
+    try:
+        transfer = _run_transfer([], files, None, copy, concurrency, progress)
+        summary.bytes = transfer.bytes
+    except AGFSTransferError as e:
+        summary.bytes = e.summary.bytes
+        summary.failures.extend(e.summary.failures)
+        failed = {path for path, _ in e.summary.failures}
+        summary.transferred = [rel for rel in summary.transferred if rel not in failed]
+
+    for rel in extraneous:
+        try:
+            if direction == "push":
+                client.rm(remote_path(rel))
+            else:
+                os.remove(local_path(rel))
+            summary.deleted.append(rel)
+        except Exception as e:
+            summary.failures.append((rel, e))
+
+    _save_manifest(manifest_path, local, remote, algorithm, new_manifest)
+    summary.elapsed = time.monotonic() - start
+    if summary.failures:
+        details = "; ".join(f"{path}: {e}" for path, e in summary.failures[:3])
+        more = f" (and {len(summary.failures) - 3} more)" if len(summary.failures) > 3 else ""
+        raise AGFSTransferError(f"sync: {len(summary.failures)} failures: {details}{more}", summary)
+    return summary
+
+
+def _try(fn: Callable, *args) -> Tuple[Any, Optional[Exception]]:
+    try:
+        return fn(*args), None
+    except Exception as e:
+        return None, e
@@ -0,0 +1,105 @@
+"""Concurrent recursive traversal of AGFS directory trees"""
+
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from .client import AGFSClient
+
+Entry = Dict[str, Any]
+WalkItem = Tuple[str, List[Entry], List[Entry]]
+
+
+def _join(parent: str, name: str) -> str:
+    return f"{parent.rstrip('/')}/{name}"
+
+
+def _is_dir(entry: Entry) -> bool:
+    return bool(entry.get("isDir", False)) or entry.get("type") == "directory"
+
+
+def walk(
+    client: "AGFSClient",
+    path: str = "/",
+    max_depth: Optional[int] = None,
+    concurrency: int = 8,
+    follow_mounts: bool = True,
+    dir_filter: Optional[Callable[[str, Entry], bool]] = None,
+    file_filter: Optional[Callable[[str, Entry], bool]] = None,
+    onerror: Optional[Callable[[str, Exception], None]] = None,
+) -> Iterator[WalkItem]:
+    """Walk a directory tree, listing directories concurrently.
+
+    Directories are expanded breadth-first with up to `concurrency` ls()
+    requests in flight, and each (dirpath, dirs, files) tuple is yielded as
+    soon as its listing arrives, so the order between directories is not
+    deterministic. As with os.walk(topdown=True), removing entries from dirs
+    before resuming the generator prunes them from the traversal.
+
+    Args:
+        client: AGFSClient instance
+        path: Root directory (default: "/")
+        max_depth: Deepest level to list; 0 lists only path (default: None, unlimited)
+        concurrency: Maximum number of listings in flight (default: 8)
+        follow_mounts: If False, don't descend into other mount points below path
+        dir_filter: Predicate (dirpath, entry) -> bool; directories failing it are
+                    neither yielded in dirs nor descended into
+        file_filter: Predicate (dirpath, entry) -> bool; files failing it are not yielded
+        onerror: Called with (dirpath, exception) when a listing fails; errors are
+                 ignored by default, like os.walk
+
+    Yields:
+        (dirpath, dirs, files) where dirs and files are ls() entry dicts
+
+    Example:
+        >>> for dirpath, dirs, files in client.walk("/s3/logs", concurrency=16):
+        ...     dirs[:] = [d for d in dirs if not d["name"].startswith(".")]
+        ...     for f in files:
+        ...         print(f"{dirpath}/{f['name']}", f["size"])
+    """
+    root = path.rstrip("/") or "/"
+    mount_points = set()
+    if not follow_mounts:
+        try:
+            mount_points = {m.get("path", "").rstrip("/") for m in client.mounts()}
+        except Exception as e:
+            if onerror is not None:
+                onerror(root, e)
+        mount_points.discard(root.rstrip("/"))
+
+    pending = deque([(root, 0)])
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        in_flight = {}
+        while pending or in_flight:
+            while pending and len(in_flight) < max(1, concurrency):
+                dirpath, depth = pending.popleft()
+                in_flight[pool.submit(client.ls, dirpath)] = (dirpath, depth)
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                dirpath, depth = in_flight.pop(future)
+                try:
+                    entries = future.result()
+                except Exception as e:
+                    if onerror is not None:
+                        onerror(dirpath, e)
+                    continue
+
+                dirs, files = [], []
+                for entry in entries:
+                    if _is_dir(entry):
+                        if dir_filter is None or dir_filter(dirpath, entry):
+                            dirs.append(entry)
+                    elif file_filter is None or file_filter(dirpath, entry):
+                        files.append(entry)
+
+                yield dirpath, dirs, files
+
+                if max_depth is not None and depth >= max_depth:
+                    continue
+                for entry in dirs:
+                    child = _join(dirpath, entry["name"])
+                    if child in mount_points:
+                        continue
+                    pending.append((child, depth + 1))
@@ -0,0 +1,239 @@
+"""In-memory AGFS server for tests, speaking the real HTTP API on localhost"""
+
+import hashlib
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+from pyagfs.digest import digest_bytes, local_digest_available
+
+MOD_TIME = "2025-03-04T05:06:07.123456789Z"
+
+
+def _parent(path):
+    return path.rstrip("/").rsplit("/", 1)[0] or "/"
+
+
+class FakeAGFS:
+    """Files and directories kept in dicts, served over HTTP by serve()
+
+    Every request is appended to requests as (method, endpoint, params).
+    fail(method, endpoint, status, times) makes the next matching requests
+    fail with status before they reach the file system; cut_off(method,
+    endpoint, times) makes them drop the connection halfway through the body.
+    """
+
+    def __init__(self):
+        self.files = {}
+        self.dirs = {"/"}
+        self.requests = []
+        self._faults = []
+        self._cuts = []
+        self._lock = threading.RLock()
+
+    def fail(self, method, endpoint, status, times=1):
+        with self._lock:
+            self._faults.extend([(method, endpoint, status)] * times)
+
+    def cut_off(self, method, endpoint, times=1):
+        with self._lock:
+            self._cuts.extend([(method, endpoint)] * times)
+
+    def take_cut(self, method, endpoint):
+        with self._lock:
+            if (method, endpoint) in self._cuts:
+                self._cuts.remove((method, endpoint))
+                return True
+            return False
+
+    def count(self, method, endpoint):
+        return sum(1 for m, e, _ in self.requests if m == method and e == endpoint)
+
+    def handle(self, method, endpoint, params, body):
+        """Return (status, headers, body bytes) for one request"""
+        with self._lock:
+            self.requests.append((method, endpoint, params))
+            for fault in self._faults:
+                if fault[:2] == (method, endpoint):
+                    self._faults.remove(fault)
+                    return self._json(fault[2], {"error": f"injected {fault[2]}"})
+            handler = getattr(self, f"_{method.lower()}_{endpoint.replace('/', '_')}", None)
+            if handler is None:
+                return self._json(200, {})
+            return handler(params, body)
+
+    @staticmethod
+    def _json(status, obj):
+        return status, {"Content-Type": "application/json"}, json.dumps(obj).encode()
+
+    def _entry(self, path):
+        name = path.rsplit("/", 1)[1] or "/"
+        if path in self.dirs:
+            return {"name": name, "isDir": True, "size": 0, "mode": 0o755, "modTime": MOD_TIME}
+        return {"name": name, "isDir": False, "size": len(self.files[path]), "mode": 0o644, "modTime": MOD_TIME}
+
+    def _get_health(self, params, body):
+        return self._json(200, {"status": "healthy"})
+
+    def _get_files(self, params, body):
+        path = params.get("path")
+        if path in self.dirs:
+            return self._json(500, {"error": f"is a directory: {path}"})
+        if path not in self.files:
+            return self._json(404, {"error": f"no such file: {path}"})
+        data = self.files[path]
+        offset = int(params.get("offset", 0))
+        size = int(params.get("size", -1))
+        data = data[offset:] if size < 0 else data[offset:offset + size]
+        return 200, {"Content-Type": "application/octet-stream"}, data
+
+    def _put_files(self, params, body):
+        path = params.get("path")
+        if path in self.dirs:
+            return self._json(500, {"error": f"is a directory: {path}"})
+        if _parent(path) not in self.dirs:
+            return self._json(404, {"error": f"no such directory: {_parent(path)}"})
+        self.files[path] = body
+        return self._json(200, {"message": f"Written {len(body)} bytes"})
+
+    def _post_files(self, params, body):
+        path = params.get("path")
+        if _parent(path) not in self.dirs:
+            return self._json(404, {"error": f"no such directory: {_parent(path)}"})
+        self.files.setdefault(path, b"")
+        return self._json(201, {"message": "file created"})
+
+    def _delete_files(self, params, body):
+        path = params.get("path")
+        if path in self.files:
+            del self.files[path]
+            return self._json(200, {"message": "deleted"})
+        if path not in self.dirs:
+            return self._json(404, {"error": f"no such file: {path}"})
+        prefix = path.rstrip("/") + "/"
+        children = [p for p in list(self.files) + list(self.dirs) if p.startswith(prefix)]
+        if children and params.get("recursive") != "true":
+            return self._json(500, {"error": "directory not empty"})
+        for child in children:
+            self.files.pop(child, None)
+            self.dirs.discard(child)
+        self.dirs.discard(path)
+        return self._json(200, {"message": "deleted"})
+
+    def _get_directories(self, params, body):
+        path = params.get("path")
+        if path not in self.dirs:
+            return self._json(404, {"error": f"no such directory: {path}"})
+        names = sorted(p for p in list(self.files) + list(self.dirs) if p != "/" and _parent(p) == path)
+        result = {"files": [self._entry(p) for p in names]}
+        if params.get("limit") or params.get("cursor"):
+            cursor = params.get("cursor", "")
+            entries = [e for e in result["files"] if e["name"] > cursor]
+            limit = int(params.get("limit") or 0)
+            result = {"files": entries}
+            if limit and len(entries) > limit:
+                result = {"files": entries[:limit], "nextCursor": entries[limit - 1]["name"]}
+        return self._json(200, result)
+
+    def _post_directories(self, params, body):
+        path = params.get("path")
+        if path in self.dirs or path in self.files:
+            return self._json(409, {"error": f"already exists: {path}"})
+        if _parent(path) not in self.dirs:
+            return self._json(404, {"error": f"no such directory: {_parent(path)}"})
+        self.dirs.add(path)
+        return self._json(201, {"message": "directory created"})
+
+    def _get_stat(self, params, body):
+        path = params.get("path")
+        if path not in self.dirs and path not in self.files:
+            return self._json(404, {"error": f"no such file: {path}"})
+        return self._json(200, self._entry(path))
+
+    def _post_rename(self, params, body):
+        old, new = params.get("path"), json.loads(body)["newPath"]
+        if old in self.files:
+            self.files[new] = self.files.pop(old)
+            return self._json(200, {"message": "renamed"})
+        if old not in self.dirs:
+            return self._json(404, {"error": f"no such file: {old}"})
+        for path in [p for p in list(self.files) if p.startswith(old + "/")]:
+            self.files[new + path[len(old):]] = self.files.pop(path)
+        for path in [p for p in list(self.dirs) if p == old or p.startswith(old + "/")]:
+            self.dirs.discard(path)
+            self.dirs.add(new + path[len(old):])
+        return self._json(200, {"message": "renamed"})
+
+    def _post_touch(self, params, body):
+        path = params.get("path")
+        self.files.setdefault(path, b"")
+        return self._json(200, {"message": "touched"})
+
+    def _post_digest(self, params, body):
+        request = json.loads(body)
+        path, algorithm = request["path"], request.get("algorithm", "xxh3")
+        if path not in self.files:
+            return self._json(500 if path in self.dirs else 404, {"error": f"cannot digest: {path}"})
+        data = self.files[path]
+        if local_digest_available(algorithm):
+            digest = digest_bytes(data, algorithm)
+        else:
+            digest = hashlib.sha256(data).hexdigest()[:16]
+        return self._json(200, {"algorithm": algorithm, "path": path, "digest": digest})
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def _serve(self):
+        url = urlsplit(self.path)
+        endpoint = url.path.split("/api/v1/", 1)[-1]
+        length = self.headers.get("Content-Length")
+        if length is not None:
+            body = self.rfile.read(int(length))
+        elif self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            body = self._read_chunked()
+        else:
+            body = b""
+        status, headers, payload = self.server.fake.handle(self.command, endpoint, dict(parse_qsl(url.query)), body)
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        if status < 400 and self.server.fake.take_cut(self.command, endpoint):
+            self.wfile.write(payload[:len(payload) // 2])
+            self.close_connection = True
+            return
+        self.wfile.write(payload)
+
+    def _read_chunked(self):
+        chunks = []
+        while True:
+            size = int(self.rfile.readline().split(b";")[0], 16)
+            if size == 0:
+                self.rfile.readline()
+                return b"".join(chunks)
+            chunks.append(self.rfile.read(size))
+            self.rfile.readline()
+
+    do_GET = do_PUT = do_POST = do_DELETE = _serve
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(fake=None):
+    """Start serving fake (or a new FakeAGFS) on a free port
+
+    Returns:
+        (fake, base URL, server); call server.shutdown() and server.server_close() when done
+    """
+    fake = fake or FakeAGFS()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server.daemon_threads = True
+    server.fake = fake
+    threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+    return fake, f"http://127.0.0.1:{server.server_address[1]}", server
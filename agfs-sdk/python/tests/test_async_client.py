@@ -0,0 +1,121 @@
+import io
+import json
+import threading
+import unittest
+
+from pyagfs.exceptions import AGFSClientError
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+if httpx is not None:
+    from pyagfs import AsyncAGFSClient
+
+
+class MemoryServer:
+    """Just enough of the AGFS HTTP API for the async client, as an httpx transport handler"""
+
+    def __init__(self):
+        self.files = {}
+        self.requests = []
+
+    def __call__(self, request):
+        self.requests.append(request)
+        endpoint = request.url.path.split("/api/v1/", 1)[1]
+        path = request.url.params.get("path")
+        if endpoint == "health":
+            return httpx.Response(200, json={"status": "healthy"})
+        if endpoint == "files" and request.method == "PUT":
+            self.files[path] = request.read()
+            return httpx.Response(200, json={"message": "written"})
+        if endpoint == "files" and request.method == "GET":
+            if path not in self.files:
+                return httpx.Response(404, json={"error": f"no such file: {path}"})
+            data = self.files[path]
+            offset = int(request.url.params.get("offset", 0))
+            size = int(request.url.params.get("size", -1))
+            return httpx.Response(200, content=data[offset:] if size < 0 else data[offset:offset + size])
+        if endpoint == "directories":
+            return httpx.Response(200, json={"files": [{"name": name.rsplit("/", 1)[1]} for name in sorted(self.files)]})
+        if endpoint == "grep":
+            lines = [{"file": "/a", "line": 1, "content": "error"}, {"type": "summary", "count": 1}]
+            return httpx.Response(200, content=b"".join(json.dumps(line).encode() + b"\n" for line in lines))
+        return httpx.Response(200, json={})
+
+
+@unittest.skipIf(httpx is None, "httpx not installed")
+class TestAsyncAGFSClient(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.server = MemoryServer()
+        self.client = AsyncAGFSClient("http://agfs.test")
+        await self.client.session.aclose()
+        self.client.session = httpx.AsyncClient(transport=httpx.MockTransport(self.server))
+
+    async def asyncTearDown(self):
+        await self.client.aclose()
+
+    async def test_api_prefix_is_appended(self):
+        self.assertEqual(self.client.api_base, "http://agfs.test/api/v1")
+        self.assertEqual((await self.client.health())["status"], "healthy")
+
+    async def test_write_and_read_back(self):
+        self.assertEqual(await self.client.write("/a", b"hello world"), "written")
+        self.assertEqual(await self.client.cat("/a"), b"hello world")
+        self.assertEqual(await self.client.cat("/a", offset=6, size=3), b"wor")
+        self.assertEqual(await self.client.ls("/"), [{"name": "a"}])
+
+    async def test_streaming_cat(self):
+        self.server.files["/big"] = b"x" * 100000
+        chunks = [chunk async for chunk in await self.client.cat("/big", stream=True)]
+        self.assertEqual(b"".join(chunks), b"x" * 100000)
+
+    async def test_write_from_iterators_and_file_objects(self):
+        async def agen():
+            yield b"a"
+            yield b"b"
+
+        await self.client.write("/gen", agen())
+        await self.client.write("/iter", iter([b"c", b"d"]))
+        self.assertEqual(self.server.files["/gen"], b"ab")
+        self.assertEqual(self.server.files["/iter"], b"cd")
+
+    async def test_file_objects_are_read_off_the_event_loop(self):
+        loop_thread = threading.get_ident()
+        readers = []
+
+        class Source(io.BytesIO):
+            def read(self, size=-1):
+                readers.append(threading.get_ident())
+                return super().read(size)
+
+        await self.client.write("/file", Source(b"z" * 200000))
+        self.assertEqual(self.server.files["/file"], b"z" * 200000)
+        self.assertTrue(readers)
+        self.assertNotIn(loop_thread, readers)
+
+    async def test_server_error_message_is_surfaced(self):
+        with self.assertRaisesRegex(AGFSClientError, "no such file: /missing"):
+            await self.client.cat("/missing")
+        with self.assertRaisesRegex(AGFSClientError, "no such file: /missing"):
+            await self.client.cat("/missing", stream=True)
+
+    async def test_streaming_grep_yields_matches_and_summary(self):
+        items = [item async for item in await self.client.grep("/", "error", stream=True)]
+        self.assertEqual(items[0]["content"], "error")
+        self.assertEqual(items[-1]["type"], "summary")
+
+    async def test_connection_refused(self):
+        def refuse(request):
+            raise httpx.ConnectError("refused", request=request)
+
+        await self.client.session.aclose()
+        self.client.session = httpx.AsyncClient(transport=httpx.MockTransport(refuse))
+        self.client.retry_policy.max_retries = 0
+        with self.assertRaisesRegex(AGFSClientError, "Connection refused"):
+            await self.client.ls("/")
+
+
+if __name__ == '__main__':
+    unittest.main()
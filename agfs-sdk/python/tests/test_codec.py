@@ -0,0 +1,98 @@
+import json
+import math
+import unittest
+from unittest.mock import patch
+
+from pyagfs import codec
+from pyagfs.codec import NDJSONDecoder, OrjsonCodec, StdlibCodec, iter_ndjson
+
+DOC = {"name": "résumé.txt", "size": 12, "tags": ["a", "b"], "meta": {"z": 1, "a": None}, "ok": True}
+
+LAYOUTS = [
+    {},
+    {"indent": 2},
+    {"indent": 4},
+    {"sort_keys": True},
+    {"indent": 2, "sort_keys": True},
+    {"compact": True},
+    {"compact": True, "sort_keys": True},
+    {"ensure_ascii": True},
+]
+
+
+def expected(obj, indent=None, sort_keys=False, compact=False, ensure_ascii=False):
+    return json.dumps(obj, indent=indent, sort_keys=sort_keys, ensure_ascii=ensure_ascii,
+                      separators=(",", ":") if compact and not indent else None)
+
+
+class CodecTests:
+    codec = None
+
+    def test_layouts_match_json_dumps(self):
+        for layout in LAYOUTS:
+            with self.subTest(**layout):
+                self.assertEqual(self.codec.dumps(DOC, **layout), expected(DOC, **layout))
+                self.assertEqual(self.codec.dumpb(DOC, **layout), expected(DOC, **layout).encode("utf-8"))
+
+    def test_loads_bytes_str_and_memoryview(self):
+        raw = json.dumps(DOC).encode("utf-8")
+        self.assertEqual(self.codec.loads(raw), DOC)
+        self.assertEqual(self.codec.loads(bytearray(raw)), DOC)
+        self.assertEqual(self.codec.loads(memoryview(raw)), DOC)
+        self.assertEqual(self.codec.loads(raw.decode("utf-8")), DOC)
+
+    def test_input_only_the_stdlib_accepts(self):
+        self.assertTrue(math.isnan(self.codec.loads(b'{"x": NaN}')["x"]))
+        self.assertEqual(self.codec.dumps({1: "a"}), '{"1": "a"}')
+
+    def test_invalid_json_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            self.codec.loads(b"{not json")
+
+
+class TestStdlibCodec(CodecTests, unittest.TestCase):
+    codec = StdlibCodec()
+
+
+@unittest.skipIf(codec.orjson is None, "orjson is not installed")
+class TestOrjsonCodec(CodecTests, unittest.TestCase):
+    codec = OrjsonCodec()
+
+
+class TestCodecSelection(unittest.TestCase):
+    def setUp(self):
+        self.addCleanup(codec.set_codec, codec.get_codec())
+
+    def test_set_codec_by_name(self):
+        codec.set_codec("json")
+        self.assertEqual(codec.get_codec().name, "json")
+        with self.assertRaises(ValueError):
+            codec.set_codec("yaml")
+
+    def test_without_orjson_the_stdlib_is_used(self):
+        with patch.object(codec, "orjson", None):
+            with self.assertRaises(ImportError):
+                codec.set_codec("orjson")
+            codec.set_codec("json")
+            self.assertEqual(codec.dumps(DOC, indent=2), expected(DOC, indent=2))
+            self.assertEqual(codec.loads(b"[1, 2]"), [1, 2])
+
+
+class TestNDJSON(unittest.TestCase):
+    def test_values_split_across_chunks(self):
+        decoder = NDJSONDecoder()
+        self.assertEqual(decoder.feed(b'{"a": 1}\n{"b"'), [{"a": 1}])
+        self.assertEqual(decoder.feed(b": 2"), [])
+        self.assertEqual(decoder.feed(b"}\n\n[3]"), [{"b": 2}])
+        self.assertEqual(decoder.close(), [[3]])
+        self.assertEqual(decoder.close(), [])
+
+    def test_invalid_lines(self):
+        chunks = [b'1\nnot json\n"\xc3', b'\xa9"\n']
+        self.assertEqual(list(iter_ndjson(chunks)), [1, "é"])
+        with self.assertRaises(ValueError):
+            list(iter_ndjson(chunks, skip_invalid=False))
+
+
+if __name__ == '__main__':
+    unittest.main()
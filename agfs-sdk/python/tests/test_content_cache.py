@@ -0,0 +1,95 @@
+import tempfile
+import unittest
+
+from fakeserver import serve
+
+from pyagfs import AGFSClient
+from pyagfs.cache import ContentCache
+from pyagfs.exceptions import AGFSClientError
+
+
+class TestContentCache(unittest.TestCase):
+    def test_memory_tier_evicts_least_recently_used(self):
+        cache = ContentCache(max_memory_bytes=10)
+        cache.put("/a", "da", b"aaaa")
+        cache.put("/b", "db", b"bbbb")
+        cache.get("/a")
+        cache.put("/c", "dc", b"cccc")
+        self.assertIsNone(cache.get("/b"))
+        self.assertEqual(cache.get("/a"), ("da", b"aaaa"))
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_evicted_entries_are_demoted_to_disk_and_survive_restarts(self):
+        with tempfile.TemporaryDirectory() as disk_dir:
+            cache = ContentCache(max_memory_bytes=4, disk_dir=disk_dir)
+            cache.put("/a", "da", b"aaaa")
+            cache.put("/b", "db", b"bbbb")
+            self.assertEqual(cache.get("/a"), ("da", b"aaaa"))
+            reopened = ContentCache(max_memory_bytes=4, disk_dir=disk_dir)
+            self.assertEqual(reopened.get("/b"), ("db", b"bbbb"))
+
+    def test_paths_restrict_caching(self):
+        cache = ContentCache(paths=["/s3"])
+        self.assertTrue(cache.accepts("/s3/x"))
+        self.assertFalse(cache.accepts("/s3x"))
+        self.assertFalse(cache.accepts("/queuefs/jobs"))
+
+    def test_invalidate_recursive(self):
+        cache = ContentCache()
+        cache.put("/d/a", "1", b"a")
+        cache.put("/d/sub/b", "2", b"b")
+        cache.put("/other", "3", b"c")
+        cache.invalidate("/d", recursive=True)
+        self.assertIsNone(cache.get("/d/a"))
+        self.assertIsNone(cache.get("/d/sub/b"))
+        self.assertIsNotNone(cache.get("/other"))
+
+
+class TestClientContentCache(unittest.TestCase):
+    def setUp(self):
+        self.fake, url, self.server = serve()
+        self.fake.files["/f"] = b"version one"
+        self.cache = ContentCache(algorithm="md5")
+        self.client = AGFSClient(url, content_cache=self.cache)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_unchanged_file_is_revalidated_not_downloaded(self):
+        self.assertEqual(self.client.cat("/f"), b"version one")
+        self.assertEqual(self.client.cat("/f"), b"version one")
+        self.assertEqual(self.client.cat("/f", offset=8, size=3), b"one")
+        self.assertEqual(self.fake.count("GET", "files"), 1)
+        self.assertEqual(self.fake.count("POST", "digest"), 3)
+        self.assertEqual(self.cache.stats()["hits"], 2)
+
+    def test_changed_file_is_downloaded_again(self):
+        self.client.cat("/f")
+        # Changed behind the client's back: only the digest reveals it
+        self.fake.files["/f"] = b"version two"
+        self.assertEqual(self.client.cat("/f"), b"version two")
+        self.assertEqual(self.fake.count("GET", "files"), 2)
+        self.assertEqual(self.cache.stats()["stale"], 1)
+
+    def test_own_writes_invalidate(self):
+        self.client.cat("/f")
+        self.client.write("/f", b"rewritten")
+        self.assertIsNone(self.cache.get("/f"))
+        self.assertEqual(self.client.cat("/f"), b"rewritten")
+
+    def test_missing_file_drops_cached_copy(self):
+        self.client.cat("/f")
+        del self.fake.files["/f"]
+        with self.assertRaises(AGFSClientError):
+            self.client.cat("/f")
+        self.assertIsNone(self.cache.get("/f"))
+
+    def test_ranged_miss_does_not_populate(self):
+        self.assertEqual(self.client.cat("/f", offset=0, size=7), b"version")
+        self.assertIsNone(self.cache.get("/f"))
+
+
+if __name__ == '__main__':
+    unittest.main()
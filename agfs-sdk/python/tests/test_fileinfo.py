@@ -0,0 +1,66 @@
+import unittest
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+from fakeserver import serve
+
+from pyagfs import AGFSClient
+from pyagfs.fileinfo import FileInfo, FileTable, parse_mod_time
+
+
+class TestFileInfo(unittest.TestCase):
+    def test_from_dict_normalizes_fields(self):
+        info = FileInfo.from_dict({"name": "d", "type": "directory", "size": None, "modTime": ""})
+        self.assertTrue(info.is_dir)
+        self.assertEqual(info.size, 0)
+        self.assertIsNone(info.mtime)
+
+    def test_nanosecond_mod_times_parse(self):
+        self.assertEqual(parse_mod_time("2025-03-04T05:06:07.123456789Z"),
+                         datetime(2025, 3, 4, 5, 6, 7, 123456, tzinfo=timezone.utc))
+        self.assertIsNone(parse_mod_time("yesterday"))
+
+    def test_table_round_trip(self):
+        entries = [{"name": "a", "size": 3, "mode": 0o644}, {"name": "b", "isDir": True}]
+        table = FileTable(entries)
+        self.assertEqual(list(table.sizes), [3, 0])
+        self.assertEqual(list(table.is_dir), [0, 1])
+        self.assertEqual(list(table), [FileInfo.from_dict(e) for e in entries])
+
+
+class TestTypedListings(unittest.TestCase):
+    def setUp(self):
+        self.fake, url, self.server = serve()
+        self.fake.dirs.update({"/d", "/d/sub"})
+        for i in range(3):
+            self.fake.files[f"/d/f{i}"] = b"x" * i
+        self.client = AGFSClient(url)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_typed_ls_and_table_are_built_from_the_stream(self):
+        # Neither builds the dict list of ls() first
+        with patch.object(self.client, "_ls", side_effect=AssertionError("dict list built")):
+            infos = self.client.ls("/d", typed=True)
+            table = self.client.ls_table("/d")
+        self.assertEqual([i.name for i in infos], ["f0", "f1", "f2", "sub"])
+        self.assertEqual(infos[3].is_dir, True)
+        self.assertEqual(infos[2].size, 2)
+        self.assertEqual(table.names, ["f0", "f1", "f2", "sub"])
+        self.assertEqual(list(table.sizes), [0, 1, 2, 0])
+        self.assertEqual(infos, list(table))
+
+    def test_typed_ls_uses_the_metadata_cache(self):
+        client = AGFSClient(self.client.api_base, metadata_cache=True)
+        self.addCleanup(client.close)
+        self.assertEqual(client.ls("/d"), client.ls("/d", typed=False))
+        self.assertEqual(len(client.ls_table("/d")), 4)
+        self.assertEqual(len(client.ls("/d", typed=True)), 4)
+        self.assertEqual(self.fake.count("GET", "directories"), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+
+from fakeserver import serve
+
+from pyagfs import AGFSClient
+from pyagfs.exceptions import AGFSClientError
+
+
+class TestIterLs(unittest.TestCase):
+    def setUp(self):
+        self.fake, url, self.server = serve()
+        self.fake.dirs.add("/d")
+        for i in range(7):
+            self.fake.files[f"/d/f{i}"] = b"x" * i
+        self.client = AGFSClient(url)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def listing_params(self):
+        return [params for method, endpoint, params in self.fake.requests
+                if (method, endpoint) == ("GET", "directories")]
+
+    def test_pages_follow_the_cursor(self):
+        entries = list(self.client.iter_ls("/d", page_size=3))
+        self.assertEqual([e["name"] for e in entries], [f"f{i}" for i in range(7)])
+        self.assertEqual([p.get("cursor") for p in self.listing_params()], [None, "f2", "f5"])
+        self.assertTrue(all(p["limit"] == "3" for p in self.listing_params()))
+
+    def test_without_page_size_one_request(self):
+        self.assertEqual(len(list(self.client.iter_ls("/d"))), 7)
+        self.assertEqual(self.listing_params(), [{"path": "/d"}])
+
+    def test_typed_entries(self):
+        infos = list(self.client.iter_ls("/d", page_size=4, typed=True))
+        self.assertEqual([i.size for i in infos], list(range(7)))
+
+    def test_stopping_early_fetches_no_more_pages(self):
+        listing = self.client.iter_ls("/d", page_size=2)
+        self.assertEqual(next(listing)["name"], "f0")
+        listing.close()
+        self.assertEqual(len(self.listing_params()), 1)
+
+    def test_missing_directory(self):
+        with self.assertRaisesRegex(AGFSClientError, "no such directory"):
+            list(self.client.iter_ls("/missing", page_size=2))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import unittest
+from unittest.mock import patch
+
+from fakeserver import serve
+
+from pyagfs import AGFSClient
+from pyagfs.cache import MetadataCache
+from pyagfs.exceptions import AGFSClientError
+
+
+class TestMetadataCache(unittest.TestCase):
+    def test_entries_expire_after_ttl(self):
+        cache = MetadataCache(ttl=5)
+        with patch("pyagfs.cache.time.monotonic", return_value=100.0):
+            cache.put(MetadataCache.STAT, "/a", {"size": 1})
+            self.assertEqual(cache.get(MetadataCache.STAT, "/a"), (True, False, {"size": 1}))
+        with patch("pyagfs.cache.time.monotonic", return_value=105.0):
+            self.assertEqual(cache.get(MetadataCache.STAT, "/a"), (False, False, None))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = MetadataCache(max_entries=2)
+        cache.put(MetadataCache.STAT, "/a", 1)
+        cache.put(MetadataCache.STAT, "/b", 2)
+        cache.get(MetadataCache.STAT, "/a")
+        cache.put(MetadataCache.STAT, "/c", 3)
+        self.assertFalse(cache.get(MetadataCache.STAT, "/b")[0])
+        self.assertTrue(cache.get(MetadataCache.STAT, "/a")[0])
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_mount_ttls_use_longest_prefix(self):
+        cache = MetadataCache(ttl=5, mount_ttls={"/queuefs": 0, "/s3": 60, "/s3/hot": 1})
+        self.assertEqual(cache.ttl_for("/queuefs/jobs"), 0)
+        self.assertEqual(cache.ttl_for("/s3/data"), 60)
+        self.assertEqual(cache.ttl_for("/s3/hot/x"), 1)
+        self.assertEqual(cache.ttl_for("/s3x"), 5)
+        cache.put(MetadataCache.STAT, "/queuefs/jobs", {})
+        self.assertFalse(cache.get(MetadataCache.STAT, "/queuefs/jobs")[0])
+
+    def test_negative_entries_use_negative_ttl(self):
+        cache = MetadataCache(ttl=60, negative_ttl=1)
+        with patch("pyagfs.cache.time.monotonic", return_value=0.0):
+            cache.put(MetadataCache.STAT, "/gone", "no such file", negative=True)
+            self.assertEqual(cache.get(MetadataCache.STAT, "/gone"), (True, True, "no such file"))
+        with patch("pyagfs.cache.time.monotonic", return_value=1.5):
+            self.assertFalse(cache.get(MetadataCache.STAT, "/gone")[0])
+
+    def test_invalidate_drops_path_parent_and_children(self):
+        cache = MetadataCache()
+        cache.put_listing("/d", [{"name": "a"}, {"name": "sub"}])
+        cache.put(MetadataCache.LS, "/d/sub", [])
+        cache.invalidate("/d/a")
+        self.assertFalse(cache.get(MetadataCache.LS, "/d")[0])
+        self.assertFalse(cache.get(MetadataCache.STAT, "/d/a")[0])
+        self.assertTrue(cache.get(MetadataCache.STAT, "/d/sub")[0])
+        cache.invalidate("/d", recursive=True)
+        self.assertFalse(cache.get(MetadataCache.LS, "/d/sub")[0])
+
+
+class TestClientMetadataCache(unittest.TestCase):
+    def setUp(self):
+        self.fake, url, self.server = serve()
+        self.fake.dirs.add("/d")
+        for i in range(5):
+            self.fake.files[f"/d/f{i}"] = b"x" * i
+        self.client = AGFSClient(url, metadata_cache=True)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_ls_fills_listing_and_stat_entries(self):
+        self.client.ls("/d")
+        self.client.ls("/d")
+        self.assertEqual(self.client.stat("/d/f3")["size"], 3)
+        self.assertEqual(self.fake.count("GET", "directories"), 1)
+        self.assertEqual(self.fake.count("GET", "stat"), 0)
+
+    def test_mutations_invalidate(self):
+        self.client.ls("/d")
+        self.client.write("/d/new", b"data")
+        self.assertIn("new", [e["name"] for e in self.client.ls("/d")])
+        self.assertEqual(self.fake.count("GET", "directories"), 2)
+
+    def test_missing_paths_are_cached(self):
+        for _ in range(2):
+            with self.assertRaises(AGFSClientError):
+                self.client.stat("/missing")
+        self.assertEqual(self.fake.count("GET", "stat"), 1)
+
+    def test_fully_consumed_iter_ls_fills_the_cache(self):
+        names = [e["name"] for e in self.client.iter_ls("/d", page_size=2)]
+        self.assertEqual(names, [f"f{i}" for i in range(5)])
+        self.assertEqual(self.fake.count("GET", "directories"), 3)
+        self.assertEqual([e["name"] for e in self.client.ls("/d")], names)
+        self.assertEqual(self.client.stat("/d/f4")["size"], 4)
+        self.assertEqual(self.fake.count("GET", "directories"), 3)
+        self.assertEqual(self.fake.count("GET", "stat"), 0)
+
+    def test_partially_consumed_iter_ls_does_not(self):
+        listing = self.client.iter_ls("/d", page_size=2)
+        next(listing)
+        listing.close()
+        self.client.ls("/d")
+        self.assertEqual(self.fake.count("GET", "directories"), 2)
+
+    def test_listing_larger_than_the_cache_is_not_cached(self):
+        self.client.metadata_cache = MetadataCache(max_entries=3)
+        self.assertEqual(len(list(self.client.iter_ls("/d"))), 5)
+        self.assertFalse(self.client.metadata_cache.get(MetadataCache.LS, "/d")[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import struct
+import unittest
+from unittest.mock import Mock
+
+from pyagfs import codec
+from pyagfs.exceptions import AGFSClientError
+from pyagfs.pack import MAGIC, PackReader, build, unpack
+
+
+def pack_bytes(members, data=b""):
+    """A pack whose index is written as given, bypassing build()'s checks"""
+    blob = codec.dumpb({"version": 1, "members": members})
+    return data + blob + struct.pack("<QQ8s", len(data), len(blob), MAGIC)
+
+
+def mock_client(content):
+    client = Mock()
+    client.stat.return_value = {"size": len(content)}
+    client.cat.side_effect = lambda path, offset=0, size=-1: content[offset:offset + size]
+    return client
+
+
+class TestPack(unittest.TestCase):
+    def test_reader_round_trip(self):
+        content = b"".join(build([("a.txt", b"hello"), ("dir/b.txt", b"world")]))
+        reader = PackReader(mock_client(content), "/p.pack")
+        self.assertEqual(reader.names(), ["a.txt", "dir/b.txt"])
+        self.assertEqual(reader.read("dir/b.txt"), b"world")
+
+    def test_malicious_index_is_rejected(self):
+        for name in ["../../etc/x", "/abs", "a/../../x", "a//b", "./a", "a/.", "a\\..\\b", ""]:
+            with self.subTest(name=name):
+                content = pack_bytes({name: [0, 1]}, b"x")
+                with self.assertRaises(AGFSClientError):
+                    PackReader(mock_client(content), "/evil.pack")
+
+    def test_out_of_range_entry_is_rejected(self):
+        content = pack_bytes({"a": [0, 100]}, b"x")
+        with self.assertRaises(AGFSClientError):
+            PackReader(mock_client(content), "/evil.pack")
+
+    def test_unpack_checks_names_before_writing(self):
+        client = Mock()
+        reader = Mock()
+        reader.names.return_value = ["ok.txt", "../escape.txt"]
+        client.open_pack.return_value = reader
+        with self.assertRaises(AGFSClientError):
+            unpack(client, "/evil.pack", "/dst")
+        reader.read_many.assert_not_called()
+        client.write.assert_not_called()
+
+    def test_build_rejects_unsafe_names(self):
+        with self.assertRaises(ValueError):
+            list(build([("../x", b"data")]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import os
+import tempfile
+import unittest
+
+from fakeserver import serve
+
+from pyagfs import AGFSClient, RetryPolicy, parallel_download
+from pyagfs.exceptions import AGFSClientError
+
+DATA = bytes(range(256)) * 400
+
+
+class TestParallelDownload(unittest.TestCase):
+    def setUp(self):
+        self.fake, url, self.server = serve()
+        self.fake.files["/big"] = DATA
+        self.client = AGFSClient(url, retry_policy=RetryPolicy(base_delay=0, max_delay=0))
+        self.tmp = tempfile.TemporaryDirectory()
+        self.local = os.path.join(self.tmp.name, "big")
+
+    def tearDown(self):
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmp.cleanup()
+
+    def download(self, **kwargs):
+        kwargs.setdefault("range_size", 16 * 1024)
+        kwargs.setdefault("concurrency", 4)
+        return parallel_download(self.client, "/big", self.local, **kwargs)
+
+    def test_ranges_reassemble_the_file(self):
+        self.assertEqual(self.download(), len(DATA))
+        with open(self.local, "rb") as f:
+            self.assertEqual(f.read(), DATA)
+        self.assertEqual(self.fake.count("GET", "files"), 7)
+        self.assertFalse(os.path.exists(self.local + ".part"))
+
+    def test_missing_file_fails_without_range_retries(self):
+        del self.fake.files["/big"]
+        with self.assertRaisesRegex(AGFSClientError, "no such file"):
+            self.download(size=len(DATA), range_size=len(DATA))
+        # A 404 is retried neither by the policy nor per range
+        self.assertEqual(self.fake.count("GET", "files"), 1)
+        self.assertFalse(os.path.exists(self.local + ".part"))
+
+    def test_forbidden_range_is_reported_not_hidden_by_buffer_error(self):
+        self.fake.fail("GET", "files", 403)
+        with self.assertRaises(AGFSClientError):
+            self.download(concurrency=1)
+        self.assertFalse(os.path.exists(self.local))
+
+    def test_body_cut_off_midway_is_refetched(self):
+        self.fake.cut_off("GET", "files", times=2)
+        self.download(concurrency=1)
+        with open(self.local, "rb") as f:
+            self.assertEqual(f.read(), DATA)
+        self.assertEqual(self.fake.count("GET", "files"), 9)
+
+    def test_range_that_keeps_breaking_off_gives_up(self):
+        self.fake.cut_off("GET", "files", times=100)
+        with self.assertRaises(AGFSClientError):
+            self.download(concurrency=1, max_retries=1)
+        self.assertFalse(os.path.exists(self.local + ".part"))
+
+    def test_readinto_releases_the_buffer_on_failure(self):
+        buffer = bytearray(1024)
+        self.fake.cut_off("GET", "files")
+        with self.assertRaises(AGFSClientError):
+            self.client.readinto("/big", buffer)
+        # Resizing fails with BufferError while any view of buffer is alive
+        buffer.extend(b"x")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import os
+import threading
+import unittest
+from unittest.mock import patch
+
+from pyagfs.pool import SessionPool
+
+
+class TestSessionPool(unittest.TestCase):
+    def test_shared_strategy_returns_one_session(self):
+        pool = SessionPool()
+        sessions = []
+        threads = [threading.Thread(target=lambda: sessions.append(pool.get())) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len({id(s) for s in sessions}), 1)
+
+    def test_thread_local_strategy_returns_one_session_per_thread(self):
+        pool = SessionPool(strategy="thread_local")
+        main = pool.get()
+        self.assertIs(pool.get(), main)
+        other = []
+        t = threading.Thread(target=lambda: other.append(pool.get()))
+        t.start()
+        t.join()
+        self.assertIsNot(other[0], main)
+
+    def test_unknown_strategy(self):
+        with self.assertRaises(ValueError):
+            SessionPool(strategy="per_request")
+
+    def test_pid_change_drops_inherited_sessions(self):
+        pool = SessionPool()
+        parent = pool.get()
+        with patch("pyagfs.pool.os.getpid", return_value=os.getpid() + 1):
+            child = pool.get()
+            self.assertIsNot(child, parent)
+            self.assertIs(pool.get(), child)
+            # close() in the "child" must not touch the parent's sessions
+            with patch.object(parent, "close") as close:
+                pool.close()
+            close.assert_not_called()
+
+    def test_pool_settings_reach_the_adapter(self):
+        pool = SessionPool(pool_connections=3, pool_maxsize=7, pool_block=True, keep_alive=False)
+        session = pool.get()
+        adapter = session.get_adapter("http://example")
+        self.assertEqual(adapter._pool_maxsize, 7)
+        self.assertTrue(adapter._pool_block)
+        self.assertEqual(session.headers["Connection"], "close")
+
+    @unittest.skipUnless(hasattr(os, "fork"), "requires os.fork")
+    def test_forked_child_gets_fresh_session(self):
+        pool = SessionPool()
+        parent = pool.get()
+        read_end, write_end = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            try:
+                os.write(write_end, b"1" if pool.get() is not parent else b"0")
+            finally:
+                os._exit(0)
+        os.close(write_end)
+        result = os.read(read_end, 1)
+        os.close(read_end)
+        os.waitpid(pid, 0)
+        self.assertEqual(result, b"1")
+        self.assertIs(pool.get(), parent)
+
+
+if __name__ == '__main__':
+    unittest.main()
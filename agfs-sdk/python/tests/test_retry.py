@@ -0,0 +1,230 @@
+import asyncio
+import threading
+import time
+import unittest
+from unittest.mock import AsyncMock, Mock
+
+from requests.exceptions import ConnectionError
+
+from pyagfs import AsyncAGFSClient
+from pyagfs.exceptions import AGFSCircuitOpenError, AGFSClientError
+from pyagfs.retry import CircuitBreaker, RetryPolicy
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+
+def response(status):
+    r = Mock()
+    r.status_code = status
+    return r
+
+
+def no_sleep_policy(**kwargs):
+    kwargs.setdefault("base_delay", 0.0)
+    kwargs.setdefault("max_delay", 0.0)
+    return RetryPolicy(**kwargs)
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def test_opens_after_threshold_and_fails_fast(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+        breaker.record_failure("h")
+        breaker.before_request("h")
+        breaker.record_failure("h")
+        self.assertEqual(breaker.state("h"), CircuitBreaker.OPEN)
+        with self.assertRaises(AGFSCircuitOpenError):
+            breaker.before_request("h")
+
+    def test_half_open_lets_one_trial_through(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        breaker.record_failure("h")
+        breaker.before_request("h")
+        self.assertEqual(breaker.state("h"), CircuitBreaker.HALF_OPEN)
+        with self.assertRaises(AGFSCircuitOpenError):
+            breaker.before_request("h")
+        breaker.record_success("h")
+        self.assertEqual(breaker.state("h"), CircuitBreaker.CLOSED)
+
+    def test_non_transient_error_on_trial_does_not_wedge_half_open(self):
+        policy = no_sleep_policy(max_retries=0, circuit_breaker=CircuitBreaker(1, reset_timeout=0))
+        with self.assertRaises(ConnectionError):
+            policy.call(Mock(side_effect=ConnectionError()), "h", "stat", idempotent=True)
+        with self.assertRaises(ValueError):
+            policy.call(Mock(side_effect=ValueError("bad body")), "h", "stat", idempotent=True)
+        # The next request becomes the trial instead of failing fast forever
+        self.assertEqual(policy.call(lambda: response(200), "h", "stat", idempotent=True).status_code, 200)
+        self.assertEqual(policy.circuit_breaker.state("h"), CircuitBreaker.CLOSED)
+
+    def test_interrupted_trial_is_released(self):
+        policy = no_sleep_policy(max_retries=0, circuit_breaker=CircuitBreaker(1, reset_timeout=0))
+        with self.assertRaises(ConnectionError):
+            policy.call(Mock(side_effect=ConnectionError()), "h", "stat", idempotent=True)
+        with self.assertRaises(KeyboardInterrupt):
+            policy.call(Mock(side_effect=KeyboardInterrupt()), "h", "stat", idempotent=True)
+        self.assertEqual(policy.call(lambda: response(200), "h", "stat", idempotent=True).status_code, 200)
+
+
+class TestRetryPolicy(unittest.TestCase):
+    def test_retries_transient_statuses_then_succeeds(self):
+        attempt = Mock(side_effect=[response(503), response(502), response(200)])
+        result = no_sleep_policy(max_retries=3).call(attempt, "h", "cat", idempotent=True)
+        self.assertEqual(result.status_code, 200)
+        self.assertEqual(attempt.call_count, 3)
+
+    def test_returns_last_response_when_retries_run_out(self):
+        attempt = Mock(return_value=response(503))
+        result = no_sleep_policy(max_retries=2).call(attempt, "h", "cat", idempotent=True)
+        self.assertEqual(result.status_code, 503)
+        self.assertEqual(attempt.call_count, 3)
+
+    def test_non_idempotent_and_non_transient_are_not_retried(self):
+        policy = no_sleep_policy(max_retries=3)
+        attempt = Mock(side_effect=ConnectionError())
+        with self.assertRaises(ConnectionError):
+            policy.call(attempt, "h", "create", idempotent=False)
+        self.assertEqual(attempt.call_count, 1)
+        attempt = Mock(return_value=response(500))
+        self.assertEqual(policy.call(attempt, "h", "cat", idempotent=True).status_code, 500)
+        self.assertEqual(attempt.call_count, 1)
+
+    def test_jitter_stays_within_bounds(self):
+        policy = RetryPolicy(base_delay=0.1, max_delay=1.0)
+        delay = None
+        for _ in range(50):
+            delay = policy.next_delay(delay)
+            self.assertGreaterEqual(delay, 0.1)
+            self.assertLessEqual(delay, 1.0)
+
+    def test_hedged_request_wins_when_primary_is_slow(self):
+        policy = no_sleep_policy(hedge=True, hedge_delay=0.05)
+        release = threading.Event()
+        calls = []
+
+        def attempt():
+            calls.append(1)
+            if len(calls) == 1:
+                release.wait(5)
+                return response(599)
+            return response(200)
+
+        start = time.monotonic()
+        result = policy.call(attempt, "h", "cat", idempotent=True, hedgeable=True)
+        release.set()
+        self.assertEqual(result.status_code, 200)
+        self.assertEqual(len(calls), 2)
+        self.assertLess(time.monotonic() - start, 2)
+
+    def test_fast_primary_is_not_hedged(self):
+        policy = no_sleep_policy(hedge=True, hedge_delay=1.0)
+        attempt = Mock(return_value=response(200))
+        policy.call(attempt, "h", "cat", idempotent=True, hedgeable=True)
+        self.assertEqual(attempt.call_count, 1)
+
+
+@unittest.skipIf(httpx is None, "httpx not installed")
+class TestAsyncRetryPolicy(unittest.IsolatedAsyncioTestCase):
+    async def test_async_retries_transient_errors(self):
+        outcomes = [httpx.ConnectError("refused"), response(503), response(200)]
+
+        async def attempt():
+            outcome = outcomes.pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+            outcome.aclose = AsyncMock()
+            return outcome
+
+        result = await no_sleep_policy(max_retries=3).acall(attempt, "h", "ls", idempotent=True)
+        self.assertEqual(result.status_code, 200)
+        self.assertEqual(outcomes, [])
+
+    async def test_async_trial_released_on_non_transient_error(self):
+        policy = no_sleep_policy(max_retries=0, circuit_breaker=CircuitBreaker(1, reset_timeout=0))
+
+        async def fail(error):
+            raise error
+
+        with self.assertRaises(httpx.ConnectError):
+            await policy.acall(lambda: fail(httpx.ConnectError("refused")), "h", "ls", idempotent=True)
+        with self.assertRaises(ValueError):
+            await policy.acall(lambda: fail(ValueError()), "h", "ls", idempotent=True)
+        self.assertEqual(policy.circuit_breaker.state("h"), CircuitBreaker.HALF_OPEN)
+        policy.circuit_breaker.before_request("h")
+
+    async def test_async_hedge_cancels_the_loser(self):
+        policy = no_sleep_policy(hedge=True, hedge_delay=0.05)
+        cancelled = []
+        calls = []
+
+        async def attempt():
+            calls.append(1)
+            if len(calls) == 1:
+                try:
+                    await asyncio.sleep(5)
+                except asyncio.CancelledError:
+                    cancelled.append(1)
+                    raise
+            return response(200)
+
+        result = await policy.acall(attempt, "h", "cat", idempotent=True, hedgeable=True)
+        await asyncio.sleep(0)
+        self.assertEqual(result.status_code, 200)
+        self.assertEqual(cancelled, [1])
+
+
+@unittest.skipIf(httpx is None, "httpx not installed")
+class TestAsyncClientRetries(unittest.IsolatedAsyncioTestCase):
+    async def client(self, handler, **policy):
+        client = AsyncAGFSClient("http://agfs.test", retry_policy=no_sleep_policy(**policy))
+        await client.session.aclose()
+        client.session = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        self.addAsyncCleanup(client.aclose)
+        return client
+
+    async def test_idempotent_reads_are_retried(self):
+        seen = []
+
+        def handler(request):
+            seen.append(request.url.path)
+            if len(seen) % 2:
+                return httpx.Response(503)
+            if request.url.path.endswith("/stat"):
+                return httpx.Response(200, json={"name": "/a", "size": 1})
+            return httpx.Response(200, json={"files": [{"name": "a"}]})
+
+        client = await self.client(handler, max_retries=1)
+        self.assertEqual((await client.stat("/a"))["size"], 1)
+        self.assertEqual(await client.ls("/"), [{"name": "a"}])
+        self.assertEqual(len(seen), 4)
+
+    async def test_non_idempotent_requests_are_not_retried(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request.method)
+            return httpx.Response(503, json={"error": "busy"})
+
+        client = await self.client(handler, max_retries=3)
+        with self.assertRaises(AGFSClientError):
+            await client.mkdir("/d")
+        self.assertEqual(calls, ["POST"])
+
+    async def test_circuit_breaker_applies_to_async_requests(self):
+        calls = []
+
+        def handler(request):
+            calls.append(1)
+            raise httpx.ConnectError("refused", request=request)
+
+        client = await self.client(handler, max_retries=0, circuit_breaker=CircuitBreaker(1, reset_timeout=60))
+        with self.assertRaises(AGFSClientError):
+            await client.stat("/a")
+        with self.assertRaises(AGFSCircuitOpenError):
+            await client.cat("/a")
+        self.assertEqual(len(calls), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
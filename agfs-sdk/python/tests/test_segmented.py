@@ -0,0 +1,81 @@
+import io
+import unittest
+
+from fakeserver import serve
+
+from pyagfs import AGFSClient, codec
+from pyagfs.exceptions import AGFSClientError
+from pyagfs.segmented import MANIFEST_NAME, read_manifest
+
+
+class TestSegmentedAppend(unittest.TestCase):
+    def setUp(self):
+        self.fake, url, self.server = serve()
+        self.client = AGFSClient(url)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def segments(self, path):
+        prefix = path + "/seg-"
+        return sorted((p, d) for p, d in self.fake.files.items() if p.startswith(prefix))
+
+    def test_without_convert_the_file_stays_regular(self):
+        self.fake.files["/log"] = b"a" * 1000
+        self.assertEqual(self.client.append("/log", b"b" * 1000, segment_threshold=10), 1000)
+        self.assertEqual(self.fake.files["/log"], b"a" * 1000 + b"b" * 1000)
+        self.assertNotIn("/log", self.fake.dirs)
+
+    def test_streamed_append_without_convert(self):
+        self.fake.files["/log"] = b"head:"
+        self.assertEqual(self.client.append("/log", iter([b"one", b"two"])), 6)
+        self.assertEqual(self.client.append("/log", io.BytesIO(b"three")), 5)
+        self.assertEqual(self.fake.files["/log"], b"head:onetwothree")
+
+    def test_convert_past_threshold_writes_only_new_data(self):
+        self.fake.files["/log"] = b"x" * 100
+        self.client.append("/log", b"y" * 50, convert=True, segment_threshold=120)
+        self.assertIn("/log", self.fake.dirs)
+        manifest = codec.loads(self.fake.files["/log/" + MANIFEST_NAME])
+        self.assertEqual(manifest["format"], "agfs-segmented")
+        self.assertEqual([s["size"] for s in manifest["segments"]], [100, 50])
+
+        self.client.append("/log", iter([b"z" * 10]), convert=True, segment_threshold=120)
+        self.assertEqual([len(d) for _, d in self.segments("/log")], [100, 50, 10])
+        expected = b"x" * 100 + b"y" * 50 + b"z" * 10
+        self.assertEqual(self.client.cat("/log"), expected)
+        self.assertEqual(self.client.cat("/log", offset=95, size=60), expected[95:155])
+        response = self.client.cat("/log", stream=True)
+        self.assertEqual(b"".join(response.iter_content(7)), expected)
+        buffer = bytearray(20)
+        self.assertEqual(self.client.readinto("/log", buffer, offset=140), 20)
+        self.assertEqual(bytes(buffer), expected[140:160])
+
+    def test_small_streamed_append_with_convert_rewrites(self):
+        self.fake.files["/log"] = b"small"
+        self.client.append("/log", iter([b"!"]), convert=True, segment_threshold=1024)
+        self.assertEqual(self.fake.files["/log"], b"small!")
+        self.assertIsNone(read_manifest(self.client, "/log"))
+
+    def test_compaction_merges_segments(self):
+        for i in range(6):
+            self.client.append("/log", bytes([65 + i]) * 10, convert=True, segment_threshold=0,
+                               max_segments=3, background=False)
+        manifest = read_manifest(self.client, "/log")
+        self.assertLessEqual(len(manifest["segments"]), 3)
+        self.assertEqual(len(self.segments("/log")), len(manifest["segments"]))
+        self.assertEqual(self.client.cat("/log"), b"".join(bytes([65 + i]) * 10 for i in range(6)))
+        self.assertTrue(self.client.compact("/log", full=True))
+        self.assertEqual(len(self.segments("/log")), 1)
+        self.assertEqual(self.client.cat("/log"), b"".join(bytes([65 + i]) * 10 for i in range(6)))
+
+    def test_append_to_directory_fails(self):
+        self.fake.dirs.add("/d")
+        with self.assertRaises(AGFSClientError):
+            self.client.append("/d", b"x")
+
+
+if __name__ == '__main__':
+    unittest.main()
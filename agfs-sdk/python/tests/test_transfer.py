@@ -0,0 +1,96 @@
+import os
+import tempfile
+import unittest
+
+from fakeserver import serve
+
+from pyagfs import AGFSClient, cp, download, upload
+from pyagfs.exceptions import AGFSClientError, AGFSTransferError
+
+TREE = {
+    "a.txt": b"alpha",
+    "sub/b.txt": b"bravo" * 100,
+    "sub/deep/c.txt": b"charlie",
+    "sub/deep/d.txt": b"",
+    "other/e.txt": b"echo",
+}
+
+
+class TestTransfers(unittest.TestCase):
+    def setUp(self):
+        self.fake, url, self.server = serve()
+        self.client = AGFSClient(url)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.local = os.path.join(self.tmp.name, "src")
+        for name, data in TREE.items():
+            path = os.path.join(self.local, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(data)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmp.cleanup()
+
+    def remote_tree(self, root):
+        return {p[len(root) + 1:]: d for p, d in self.fake.files.items() if p.startswith(root + "/")}
+
+    def local_tree(self, root):
+        tree = {}
+        for dirpath, _, names in os.walk(root):
+            for name in names:
+                with open(os.path.join(dirpath, name), "rb") as f:
+                    tree[os.path.relpath(os.path.join(dirpath, name), root)] = f.read()
+        return tree
+
+    def test_concurrent_upload_with_progress(self):
+        updates = []
+        summary = upload(self.client, self.local, "/dst", recursive=True, concurrency=4,
+                         progress=lambda p: updates.append((p.files_done, p.files_total, p.bytes_done)))
+        self.assertEqual(self.remote_tree("/dst"), TREE)
+        self.assertTrue(summary.ok)
+        self.assertEqual(summary.files, len(TREE))
+        self.assertEqual(summary.bytes, sum(len(d) for d in TREE.values()))
+        self.assertEqual(sorted(u[0] for u in updates), list(range(1, len(TREE) + 1)))
+        self.assertTrue(all(u[1] == len(TREE) for u in updates))
+        # Each remote directory is created once, however many workers need it
+        created = [params["path"] for method, endpoint, params in self.fake.requests
+                   if (method, endpoint) == ("POST", "directories")]
+        self.assertEqual(sorted(created), sorted(set(created)))
+
+    def test_streaming_upload(self):
+        upload(self.client, self.local, "/dst", recursive=True, stream=True, concurrency=2)
+        self.assertEqual(self.remote_tree("/dst"), TREE)
+
+    def test_concurrent_download_and_copy(self):
+        upload(self.client, self.local, "/src", recursive=True, concurrency=4)
+        summary = cp(self.client, "/src", "/copy", recursive=True, concurrency=4)
+        self.assertEqual(summary.files, len(TREE))
+        self.assertEqual(self.remote_tree("/copy"), TREE)
+        out = os.path.join(self.tmp.name, "out")
+        summary = download(self.client, "/copy", out, recursive=True, concurrency=4)
+        self.assertTrue(summary.ok)
+        self.assertEqual(self.local_tree(out), TREE)
+
+    def test_failed_files_are_summarized_and_the_rest_transferred(self):
+        self.fake.fail("PUT", "files", 500)
+        with self.assertRaises(AGFSTransferError) as caught:
+            upload(self.client, self.local, "/dst", recursive=True, concurrency=4)
+        summary = caught.exception.summary
+        self.assertEqual(len(summary.failures), 1)
+        self.assertEqual(summary.files, len(TREE) - 1)
+        self.assertEqual(len(self.remote_tree("/dst")), len(TREE) - 1)
+
+    def test_single_file_failure_raises(self):
+        with self.assertRaises(AGFSClientError):
+            download(self.client, "/missing", os.path.join(self.tmp.name, "x"))
+
+    def test_directory_requires_recursive(self):
+        with self.assertRaises(ValueError):
+            upload(self.client, self.local, "/dst")
+
+
+if __name__ == '__main__':
+    unittest.main()
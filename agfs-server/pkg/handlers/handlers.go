@@ -3,6 +3,7 @@ package handlers
 import (
 	"bufio"
 	"bytes"
+	"container/heap"
 	"crypto/md5"
 	"encoding/hex"
 	"encoding/json"
@@ -12,6 +13,7 @@ import (
 	"net/http"
 	"path/filepath"
 	"regexp"
+	"sort"
 	"strconv"
 	"time"
 
@@ -67,7 +69,8 @@ type FileInfoResponse struct {
 
 // ListResponse represents directory listing response
 type ListResponse struct {
-	Files []FileInfoResponse `json:"files"`
+	Files      []FileInfoResponse `json:"files"`
+	NextCursor string             `json:"nextCursor,omitempty"` // Set when more pages follow
 }
 
 // WriteRequest represents a write request
@@ -278,13 +281,29 @@ func (h *Handler) Delete(w http.ResponseWriter, r *http.Request) {
 	writeJSON(w, http.StatusOK, SuccessResponse{Message: "deleted"})
 }
 
-// ListDirectory handles GET /directories?path=<path>
+// ListDirectory handles GET /directories?path=<path>&limit=<limit>&cursor=<cursor>
+//
+// Without limit and cursor the whole directory is returned in the order the
+// filesystem reports it. With either of them entries are sorted by name and
+// at most limit entries after cursor are returned; nextCursor is set to the
+// cursor for the following page when more entries remain.
 func (h *Handler) ListDirectory(w http.ResponseWriter, r *http.Request) {
 	path := r.URL.Query().Get("path")
 	if path == "" {
 		path = "/"
 	}
 
+	limit := 0
+	if limitStr := r.URL.Query().Get("limit"); limitStr != "" {
+		parsedLimit, err := strconv.Atoi(limitStr)
+		if err != nil || parsedLimit < 0 {
+			writeError(w, http.StatusBadRequest, "invalid limit parameter")
+			return
+		}
+		limit = parsedLimit
+	}
+	cursor := r.URL.Query().Get("cursor")
+
 	files, err := h.fs.ReadDir(path)
 	if err != nil {
 		// Map error to appropriate HTTP status code
@@ -294,6 +313,10 @@ func (h *Handler) ListDirectory(w http.ResponseWriter, r *http.Request) {
 	}
 
 	var response ListResponse
+	if limit > 0 || cursor != "" {
+		// Cursors are entry names, so pages stay consistent when entries are added or removed in between
+		files, response.NextCursor = pageAfter(files, cursor, limit)
+	}
 	for _, f := range files {
 		response.Files = append(response.Files, FileInfoResponse{
 			Name:    f.Name,
@@ -308,6 +331,73 @@ func (h *Handler) ListDirectory(w http.ResponseWriter, r *http.Request) {
 	writeJSON(w, http.StatusOK, response)
 }
 
+// nameMaxHeap implements heap.Interface with the largest name on top
+type nameMaxHeap []filesystem.FileInfo
+
+func (h nameMaxHeap) Len() int           { return len(h) }
+func (h nameMaxHeap) Less(i, j int) bool { return h[i].Name > h[j].Name }
+func (h nameMaxHeap) Swap(i, j int)      { h[i], h[j] = h[j], h[i] }
+
+func (h *nameMaxHeap) Push(x interface{}) {
+	*h = append(*h, x.(filesystem.FileInfo))
+}
+
+func (h *nameMaxHeap) Pop() interface{} {
+	old := *h
+	n := len(old)
+	item := old[n-1]
+	*h = old[:n-1]
+	return item
+}
+
+// pageAfter returns the entries named after cursor, sorted by name: at most
+// limit of them (all if limit is 0), plus the cursor of the next page when
+// more remain. A bounded heap keeps only the limit smallest names, so a page
+// costs O(n log limit) rather than sorting the whole directory every time.
+func pageAfter(files []filesystem.FileInfo, cursor string, limit int) ([]filesystem.FileInfo, string) {
+	if limit <= 0 {
+		page := make([]filesystem.FileInfo, 0, len(files))
+		for _, f := range files {
+			if f.Name > cursor {
+				page = append(page, f)
+			}
+		}
+		sort.Slice(page, func(i, j int) bool { return page[i].Name < page[j].Name })
+		return page, ""
+	}
+
+	capacity := limit
+	if capacity > len(files) {
+		capacity = len(files)
+	}
+	smallest := make(nameMaxHeap, 0, capacity)
+	more := false
+	for _, f := range files {
+		if f.Name <= cursor {
+			continue
+		}
+		if len(smallest) < limit {
+			heap.Push(&smallest, f)
+			continue
+		}
+		more = true
+		if f.Name < smallest[0].Name {
+			smallest[0] = f
+			heap.Fix(&smallest, 0)
+		}
+	}
+
+	// The heap pops the largest name first
+	page := make([]filesystem.FileInfo, len(smallest))
+	for i := len(page) - 1; i >= 0; i-- {
+		page[i] = heap.Pop(&smallest).(filesystem.FileInfo)
+	}
+	if more {
+		return page, page[len(page)-1].Name
+	}
+	return page, ""
+}
+
 // Stat handles GET /stat?path=<path>
 func (h *Handler) Stat(w http.ResponseWriter, r *http.Request) {
 	path := r.URL.Query().Get("path")
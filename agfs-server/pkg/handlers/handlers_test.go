@@ -0,0 +1,121 @@
+package handlers
+
+import (
+	"encoding/json"
+	"fmt"
+	"net/http"
+	"net/http/httptest"
+	"net/url"
+	"sort"
+	"testing"
+
+	"github.com/c4pt0r/agfs/agfs-server/pkg/filesystem"
+)
+
+// listFS serves a fixed directory listing; other FileSystem methods are not used
+type listFS struct {
+	filesystem.FileSystem
+	files []filesystem.FileInfo
+}
+
+func (fs *listFS) ReadDir(path string) ([]filesystem.FileInfo, error) {
+	if path != "/dir" {
+		return nil, filesystem.NewNotFoundError("readdir", path)
+	}
+	// The handler may reorder what it gets, like a real file system's fresh slice
+	return append([]filesystem.FileInfo(nil), fs.files...), nil
+}
+
+func unsortedFiles(n int) []filesystem.FileInfo {
+	files := make([]filesystem.FileInfo, n)
+	for i := range files {
+		// 7 is coprime with n in the tests, so this visits every name once, out of order
+		files[i] = filesystem.FileInfo{Name: fmt.Sprintf("f%03d", (i*7)%n)}
+	}
+	return files
+}
+
+func names(files []filesystem.FileInfo) []string {
+	out := make([]string, len(files))
+	for i, f := range files {
+		out[i] = f.Name
+	}
+	return out
+}
+
+func TestPageAfter(t *testing.T) {
+	files := unsortedFiles(10)
+	var got []string
+	cursor := ""
+	for pages := 0; ; pages++ {
+		if pages > 10 {
+			t.Fatal("pagination did not terminate")
+		}
+		page, next := pageAfter(files, cursor, 3)
+		if len(page) > 3 {
+			t.Fatalf("page has %d entries, limit is 3", len(page))
+		}
+		got = append(got, names(page)...)
+		if next == "" {
+			break
+		}
+		if next != page[len(page)-1].Name {
+			t.Fatalf("next cursor %q is not the last name of the page", next)
+		}
+		cursor = next
+	}
+	want := names(unsortedFiles(10))
+	sort.Strings(want)
+	if fmt.Sprint(got) != fmt.Sprint(want) {
+		t.Fatalf("pages = %v, want %v", got, want)
+	}
+
+	page, next := pageAfter(files, "f006", 0)
+	if fmt.Sprint(names(page)) != "[f007 f008 f009]" || next != "" {
+		t.Fatalf("cursor without limit = %v, %q", names(page), next)
+	}
+	page, next = pageAfter(files, "", 1000)
+	if len(page) != 10 || next != "" {
+		t.Fatalf("limit above size = %d entries, next %q", len(page), next)
+	}
+	page, next = pageAfter(files, "f009", 3)
+	if len(page) != 0 || next != "" {
+		t.Fatalf("cursor past the end = %v, %q", names(page), next)
+	}
+}
+
+func TestListDirectoryPagination(t *testing.T) {
+	h := NewHandler(&listFS{files: unsortedFiles(5)})
+
+	list := func(query url.Values) (int, ListResponse) {
+		req := httptest.NewRequest(http.MethodGet, "/api/v1/directories?"+query.Encode(), nil)
+		rec := httptest.NewRecorder()
+		h.ListDirectory(rec, req)
+		var resp ListResponse
+		if rec.Code == http.StatusOK {
+			if err := json.Unmarshal(rec.Body.Bytes(), &resp); err != nil {
+				t.Fatalf("decode response: %v", err)
+			}
+		}
+		return rec.Code, resp
+	}
+
+	code, resp := list(url.Values{"path": {"/dir"}, "limit": {"2"}})
+	if code != http.StatusOK || len(resp.Files) != 2 || resp.Files[0].Name != "f000" || resp.NextCursor != "f001" {
+		t.Fatalf("first page: %d %+v", code, resp)
+	}
+	code, resp = list(url.Values{"path": {"/dir"}, "limit": {"2"}, "cursor": {"f003"}})
+	if code != http.StatusOK || len(resp.Files) != 1 || resp.Files[0].Name != "f004" || resp.NextCursor != "" {
+		t.Fatalf("last page: %d %+v", code, resp)
+	}
+	code, resp = list(url.Values{"path": {"/dir"}})
+	if code != http.StatusOK || len(resp.Files) != 5 || resp.NextCursor != "" {
+		t.Fatalf("unpaginated listing: %d %+v", code, resp)
+	}
+	if code, _ = list(url.Values{"path": {"/dir"}, "limit": {"-1"}}); code != http.StatusBadRequest {
+		t.Fatalf("negative limit: status %d, want 400", code)
+	}
+	if code, _ = list(url.Values{"path": {"/missing"}, "limit": {"2"}}); code != http.StatusNotFound {
+		t.Fatalf("missing directory: status %d, want 404", code)
+	}
+}
@@ -1,10 +1,17 @@
 """Built-in shell commands"""
 
+import heapq
 import re
 import os
-from typing import List
+from collections import Counter, deque
+from itertools import islice
+from operator import itemgetter
+from typing import List, Optional
+from pyagfs import AGFSTransferError, sync
 from .process import Process
 from .command_decorators import command
+from . import extsort
+from .streams import PipeInputStream, iter_lines
 
 
 def _mode_to_rwx(mode: int) -> str:
@@ -49,6 +56,16 @@ def cmd_cat(process: Process) -> int:
     import sys
 
     if not process.args:
+        if isinstance(process.stdin, PipeInputStream):
+            # Stream from the previous command in the pipeline
+            while True:
+                chunk = process.stdin.read(8192)
+                if not chunk:
+                    break
+                process.stdout.write(chunk)
+                process.stdout.flush()
+            return 0
+
         # Read from stdin in chunks
         # Check if process.stdin has real data or if we should read from real stdin
         stdin_value = process.stdin.get_value()
@@ -84,6 +101,10 @@ def cmd_cat(process: Process) -> int:
                     except KeyboardInterrupt:
                         process.stderr.write(b"\ncat: interrupted\n")
                         return 130
+                    finally:
+                        # Stop the download if the reader went away (broken pipe)
+                        if hasattr(stream, 'close'):
+                            stream.close()
                 else:
                     # Fallback to local filesystem
                     with open(filename, 'rb') as f:
@@ -93,6 +114,8 @@ def cmd_cat(process: Process) -> int:
                                 break
                             process.stdout.write(chunk)
                             process.stdout.flush()
+            except BrokenPipeError:
+                raise
             except Exception as e:
                 # Extract meaningful error message
                 error_msg = str(e)
@@ -199,19 +222,17 @@ def cmd_grep(process: Process) -> int:
         # Read from files
         for filepath in files:
             try:
-                # Read file content
-                content = process.filesystem.read_file(filepath)
-                if isinstance(content, bytes):
-                    content = content.decode('utf-8')
-
-                # Create a file-like object for the content
-                from io import StringIO
-                file_obj = StringIO(content)
-
-                matched = _grep_search(
-                    process, regex, filepath, invert_match, show_line_numbers,
-                    count_only, files_only, show_filename, file_obj
-                )
+                # Stream the file line by line; closing the stream stops the
+                # download early (grep -l, or a broken pipe)
+                stream = process.filesystem.read_file(filepath, stream=True)
+                try:
+                    matched = _grep_search(
+                        process, regex, filepath, invert_match, show_line_numbers,
+                        count_only, files_only, show_filename, iter_lines(stream)
+                    )
+                finally:
+                    if hasattr(stream, 'close'):
+                        stream.close()
 
                 if matched:
                     total_matched = True
@@ -221,6 +242,8 @@ def cmd_grep(process: Process) -> int:
 
             except FileNotFoundError:
                 process.stderr.write(f"grep: {filepath}: No such file or directory\n")
+            except BrokenPipeError:
+                raise
             except Exception as e:
                 process.stderr.write(f"grep: {filepath}: {e}\n")
 
@@ -228,18 +251,17 @@ def cmd_grep(process: Process) -> int:
 
 
 def _grep_search(process, regex, filename, invert_match, show_line_numbers,
-                 count_only, files_only, show_filename, file_obj=None):
+                 count_only, files_only, show_filename, lines=None):
     """
     Helper function to search for pattern in a file or stdin
 
+    Lines are consumed one at a time, so output starts (and a broken pipe
+    can stop us) before the whole input has arrived.
+
     Returns True if any matches found, False otherwise
     """
-    if file_obj is None:
-        # Read from stdin
-        lines = process.stdin.readlines()
-    else:
-        # Read from file object
-        lines = file_obj.readlines()
+    if lines is None:
+        lines = process.stdin.iter_lines()
 
     match_count = 0
     line_number = 0
@@ -322,12 +344,17 @@ def cmd_wc(process: Process) -> int:
             if 'c' in flag:
                 count_bytes = True
 
-    # Read all data from stdin
-    data = process.stdin.read()
-
-    lines = data.count(b'\n')
-    words = len(data.split())
-    bytes_count = len(data)
+    # Count chunk by chunk; a word split across two chunks is counted once
+    lines = words = bytes_count = 0
+    in_word = False
+    for chunk in process.stdin.iter_chunks():
+        lines += chunk.count(b'\n')
+        bytes_count += len(chunk)
+        chunk_words = len(chunk.split())
+        if chunk_words and in_word and not chunk[:1].isspace():
+            chunk_words -= 1
+        words += chunk_words
+        in_word = not chunk[-1:].isspace()
 
     result = []
     if count_lines:
@@ -366,9 +393,18 @@ def cmd_head(process: Process) -> int:
                 return 1
         i += 1
 
-    # Read lines from stdin
-    lines = process.stdin.readlines()
-    for line in lines[:n]:
+    if n < 0:
+        # All but the last -n lines: hold back only that many
+        held = deque()
+        for line in process.stdin.iter_lines():
+            held.append(line)
+            if len(held) > -n:
+                process.stdout.write(held.popleft())
+        return 0
+
+    # Read only the lines we print; once we return, the pipeline closes our
+    # input and upstream commands stop with a broken pipe
+    for line in islice(process.stdin.iter_lines(), n):
         process.stdout.write(line)
 
     return 0
@@ -397,9 +433,13 @@ def cmd_tail(process: Process) -> int:
                 return 1
         i += 1
 
-    # Read lines from stdin
-    lines = process.stdin.readlines()
-    for line in lines[-n:]:
+    if n < 0:
+        # Everything after the first -n lines
+        lines = islice(process.stdin.iter_lines(), -n, None)
+    else:
+        # Keep only the last n lines in memory
+        lines = deque(process.stdin.iter_lines(), maxlen=n)
+    for line in lines:
         process.stdout.write(line)
 
     return 0
@@ -410,16 +450,78 @@ def cmd_sort(process: Process) -> int:
     """
     Sort lines of text
 
-    Usage: sort [-r]
+    Usage: sort [OPTIONS]
+
+    Options:
+        -r              Reverse the result of comparisons
+        -n              Compare according to leading numeric value
+        -u              Output only the first of lines with equal keys
+        -k POS1[,POS2]  Sort by fields POS1 to POS2 (default: end of line);
+                        POS is F[.C] counted from 1, followed by n or r
+        -t SEP          Use SEP as field separator (default: runs of blanks)
+        -S SIZE         Memory buffer size: number with b, K (default), M, G or %
+        -T DIR          Directory for temporary files (default: $TMPDIR)
+        --parallel=N    Sort up to N runs at once in worker processes
+
+    Input larger than the buffer is sorted in runs that are spilled to
+    temporary files and merged, so memory use stays bounded.
+
+    Examples:
+        sort -n numbers.txt
+        sort -t, -k2,2 -k3nr data.csv     # By column 2, then column 3 descending
+        cat big.log | sort -u -S 256M
     """
-    reverse = '-r' in process.args
+    spec = extsort.SortSpec()
+    buffer_size = extsort.DEFAULT_BUFFER_SIZE
+    parallel = None
+    tmpdir = None
 
-    # Read lines from stdin
-    lines = process.stdin.readlines()
-    lines.sort(reverse=reverse)
+    args = process.args[:]
+    i = 0
+    try:
+        while i < len(args):
+            arg = args[i]
+            if arg.startswith('--parallel='):
+                parallel = int(arg[len('--parallel='):])
+                if parallel < 1:
+                    raise ValueError(f"invalid number of threads: {arg}")
+            elif arg[:2] in ('-k', '-t', '-S', '-T'):
+                if len(arg) > 2:
+                    value = arg[2:]
+                elif i + 1 < len(args):
+                    i += 1
+                    value = args[i]
+                else:
+                    raise ValueError(f"option requires an argument -- '{arg[1]}'")
+                if arg[1] == 'k':
+                    spec.keys.append(extsort.KeySpec.parse(value))
+                elif arg[1] == 't':
+                    if len(value) != 1:
+                        raise ValueError("separator must be a single character")
+                    spec.separator = value.encode('utf-8')
+                elif arg[1] == 'S':
+                    buffer_size = extsort.parse_buffer_size(value)
+                else:
+                    tmpdir = value
+            elif arg.startswith('-') and len(arg) > 1 and all(c in 'rnu' for c in arg[1:]):
+                spec.reverse = spec.reverse or 'r' in arg
+                spec.numeric = spec.numeric or 'n' in arg
+                spec.unique = spec.unique or 'u' in arg
+            else:
+                raise ValueError(f"invalid option -- '{arg}'")
+            i += 1
+    except ValueError as e:
+        process.stderr.write(f"sort: {e}\n")
+        return 2
 
-    for line in lines:
-        process.stdout.write(line)
+    try:
+        extsort.external_sort(process.stdin.iter_lines(), process.stdout.write, spec,
+                              buffer_size=buffer_size, parallel=parallel, tmpdir=tmpdir)
+    except BrokenPipeError:
+        raise
+    except OSError as e:
+        process.stderr.write(f"sort: {e}\n")
+        return 2
 
     return 0
 
@@ -429,20 +531,149 @@ def cmd_uniq(process: Process) -> int:
     """
     Report or omit repeated lines
 
-    Usage: uniq
-    """
-    lines = process.stdin.readlines()
-    if not lines:
-        return 0
+    Usage: uniq [-c] [-d | -u]
 
-    prev_line = lines[0]
-    process.stdout.write(prev_line)
+    Options:
+        -c    Prefix lines by the number of occurrences
+        -d    Only print duplicate lines, one for each group
+        -u    Only print unique lines
 
-    for line in lines[1:]:
-        if line != prev_line:
+    Only adjacent lines are compared; use count to aggregate unsorted input.
+    """
+    show_counts = only_dups = only_uniques = False
+    for arg in process.args:
+        if arg.startswith('-') and len(arg) > 1 and all(c in 'cdu' for c in arg[1:]):
+            show_counts = show_counts or 'c' in arg
+            only_dups = only_dups or 'd' in arg
+            only_uniques = only_uniques or 'u' in arg
+        else:
+            process.stderr.write(f"uniq: invalid option -- '{arg}'\n")
+            return 1
+
+    def emit(line: bytes, count: int):
+        # line is the group's first line as read, with its own line ending
+        if (only_dups and count < 2) or (only_uniques and count > 1):
+            return
+        if show_counts:
+            process.stdout.write(f"{count:7d} ".encode() + line)
+        else:
             process.stdout.write(line)
-            prev_line = line
 
+    prev_line = prev_key = None
+    count = 0
+    for line in process.stdin.iter_lines():
+        # A last line without newline still matches the lines before it
+        key = line[:-1] if line.endswith(b'\n') else line
+        if key == prev_key:
+            count += 1
+            continue
+        if prev_line is not None:
+            emit(prev_line, count)
+        prev_line, prev_key = line, key
+        count = 1
+    if prev_line is not None:
+        emit(prev_line, count)
+
+    return 0
+
+
+def _count_lines(process: Process, top: Optional[int], by_line: bool, reverse: bool):
+    """Hash-aggregate stdin lines, returning (line, count) pairs in output order"""
+    counts = Counter(line[:-1] if line.endswith(b'\n') else line for line in process.stdin.iter_lines())
+    if top is not None:
+        # Bounded heap: O(distinct lines * log top); ties keep first-seen order
+        select = heapq.nsmallest if reverse and not by_line else heapq.nlargest
+        items = select(top, counts.items(), key=itemgetter(1))
+    else:
+        items = sorted(counts.items(), key=itemgetter(1), reverse=not reverse)
+    if by_line:
+        items.sort(reverse=reverse)
+    return items
+
+
+def _write_counts(process: Process, items) -> None:
+    for start in range(0, len(items), 1024):
+        process.stdout.write(b''.join(
+            f"{count:7d} ".encode() + line + b'\n' for line, count in items[start:start + 1024]
+        ))
+
+
+@command()
+def cmd_count(process: Process) -> int:
+    """
+    Count occurrences of each distinct line
+
+    Usage: count [-n N] [-s] [-r]
+
+    Options:
+        -n N    Only the N most frequent lines
+        -s      Order by line instead of by count (output of sort | uniq -c)
+        -r      Reverse the order
+
+    Lines are counted in a hash table, so the input is never sorted and memory
+    grows with the number of distinct lines only. Most frequent lines come
+    first; lines with equal counts keep the order they first appeared in.
+
+    Examples:
+        cat access.log | cut -d' ' -f1 | count -n 10
+        cat words.txt | count -s
+    """
+    top = None
+    by_line = reverse = False
+    args = process.args[:]
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        if arg == '-n' and i + 1 < len(args):
+            value = args[i + 1]
+            i += 1
+        elif arg.startswith('-n') and len(arg) > 2:
+            value = arg[2:]
+        elif arg.startswith('-') and len(arg) > 1 and all(c in 'sr' for c in arg[1:]):
+            by_line = by_line or 's' in arg
+            reverse = reverse or 'r' in arg
+            i += 1
+            continue
+        else:
+            process.stderr.write(f"count: invalid option -- '{arg}'\n")
+            return 1
+        try:
+            top = int(value)
+            if top < 0:
+                raise ValueError
+        except ValueError:
+            process.stderr.write(f"count: invalid number of lines: '{value}'\n")
+            return 1
+        i += 1
+
+    _write_counts(process, _count_lines(process, top, by_line, reverse))
+    return 0
+
+
+@command()
+def cmd_topk(process: Process) -> int:
+    """
+    Print the most frequent lines with their counts
+
+    Usage: topk [N]
+
+    Same as count -n N (default 10): a single pass with a bounded heap instead
+    of sort | uniq -c | sort -rn | head -n N.
+    """
+    if len(process.args) > 1:
+        process.stderr.write("topk: too many arguments\n")
+        return 1
+    top = 10
+    if process.args:
+        try:
+            top = int(process.args[0])
+            if top < 0:
+                raise ValueError
+        except ValueError:
+            process.stderr.write(f"topk: invalid number of lines: '{process.args[0]}'\n")
+            return 1
+
+    _write_counts(process, _count_lines(process, top, by_line=False, reverse=False))
     return 0
 
 
@@ -467,10 +698,9 @@ def cmd_tr(process: Process) -> int:
     # Create translation table
     trans = bytes.maketrans(set1, set2)
 
-    # Read and translate
-    data = process.stdin.read()
-    translated = data.translate(trans)
-    process.stdout.write(translated)
+    # Translate chunk by chunk
+    for chunk in process.stdin.iter_chunks():
+        process.stdout.write(chunk.translate(trans))
 
     return 0
 
@@ -1012,7 +1242,7 @@ def cmd_jq(process: Process) -> int:
     """
     try:
         import jq as jq_lib
-        import json
+        from pyagfs import codec
     except ImportError:
         process.stderr.write("jq: jq library not installed (run: uv pip install jq)\n")
         return 1
@@ -1040,18 +1270,14 @@ def cmd_jq(process: Process) -> int:
         # Read from files
         for filepath in input_files:
             try:
-                # Read file content
+                # Read file content and parse it as JSON without decoding to str first
                 content = process.filesystem.read_file(filepath)
-                if isinstance(content, bytes):
-                    content = content.decode('utf-8')
-
-                # Parse JSON
-                data = json.loads(content)
+                data = codec.loads(content)
                 json_data.append(data)
             except FileNotFoundError:
                 process.stderr.write(f"jq: {filepath}: No such file or directory\n")
                 return 1
-            except json.JSONDecodeError as e:
+            except ValueError as e:
                 process.stderr.write(f"jq: {filepath}: parse error: {e}\n")
                 return 1
             except Exception as e:
@@ -1060,17 +1286,15 @@ def cmd_jq(process: Process) -> int:
     else:
         # Read from stdin
         stdin_data = process.stdin.read()
-        if isinstance(stdin_data, bytes):
-            stdin_data = stdin_data.decode('utf-8')
 
         if not stdin_data.strip():
             process.stderr.write("jq: no input\n")
             return 1
 
         try:
-            data = json.loads(stdin_data)
+            data = codec.loads(stdin_data)
             json_data.append(data)
-        except json.JSONDecodeError as e:
+        except ValueError as e:
             process.stderr.write(f"jq: parse error: {e}\n")
             return 1
 
@@ -1083,10 +1307,12 @@ def cmd_jq(process: Process) -> int:
             # Output results
             for result in results:
                 # Pretty print JSON output
-                output = json.dumps(result, indent=2, ensure_ascii=False)
+                output = codec.dumps(result, indent=2)
                 process.stdout.write(output + '\n')
 
         return 0
+    except BrokenPipeError:
+        raise
     except Exception as e:
         process.stderr.write(f"jq: filter error: {e}\n")
         return 1
@@ -1415,6 +1641,89 @@ def _download_dir(process: Process, agfs_path: str, local_path: str) -> int:
         return 1
 
 
+@command()
+def cmd_sync(process: Process) -> int:
+    """
+    Mirror a directory between the local filesystem and AGFS, sending only changes
+
+    Usage: sync [-n] [--delete] [-j N] <source> <dest>
+
+    Exactly one of source and dest must be a local path, prefixed with local:
+    (as in cp). Files whose size and mtime match the previous sync are skipped
+    without contacting the server; files of equal size are compared by digest.
+
+    Options:
+        -n          Dry run: show what would be transferred or deleted
+        --delete    Remove destination files that don't exist at the source
+        -j N        Number of parallel transfers (default: 8)
+
+    Examples:
+        sync local:./site /s3/www              # Push changes
+        sync --delete /s3/www local:./backup   # Pull, removing stale local files
+    """
+    dry_run = False
+    delete = False
+    concurrency = 8
+    args = []
+    argv = process.args[:]
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        if arg == '-n':
+            dry_run = True
+        elif arg == '--delete':
+            delete = True
+        elif arg == '-j':
+            if i + 1 >= len(argv) or not argv[i + 1].isdigit() or int(argv[i + 1]) < 1:
+                process.stderr.write("sync: -j requires a positive number\n")
+                return 1
+            concurrency = int(argv[i + 1])
+            i += 1
+        else:
+            args.append(arg)
+        i += 1
+
+    if len(args) != 2 or args[0].startswith('local:') == args[1].startswith('local:'):
+        process.stderr.write("sync: usage: sync [-n] [--delete] [-j N] <source> <dest> "
+                             "(one side prefixed with local:)\n")
+        return 1
+
+    if args[0].startswith('local:'):
+        direction, local_path, agfs_path = 'push', args[0][6:], args[1]
+    else:
+        direction, local_path, agfs_path = 'pull', args[1][6:], args[0]
+
+    # Resolve agfs_path relative to current working directory
+    if not agfs_path.startswith('/'):
+        agfs_path = os.path.join(process.cwd, agfs_path)
+        agfs_path = os.path.normpath(agfs_path)
+    local_path = os.path.expanduser(local_path)
+
+    try:
+        summary = sync(process.filesystem.client, local_path, agfs_path, direction,
+                       delete=delete, concurrency=concurrency, dry_run=dry_run)
+        exit_code = 0
+    except AGFSTransferError as e:
+        summary = e.summary
+        exit_code = 1
+    except Exception as e:
+        process.stderr.write(f"sync: {str(e)}\n")
+        return 1
+
+    verb = 'would send' if dry_run else ('sent' if direction == 'push' else 'received')
+    for rel in summary.transferred:
+        process.stdout.write(f"{verb} {rel}\n")
+    for rel in summary.deleted:
+        process.stdout.write(f"{'would delete' if dry_run else 'deleted'} {rel}\n")
+    for path, error in summary.failures:
+        process.stderr.write(f"sync: {path}: {error}\n")
+    process.stdout.write(
+        f"{len(summary.transferred)} transferred ({summary.bytes} bytes), "
+        f"{summary.unchanged} unchanged, {len(summary.deleted)} deleted\n"
+    )
+    return exit_code
+
+
 @command()
 def cmd_cp(process: Process) -> int:
     """
@@ -1886,14 +2195,8 @@ def cmd_rev(process: Process) -> int:
         echo 'abc:def' | rev            # Output: fed:cba
         ls -l | rev | cut -d' ' -f1 | rev  # Extract filenames from ls -l
     """
-    lines = process.stdin.readlines()
-
-    for line in lines:
-        # Handle both str and bytes
-        if isinstance(line, bytes):
-            line_str = line.decode('utf-8', errors='replace')
-        else:
-            line_str = line
+    for line in process.stdin.iter_lines():
+        line_str = line.decode('utf-8', errors='replace')
 
         # Remove trailing newline, reverse, add newline back
         line_clean = line_str.rstrip('\n\r')
@@ -2044,14 +2347,8 @@ def _cut_fields(process: Process, field_ranges: List, delimiter: str) -> int:
     """
     Cut fields from input lines based on field ranges
     """
-    lines = process.stdin.readlines()
-
-    for line in lines:
-        # Handle both str and bytes
-        if isinstance(line, bytes):
-            line_str = line.decode('utf-8', errors='replace').rstrip('\n\r')
-        else:
-            line_str = line.rstrip('\n\r')
+    for line in process.stdin.iter_lines():
+        line_str = line.decode('utf-8', errors='replace').rstrip('\n\r')
 
         # Split line by delimiter
         fields = line_str.split(delimiter)
@@ -2085,14 +2382,8 @@ def _cut_chars(process: Process, char_ranges: List) -> int:
     """
     Cut characters from input lines based on character ranges
     """
-    lines = process.stdin.readlines()
-
-    for line in lines:
-        # Handle both str and bytes
-        if isinstance(line, bytes):
-            line_str = line.decode('utf-8', errors='replace').rstrip('\n\r')
-        else:
-            line_str = line.rstrip('\n\r')
+    for line in process.stdin.iter_lines():
+        line_str = line.decode('utf-8', errors='replace').rstrip('\n\r')
 
         # Extract selected characters
         output_chars = []
@@ -2666,8 +2957,8 @@ def cmd_help(process: Process) -> int:
 
         # Group commands by category for better organization
         categories = {
-            'File Operations': ['ls', 'tree', 'cat', 'mkdir', 'rm', 'mv', 'cp', 'stat', 'upload', 'download'],
-            'Text Processing': ['grep', 'wc', 'head', 'tail', 'sort', 'uniq', 'tr', 'rev', 'cut', 'jq'],
+            'File Operations': ['ls', 'tree', 'cat', 'mkdir', 'rm', 'mv', 'cp', 'stat', 'upload', 'download', 'sync'],
+            'Text Processing': ['grep', 'wc', 'head', 'tail', 'sort', 'uniq', 'count', 'topk', 'tr', 'rev', 'cut', 'jq'],
             'System': ['pwd', 'cd', 'echo', 'env', 'export', 'unset', 'sleep'],
             'Testing': ['test'],
             'AGFS Management': ['mount', 'plugins'],
@@ -2872,6 +3163,8 @@ BUILTINS = {
     'tail': cmd_tail,
     'sort': cmd_sort,
     'uniq': cmd_uniq,
+    'count': cmd_count,
+    'topk': cmd_topk,
     'tr': cmd_tr,
     'rev': cmd_rev,
     'cut': cmd_cut,
@@ -2893,6 +3186,7 @@ BUILTINS = {
     'upload': cmd_upload,
     'download': cmd_download,
     'cp': cmd_cp,
+    'sync': cmd_sync,
     'sleep': cmd_sleep,
     'plugins': cmd_plugins,
     'mount': cmd_mount,
@@ -0,0 +1,356 @@
+"""External merge sort for the sort builtin
+
+Input that fits in the sort buffer is sorted in memory. Larger input is cut
+into runs sharing the buffer; each run is sorted (in worker processes when
+there are several CPUs) and spilled to a temporary file, and the runs are
+then k-way merged with heapq.merge, reading every run sequentially. Memory stays bounded by the buffer size whatever the input.
+
+Lines are compared as bytes, like sort in the C locale.
+"""
+
+import heapq
+import os
+import re
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Iterable, Iterator, List, Optional
+
+# Default for -S
+DEFAULT_BUFFER_SIZE = 64 * 1024 * 1024
+# Output is written in batches of about this many bytes
+_WRITE_BATCH = 64 * 1024
+# Runs merged at once; more runs are first merged into intermediate runs
+MERGE_FAN_IN = 256
+# Rough per-line overhead of a bytes object in a list, counted against the buffer
+_LINE_OVERHEAD = 40
+
+_NUMBER = re.compile(rb'\s*(-?(?:\d+(?:\.\d*)?|\.\d+))')
+_SIZE = re.compile(r'^(\d+)([bKMGT%]?)$')
+_UNITS = {'b': 1, '': 1024, 'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3, 'T': 1024 ** 4}
+
+
+class KeySpec:
+    """One -k FIELD[.CHAR][,FIELD[.CHAR]][n][r] sort key (1-based, end inclusive)"""
+
+    __slots__ = ("start_field", "start_char", "end_field", "end_char", "numeric", "reverse")
+
+    def __init__(self, start_field: int, start_char: int = 1, end_field: Optional[int] = None,
+                 end_char: int = 0, numeric: bool = False, reverse: bool = False):
+        self.start_field = start_field
+        self.start_char = start_char
+        self.end_field = end_field
+        self.end_char = end_char
+        self.numeric = numeric
+        self.reverse = reverse
+
+    @classmethod
+    def parse(cls, text: str) -> "KeySpec":
+        """Parse a -k argument such as "2", "2,2", "3n", "1.2,1.4r"
+
+        Raises:
+            ValueError: If the specification is invalid
+        """
+        match = re.fullmatch(r'(\d+)(?:\.(\d+))?([nr]*)(?:,(\d+)(?:\.(\d+))?([nr]*))?', text)
+        if not match:
+            raise ValueError(f"invalid key specification: {text}")
+        start_field, start_char, flags1, end_field, end_char, flags2 = match.groups()
+        flags = flags1 + (flags2 or '')
+        spec = cls(int(start_field), int(start_char or 1), int(end_field) if end_field else None,
+                   int(end_char or 0), 'n' in flags, 'r' in flags)
+        if spec.start_field < 1 or spec.start_char < 1 or (spec.end_field is not None and spec.end_field < 1):
+            raise ValueError(f"fields and positions are numbered from 1: {text}")
+        return spec
+
+
+class SortSpec:
+    """Everything that decides the order of lines; picklable for worker processes"""
+
+    __slots__ = ("keys", "separator", "numeric", "reverse", "unique")
+
+    def __init__(self, keys: Optional[List[KeySpec]] = None, separator: Optional[bytes] = None,
+                 numeric: bool = False, reverse: bool = False, unique: bool = False):
+        self.keys = keys or []
+        self.separator = separator
+        self.numeric = numeric
+        self.reverse = reverse
+        self.unique = unique
+
+    def __getstate__(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+
+
+def parse_buffer_size(text: str) -> int:
+    """Parse a -S argument: a number with an optional b, K (default), M, G, T or % suffix
+
+    Raises:
+        ValueError: If the size is invalid
+    """
+    match = _SIZE.match(text)
+    if not match:
+        raise ValueError(f"invalid buffer size: {text}")
+    number, unit = int(match.group(1)), match.group(2)
+    if unit == '%':
+        try:
+            total = os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+        except (ValueError, OSError, AttributeError):
+            raise ValueError(f"cannot determine memory size for: {text}")
+        return max(1, total * number // 100)
+    return max(1, number * _UNITS[unit])
+
+
+class _Reversed:
+    """Sort key wrapper inverting the order of one key (-k...r)"""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __lt__(self, other):
+        return other.value < self.value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+
+def _number(text: bytes):
+    match = _NUMBER.match(text)
+    if not match:
+        return 0
+    number = match.group(1)
+    return float(number) if b'.' in number else int(number)
+
+
+def _field_key(line: bytes, key: KeySpec, separator: Optional[bytes]) -> bytes:
+    fields = line.split(separator) if separator is not None else line.split()
+    if key.start_field > len(fields):
+        return b''
+    end_field = min(key.end_field or len(fields), len(fields))
+    if end_field < key.start_field:
+        return b''
+    joiner = separator if separator is not None else b' '
+    selected = fields[key.start_field - 1:end_field]
+    if key.end_char and key.end_field is not None and key.end_field <= len(fields):
+        selected[-1] = selected[-1][:key.end_char]
+    selected[0] = selected[0][key.start_char - 1:]
+    return joiner.join(selected)
+
+
+def make_key(spec: SortSpec) -> Optional[Callable[[bytes], object]]:
+    """Key function for lines (without newline), or None to compare lines as they are"""
+    if not spec.keys:
+        if not spec.numeric:
+            return None
+        if spec.unique:
+            return _number
+        return lambda line: (_number(line), line)
+
+    parts = []
+    for key in spec.keys:
+        numeric = key.numeric or spec.numeric
+        part = (lambda line, key=key: _number(_field_key(line, key, spec.separator))) if numeric \
+            else (lambda line, key=key: _field_key(line, key, spec.separator))
+        if key.reverse:
+            part = (lambda line, part=part: _Reversed(part(line)))
+        parts.append(part)
+
+    if spec.unique:
+        # Lines with equal keys are duplicates, so there is no last-resort comparison
+        return lambda line: tuple(part(line) for part in parts)
+    # Otherwise lines with equal keys are ordered by their whole content
+    return lambda line: tuple(part(line) for part in parts) + (line,)
+
+
+def _unique(lines: Iterable[bytes], key: Optional[Callable]) -> Iterator[bytes]:
+    """Keep the first of each run of lines with equal keys"""
+    previous = _MISSING = object()
+    for line in lines:
+        current = key(line) if key is not None else line
+        if previous is _MISSING or not current == previous:
+            yield line
+            previous = current
+
+
+def _sorted_run(lines: List[bytes], spec: SortSpec) -> List[bytes]:
+    key = make_key(spec)
+    lines.sort(key=key, reverse=spec.reverse)
+    return list(_unique(lines, key)) if spec.unique else lines
+
+
+def _spill_run(lines: List[bytes], spec: SortSpec, path: str) -> str:
+    """Sort one run and write it to path; runs in worker processes"""
+    lines = _sorted_run(lines, spec)
+    with open(path, 'wb') as f:
+        for start in range(0, len(lines), 4096):
+            f.write(b'\n'.join(lines[start:start + 4096]) + b'\n')
+    return path
+
+
+def _read_run(path: str) -> Iterator[bytes]:
+    with open(path, 'rb', buffering=1024 * 1024) as f:
+        for line in f:
+            yield line[:-1]
+
+
+def _merge_runs(paths: List[str], spec: SortSpec) -> Iterator[bytes]:
+    key = make_key(spec)
+    merged = heapq.merge(*(_read_run(path) for path in paths), key=key, reverse=spec.reverse)
+    return _unique(merged, key) if spec.unique else merged
+
+
+def _write_lines(lines: Iterable[bytes], write: Callable[[bytes], object]) -> None:
+    batch = []
+    size = 0
+    for line in lines:
+        batch.append(line)
+        size += len(line) + 1
+        if size >= _WRITE_BATCH:
+            batch.append(b'')
+            write(b'\n'.join(batch))
+            batch = []
+            size = 0
+    if batch:
+        batch.append(b'')
+        write(b'\n'.join(batch))
+
+
+def _make_pool(workers: int) -> Optional[ProcessPoolExecutor]:
+    if workers <= 1:
+        return None
+    try:
+        import multiprocessing
+        # spawn: forking a process that runs pipeline threads is not safe
+        return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+    except (ImportError, OSError, NotImplementedError, ValueError):
+        return None
+
+
+def external_sort(
+    lines: Iterable[bytes],
+    write: Callable[[bytes], object],
+    spec: SortSpec,
+    buffer_size: int = DEFAULT_BUFFER_SIZE,
+    parallel: Optional[int] = None,
+    tmpdir: Optional[str] = None,
+) -> int:
+    """Sort lines and write them, newline-terminated, through write
+
+    Args:
+        lines: Input lines; a trailing newline on each is ignored
+        write: Called with batches of output bytes
+        spec: Order of lines
+        buffer_size: Bytes of input held in memory at a time (-S)
+        parallel: Processes sorting runs (default: CPU count, at most 8)
+        tmpdir: Directory for temporary runs (default: $TMPDIR)
+
+    Returns:
+        Number of runs spilled to disk (0 when the input fit in memory)
+    """
+    if parallel is None:
+        parallel = min(os.cpu_count() or 1, 8)
+    parallel = max(1, parallel)
+    # Once spilling, sorting runs concurrently needs a buffer per run being
+    # sorted plus the one being filled, so the buffer is shared between them
+    run_size = max(1, buffer_size // (parallel + 1)) if parallel > 1 else buffer_size
+
+    run: List[bytes] = []
+    run_bytes = 0
+    # Input is held in memory until it outgrows the whole buffer
+    limit = buffer_size
+    run_paths: List[str] = []
+    workdir = None
+    pool = None
+    pending = []
+
+    def spill(lines: List[bytes]):
+        nonlocal workdir, pool
+        if workdir is None:
+            workdir = tempfile.mkdtemp(prefix='agfs-sort-', dir=tmpdir)
+            pool = _make_pool(parallel)
+        path = os.path.join(workdir, f'run-{len(run_paths):06d}')
+        run_paths.append(path)
+        # Bound memory: wait for the oldest run while parallel runs are in flight
+        if len(pending) >= parallel:
+            finish(*pending.pop(0))
+        if pool is None:
+            _spill_run(lines, spec, path)
+            return
+        pending.append((pool.submit(_spill_run, lines, spec, path), lines, path))
+
+    def split(lines: List[bytes]) -> Iterator[List[bytes]]:
+        """Cut the first, full buffer into runs of run_size"""
+        start = size = 0
+        for i, line in enumerate(lines):
+            size += len(line) + _LINE_OVERHEAD
+            if size >= run_size:
+                yield lines[start:i + 1]
+                start, size = i + 1, 0
+        if start < len(lines):
+            yield lines[start:]
+
+    def finish(future, lines, path):
+        nonlocal pool
+        try:
+            future.result()
+        except BrokenProcessPool:
+            # Workers could not start or died: sort the remaining runs here
+            if pool is not None:
+                pool.shutdown(wait=False)
+                pool = None
+            _spill_run(lines, spec, path)
+
+    try:
+        for line in lines:
+            if line.endswith(b'\n'):
+                line = line[:-1]
+            run.append(line)
+            run_bytes += len(line) + _LINE_OVERHEAD
+            if run_bytes >= limit:
+                if run_paths:
+                    spill(run)
+                else:
+                    for piece in split(run):
+                        spill(piece)
+                    limit = run_size
+                run = []
+                run_bytes = 0
+
+        if not run_paths:
+            _write_lines(_sorted_run(run, spec), write)
+            return 0
+
+        if run:
+            spill(run)
+            run = []
+        while pending:
+            finish(*pending.pop(0))
+        spilled = len(run_paths)
+
+        paths = list(run_paths)
+        while len(paths) > MERGE_FAN_IN:
+            merged_paths = []
+            for start in range(0, len(paths), MERGE_FAN_IN):
+                path = os.path.join(workdir, f'merge-{len(run_paths):06d}')
+                run_paths.append(path)
+                with open(path, 'wb', buffering=1024 * 1024) as f:
+                    _write_lines(_merge_runs(paths[start:start + MERGE_FAN_IN], spec), f.write)
+                for done in paths[start:start + MERGE_FAN_IN]:
+                    os.unlink(done)
+                merged_paths.append(path)
+            paths = merged_paths
+
+        _write_lines(_merge_runs(paths, spec), write)
+        return spilled
+    finally:
+        if pool is not None:
+            for future, _, _ in pending:
+                future.cancel()
+            pool.shutdown(wait=True)
+        if workdir is not None:
+            shutil.rmtree(workdir, ignore_errors=True)
@@ -4,6 +4,19 @@ from typing import BinaryIO, Iterator, Optional, Union
 
 from pyagfs import AGFSClient, AGFSClientError
 
+# Files that >> grows past this size are converted to pyagfs' segmented
+# format, so each append uploads only the new data instead of the whole file
+APPEND_SEGMENT_THRESHOLD = 4 * 1024 * 1024
+
+
+def _iter_and_close(response, chunk_size: int) -> Iterator[bytes]:
+    """Iterate over a streamed response, closing the connection when the
+    iterator is exhausted or closed early (e.g. by a broken pipe)"""
+    try:
+        yield from response.iter_content(chunk_size=chunk_size)
+    finally:
+        response.close()
+
 
 class AGFSFileSystem:
     """Abstraction layer for AGFS file system operations"""
@@ -61,19 +74,16 @@ class AGFSFileSystem:
                     response = self.client.cat(
                         path, offset=offset, size=size, stream=True
                     )
-                    return response.iter_content(chunk_size=8192)
+                    return _iter_and_close(response, 8192)
                 except AGFSClientError as e:
-                    # Fallback to regular read and simulate streaming
-                    content = self.client.cat(
-                        path, offset=offset, size=size, stream=False
+                    # Fallback to regular (non-streaming) read, pulled through
+                    # one reusable buffer instead of materializing the file
+                    return (
+                        bytes(view)
+                        for view in self.client.iter_buffers(
+                            path, buffer_size=8192, offset=offset, size=size
+                        )
                     )
-
-                    # Return iterator that yields chunks
-                    def chunk_generator(data, chunk_size=8192):
-                        for i in range(0, len(data), chunk_size):
-                            yield data[i : i + chunk_size]
-
-                    return chunk_generator(content)
             else:
                 # Return all content at once
                 return self.client.cat(path, offset=offset, size=size)
@@ -103,27 +113,10 @@ class AGFSFileSystem:
         """
         try:
             if append:
-                # For append mode, we need to read existing content first
-                # This means we can't stream directly, need to collect all data
-                try:
-                    existing = self.client.cat(path)
-                except AGFSClientError:
-                    # File doesn't exist, just write new data
-                    existing = b""
-
-                # Collect data if it's streaming
-                if hasattr(data, "__iter__") and not isinstance(
-                    data, (bytes, bytearray)
-                ):
-                    chunks = [existing]
-                    for chunk in data:
-                        chunks.append(chunk)
-                    data = b"".join(chunks)
-                elif hasattr(data, "read"):
-                    # File-like object
-                    data = existing + data.read()
-                else:
-                    data = existing + data
+                # Small files are rewritten with the data appended; larger ones
+                # become (or already are) segmented and get one more segment
+                self.client.append(path, data, convert=True, segment_threshold=APPEND_SEGMENT_THRESHOLD)
+                return "OK"
 
             # Write to AGFS - SDK now supports streaming data directly
             # Use max_retries=0 for shell operations (fail fast)
@@ -1,29 +1,63 @@
 """Pipeline class for chaining processes together"""
 
-from typing import List
+import threading
+from typing import List, Optional, Tuple
 from .process import Process
-from .streams import InputStream, OutputStream, ErrorStream
+from .streams import InputStream, OutputStream, ErrorStream, Pipe, PipeInputStream, PipeOutputStream
+
+
+def fuse_commands(commands: List[Tuple[str, List[str]]]) -> List[Tuple[str, List[str]]]:
+    """
+    Rewrite a parsed pipeline into an equivalent, cheaper one
+
+    sort | uniq -c only counts lines, but the sort reads all of its input
+    before uniq sees the first line. It becomes count -s: one streaming pass
+    that keeps a hash table of distinct lines and produces the same output.
+
+    Args:
+        commands: (command, args) pairs as returned by the parser
+
+    Returns:
+        The pairs to execute
+    """
+    fused = []
+    i = 0
+    while i < len(commands):
+        cmd, args = commands[i]
+        if (cmd == 'sort' and args in ([], ['-r']) and i + 1 < len(commands)
+                and commands[i + 1][0] == 'uniq' and commands[i + 1][1] == ['-c']):
+            fused.append(('count', ['-s'] + args))
+            i += 2
+            continue
+        fused.append((cmd, args))
+        i += 1
+    return fused
 
 
 class Pipeline:
     """Manages a pipeline of processes connected via stdin/stdout"""
 
-    def __init__(self, processes: List[Process]):
+    def __init__(self, processes: List[Process], pipe_capacity: Optional[int] = None):
         """
         Initialize a pipeline
 
         Args:
             processes: List of Process objects to chain together
+            pipe_capacity: Bytes buffered between two processes before the
+                           writer blocks (default: streams.DEFAULT_PIPE_CAPACITY)
         """
         self.processes = processes
+        self.pipe_capacity = pipe_capacity
         self.exit_codes = []
 
     def execute(self) -> int:
         """
         Execute the entire pipeline
 
-        Connects stdout of each process to stdin of the next process.
-        Returns the exit code of the last process.
+        All processes run concurrently, each connected to the next through a
+        bounded Pipe, so downstream commands start producing output while
+        upstream ones are still reading and memory stays bounded by the pipe
+        capacities. The last process runs in the calling thread.
 
         Returns:
             Exit code of the last process
@@ -31,22 +65,48 @@ class Pipeline:
         if not self.processes:
             return 0
 
-        self.exit_codes = []
-
-        # Execute processes in sequence, piping output to next input
-        for i, process in enumerate(self.processes):
-            # If this is not the first process, connect previous stdout to this stdin
-            if i > 0:
-                prev_process = self.processes[i - 1]
-                prev_output = prev_process.get_stdout()
-                process.stdin = InputStream.from_bytes(prev_output)
-
-            # Execute the process
-            exit_code = process.execute()
-            self.exit_codes.append(exit_code)
-
-        # Return exit code of last process
-        return self.exit_codes[-1] if self.exit_codes else 0
+        if len(self.processes) == 1:
+            self.exit_codes = [self.processes[0].execute()]
+            return self.exit_codes[0]
+
+        pipes = []
+        for i in range(len(self.processes) - 1):
+            pipe = Pipe(self.pipe_capacity) if self.pipe_capacity else Pipe()
+            self.processes[i].stdout = PipeOutputStream(pipe)
+            self.processes[i + 1].stdin = PipeInputStream(pipe)
+            pipes.append(pipe)
+
+        exit_codes = [0] * len(self.processes)
+
+        def run(i: int):
+            process = self.processes[i]
+            try:
+                exit_codes[i] = process.execute()
+            finally:
+                # End of this process's output, and nobody reads its input any more
+                if i < len(pipes):
+                    pipes[i].close_write()
+                if i > 0:
+                    pipes[i - 1].close_read()
+
+        threads = [
+            threading.Thread(target=run, args=(i,), name=f"agfs-pipeline-{process.command}", daemon=True)
+            for i, process in enumerate(self.processes[:-1])
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            run(len(self.processes) - 1)
+        except BaseException:
+            # Interrupted: release upstream processes blocked on a pipe and leave them behind
+            for pipe in pipes:
+                pipe.close_read()
+            raise
+        for thread in threads:
+            thread.join()
+
+        self.exit_codes = exit_codes
+        return self.exit_codes[-1]
 
     def get_stdout(self) -> bytes:
         """Get final stdout from the last process"""
@@ -7,6 +7,9 @@ if TYPE_CHECKING:
 
 from .streams import InputStream, OutputStream, ErrorStream
 
+# Exit code of a process stopped by a broken pipe (128 + SIGPIPE, as in sh)
+EXIT_BROKEN_PIPE = 141
+
 
 class Process:
     """Represents a single process/command in a pipeline"""
@@ -60,12 +63,15 @@ class Process:
         try:
             # Execute the command
             self.exit_code = self.executor(self)
+            self.stdout.flush()
+        except BrokenPipeError:
+            # The reader went away (e.g. `... | head`): stop quietly, like SIGPIPE
+            self.exit_code = EXIT_BROKEN_PIPE
         except Exception as e:
             self.stderr.write(f"Error executing '{self.command}': {str(e)}\n")
             self.exit_code = 1
 
         # Flush all streams
-        self.stdout.flush()
         self.stderr.flush()
 
         return self.exit_code
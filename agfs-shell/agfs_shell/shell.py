@@ -5,13 +5,14 @@ import os
 from typing import Optional, List
 from rich.console import Console
 from .parser import CommandParser
-from .pipeline import Pipeline
+from .pipeline import Pipeline, fuse_commands
 from .process import Process
 from .streams import InputStream, OutputStream, ErrorStream
 from .builtins import get_builtin
 from .filesystem import AGFSFileSystem
 from .command_decorators import CommandMetadata
 from pyagfs import AGFSClientError
+from pyagfs.segmented import DEFAULT_SEGMENT_THRESHOLD
 from . import __version__
 
 
@@ -52,6 +53,7 @@ class Shell:
                 return ''
 
             # Build processes for each command (simplified, no redirections)
+            commands = fuse_commands(commands)
             processes = []
             for i, (cmd, args) in enumerate(commands):
                 executor = get_builtin(cmd)
@@ -85,14 +87,8 @@ class Shell:
                 process.cwd = self.cwd
                 processes.append(process)
 
-            # Connect pipeline
-            for i in range(len(processes) - 1):
-                output = processes[i].stdout
-                processes[i + 1].stdin = InputStream.from_stream(output)
-
             # Execute pipeline
-            for process in processes:
-                process.execute()
+            Pipeline(processes).execute()
 
             # Get output from last process
             output = processes[-1].get_stdout()
@@ -726,6 +722,7 @@ class Shell:
                 return 1
 
         # Build processes for each command
+        commands = fuse_commands(commands)
         processes = []
         for i, (cmd, args) in enumerate(commands):
             # Get the executor for this command
@@ -788,27 +785,31 @@ class Shell:
             mode = redirections.get('stdout_mode', 'write')
 
             try:
-                # Streaming write: read chunks and write each one separately
-                # This enables true streaming (each chunk sent immediately to server)
+                # Streaming write: read chunks and send them in batches
+                # Every append costs a request (and rewrites small files), so
+                # chunks are buffered up to the segment threshold before sending
                 chunk_size = 8192  # 8KB chunks
+                flush_size = DEFAULT_SEGMENT_THRESHOLD
                 total_bytes = 0
                 is_first_chunk = True
                 write_response = None
+                buffer = bytearray()
 
                 while True:
                     chunk = sys.stdin.buffer.read(chunk_size)
+                    buffer += chunk
+                    if buffer and (not chunk or len(buffer) >= flush_size):
+                        # First batch: overwrite or append based on mode
+                        # Subsequent batches: always append
+                        append = (mode == 'append') or (not is_first_chunk)
+
+                        write_response = self.filesystem.write_file(output_file, bytes(buffer), append=append)
+                        total_bytes += len(buffer)
+                        buffer.clear()
+                        is_first_chunk = False
                     if not chunk:
                         break
 
-                    # First chunk: overwrite or append based on mode
-                    # Subsequent chunks: always append
-                    append = (mode == 'append') or (not is_first_chunk)
-
-                    # Write chunk immediately (separate HTTP request per chunk)
-                    write_response = self.filesystem.write_file(output_file, chunk, append=append)
-                    total_bytes += len(chunk)
-                    is_first_chunk = False
-
                 # Display write response if it contains data
                 if write_response and write_response != "OK":
                     self.console.print(write_response, highlight=False)
@@ -1225,6 +1226,7 @@ class Shell:
   [green]cp[/green] [-r] src dest       - Copy files (local:path for local filesystem)
   [green]upload[/green] [-r] local agfs - Upload local file/directory to AGFS
   [green]download[/green] [-r] agfs local - Download AGFS file/directory to local
+  [green]sync[/green] [--delete] src dst - Mirror changed files (one side local:)
 
 [bold yellow]Text Processing Commands:[/bold yellow]
   [green]echo[/green] [args...]         - Print arguments to stdout
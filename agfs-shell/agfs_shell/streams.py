@@ -2,11 +2,48 @@
 
 import sys
 import io
-from typing import Optional, Union, BinaryIO, TextIO, TYPE_CHECKING
+import threading
+from collections import deque
+from typing import Iterable, Iterator, Optional, Union, BinaryIO, TextIO, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from .filesystem import AGFSFileSystem
 
+# Bytes read at a time by InputStream.iter_chunks() and iter_lines()
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+def iter_lines(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """
+    Split a stream of byte chunks into lines
+
+    Lines are split on b'\n' only (like readline()) and keep it; a line may
+    span any number of chunks, and a last line without newline is yielded as
+    is. Partial lines are accumulated in one reused bytearray, so memory is
+    bounded by the longest line, not the input.
+    """
+    pending = bytearray()
+    for chunk in chunks:
+        end = chunk.find(b'\n')
+        if end < 0:
+            pending += chunk
+            continue
+        start = 0
+        if pending:
+            pending += chunk[:end + 1]
+            yield bytes(pending)
+            pending.clear()
+            start = end + 1
+            end = chunk.find(b'\n', start)
+        while end >= 0:
+            yield chunk[start:end + 1]
+            start = end + 1
+            end = chunk.find(b'\n', start)
+        if start < len(chunk):
+            pending += chunk[start:]
+    if pending:
+        yield bytes(pending)
+
 
 class Stream:
     """Base class for I/O streams"""
@@ -99,11 +136,32 @@ class Stream:
 
 
 class InputStream(Stream):
-    """Input stream (STDIN-like)"""
+    """Input stream (STDIN-like)
+
+    Besides read()/readline()/readlines(), commands can consume input
+    incrementally with read_chunk(), iter_chunks() and iter_lines(), which
+    keep memory constant however large the input is.
+    """
 
     def __init__(self, fd: Optional[Union[int, BinaryIO, TextIO]] = None):
         super().__init__(fd, mode='rb')
 
+    def read_chunk(self, size: int = DEFAULT_CHUNK_SIZE) -> bytes:
+        """Read up to size bytes; b'' means end of input"""
+        return self.read(size)
+
+    def iter_chunks(self, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+        """Iterate over the remaining input in chunks of at most chunk_size bytes"""
+        while True:
+            chunk = self.read_chunk(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+    def iter_lines(self, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+        """Iterate over the remaining input line by line (bytes, newline kept)"""
+        return iter_lines(self.iter_chunks(chunk_size))
+
     @classmethod
     def from_stdin(cls):
         """Create from system stdin"""
@@ -172,6 +230,158 @@ class ErrorStream(Stream):
         return cls(None)
 
 
+# Bytes a pipe buffers before its writer blocks
+DEFAULT_PIPE_CAPACITY = 256 * 1024
+
+
+class Pipe:
+    """Bounded in-memory byte pipe connecting two concurrently running processes
+
+    Writes block while the pipe holds capacity bytes or more, so a fast
+    producer is paced by its consumer and memory stays bounded. Once the
+    reader is closed (the consumer exited, e.g. head after its last line),
+    writes raise BrokenPipeError, the equivalent of SIGPIPE, so the producer
+    stops instead of computing or downloading output nobody reads.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_PIPE_CAPACITY):
+        self.capacity = capacity
+        self._chunks = deque()
+        self._size = 0
+        self._cond = threading.Condition()
+        self._write_closed = False
+        self._read_closed = False
+
+    def write(self, data: bytes) -> int:
+        """Append data, waiting while the pipe is full"""
+        if not data:
+            return 0
+        with self._cond:
+            while self._size >= self.capacity and not self._read_closed:
+                self._cond.wait()
+            if self._read_closed:
+                raise BrokenPipeError("pipe reader closed")
+            if self._write_closed:
+                raise ValueError("write to closed pipe")
+            self._chunks.append(bytes(data))
+            self._size += len(data)
+            self._cond.notify_all()
+        return len(data)
+
+    def read_chunk(self, max_size: int = -1) -> bytes:
+        """Return the next buffered chunk (at most max_size bytes), or b'' at end of input"""
+        with self._cond:
+            while not self._chunks and not self._write_closed and not self._read_closed:
+                self._cond.wait()
+            if not self._chunks:
+                return b''
+            chunk = self._chunks.popleft()
+            if 0 <= max_size < len(chunk):
+                self._chunks.appendleft(chunk[max_size:])
+                chunk = chunk[:max_size]
+            self._size -= len(chunk)
+            self._cond.notify_all()
+            return chunk
+
+    def close_write(self):
+        """Signal end of input to the reader"""
+        with self._cond:
+            self._write_closed = True
+            self._cond.notify_all()
+
+    def close_read(self):
+        """Stop reading: drop buffered data and break blocked and future writes"""
+        with self._cond:
+            self._read_closed = True
+            self._chunks.clear()
+            self._size = 0
+            self._cond.notify_all()
+
+
+class PipeInputStream(InputStream):
+    """Read end of a Pipe"""
+
+    def __init__(self, pipe: Pipe):
+        super().__init__(None)
+        self.pipe = pipe
+        self._pending = b''
+
+    def _next_chunk(self, max_size: int = -1) -> bytes:
+        if self._pending:
+            chunk = self._pending
+            if 0 <= max_size < len(chunk):
+                self._pending = chunk[max_size:]
+                return chunk[:max_size]
+            self._pending = b''
+            return chunk
+        return self.pipe.read_chunk(max_size)
+
+    def read(self, size: int = -1) -> bytes:
+        """Read up to size bytes as soon as any are available, or everything if size < 0"""
+        if size is not None and size >= 0:
+            return self._next_chunk(size) if size else b''
+        chunks = []
+        while True:
+            chunk = self._next_chunk()
+            if not chunk:
+                return b''.join(chunks)
+            chunks.append(chunk)
+
+    def readline(self) -> bytes:
+        """Read up to and including the next newline"""
+        parts = []
+        while True:
+            chunk = self._next_chunk()
+            if not chunk:
+                return b''.join(parts)
+            newline = chunk.find(b'\n')
+            if newline >= 0:
+                self._pending = chunk[newline + 1:]
+                parts.append(chunk[:newline + 1])
+                return b''.join(parts)
+            parts.append(chunk)
+
+    def readlines(self) -> list:
+        """Read all remaining lines"""
+        return io.BytesIO(self.read()).readlines()
+
+    def get_value(self) -> bytes:
+        """Read all remaining input (a pipe can't be re-read)"""
+        return self.read()
+
+    def close(self):
+        """Stop reading; the writer's further writes raise BrokenPipeError"""
+        self.pipe.close_read()
+
+
+class PipeOutputStream(OutputStream):
+    """Write end of a Pipe"""
+
+    def __init__(self, pipe: Pipe):
+        super().__init__(None)
+        self.pipe = pipe
+
+    def write(self, data: Union[bytes, str]) -> int:
+        """Write to the pipe, waiting while it is full"""
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        if data:
+            self._last_char = data[-1:]
+        return self.pipe.write(data)
+
+    def flush(self):
+        """Nothing to flush: written data is immediately visible to the reader"""
+        pass
+
+    def close(self):
+        """Signal end of input to the reader"""
+        self.pipe.close_write()
+
+    def get_value(self) -> bytes:
+        """Pipe output is consumed by the next process, not kept"""
+        return b''
+
+
 class AGFSOutputStream(OutputStream):
     """Output stream that writes directly to AGFS file in streaming mode"""
 
@@ -2,6 +2,7 @@ import unittest
 import tempfile
 import os
 from unittest.mock import Mock, MagicMock
+from agfs_shell import extsort
 from agfs_shell.builtins import BUILTINS
 from agfs_shell.process import Process
 from agfs_shell.streams import InputStream, OutputStream, ErrorStream
@@ -78,6 +79,14 @@ class TestBuiltins(unittest.TestCase):
         self.assertEqual(cmd(proc), 0)
         self.assertEqual(proc.get_stdout(), b"2\n")
 
+    def test_wc_words_across_chunks(self):
+        cmd = BUILTINS['wc']
+        proc = self.create_process("wc", [], "alpha beta\ngamma  delta epsilon\n" * 3)
+        # Tiny chunks split words across chunk boundaries
+        proc.stdin.read_chunk = lambda size, read=proc.stdin.read: read(3)
+        self.assertEqual(cmd(proc), 0)
+        self.assertEqual(proc.get_stdout(), b"6 15 96\n")
+
     def test_head(self):
         cmd = BUILTINS['head']
         input_data = "\n".join([f"line{i}" for i in range(20)]) + "\n"
@@ -96,6 +105,12 @@ class TestBuiltins(unittest.TestCase):
         output = proc.get_stdout().decode('utf-8').splitlines()
         self.assertEqual(len(output), 5)
 
+    def test_head_negative(self):
+        cmd = BUILTINS['head']
+        proc = self.create_process("head", ["-n", "-2"], "a\nb\nc\nd\n")
+        self.assertEqual(cmd(proc), 0)
+        self.assertEqual(proc.get_stdout(), b"a\nb\n")
+
     def test_tail(self):
         cmd = BUILTINS['tail']
         input_data = "\n".join([f"line{i}" for i in range(20)]) + "\n"
@@ -108,6 +123,31 @@ class TestBuiltins(unittest.TestCase):
         self.assertEqual(output[0], "line10")
         self.assertEqual(output[-1], "line19")
 
+    def test_tail_without_trailing_newline(self):
+        cmd = BUILTINS['tail']
+        proc = self.create_process("tail", ["-n", "2"], "a\nb\nc")
+        self.assertEqual(cmd(proc), 0)
+        self.assertEqual(proc.get_stdout(), b"b\nc")
+
+    def test_grep_file_streams(self):
+        cmd = BUILTINS['grep']
+        closed = []
+
+        def stream():
+            try:
+                yield b"apple\nban"
+                yield b"ana\ncherry\n"
+            finally:
+                closed.append(True)
+
+        proc = self.create_process("grep", ["-n", "an", "/fruits"])
+        proc.filesystem = Mock()
+        proc.filesystem.read_file.return_value = stream()
+        self.assertEqual(cmd(proc), 0)
+        self.assertEqual(proc.get_stdout(), b"2:banana\n")
+        proc.filesystem.read_file.assert_called_once_with("/fruits", stream=True)
+        self.assertEqual(closed, [True])
+
     def test_sort(self):
         cmd = BUILTINS['sort']
         input_data = "c\na\nb\n"
@@ -122,6 +162,60 @@ class TestBuiltins(unittest.TestCase):
         self.assertEqual(cmd(proc), 0)
         self.assertEqual(proc.get_stdout(), b"c\nb\na\n")
 
+    def test_sort_keys(self):
+        cmd = BUILTINS['sort']
+        input_data = "b,10,x\na,9,y\nc,10,w\na,9,y\n"
+
+        # Numeric sort on the second field, ties broken by the whole line
+        proc = self.create_process("sort", ["-t", ",", "-k2,2n"], input_data)
+        self.assertEqual(cmd(proc), 0)
+        self.assertEqual(proc.get_stdout(), b"a,9,y\na,9,y\nb,10,x\nc,10,w\n")
+
+        # Second key reversed; -u drops lines with equal keys
+        proc = self.create_process("sort", ["-t,", "-k2,2n", "-k3r", "-u"], input_data)
+        self.assertEqual(cmd(proc), 0)
+        self.assertEqual(proc.get_stdout(), b"a,9,y\nb,10,x\nc,10,w\n")
+
+        proc = self.create_process("sort", ["-nu"], "10\n9\n010\n-1.5\n")
+        self.assertEqual(cmd(proc), 0)
+        self.assertEqual(proc.get_stdout(), b"-1.5\n9\n10\n")
+
+        proc = self.create_process("sort", ["-k", "0"], input_data)
+        self.assertEqual(cmd(proc), 2)
+
+    def test_sort_spills_runs(self):
+        cmd = BUILTINS['sort']
+        words = [f"w{(i * 7919) % 1000:04d}" for i in range(1000)]
+        input_data = "\n".join(words + words[:10]) + "\n"
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            # A 1K buffer forces dozens of runs; --parallel=1 keeps them in-process
+            proc = self.create_process("sort", ["-u", "-S", "1", "-T", tmpdir, "--parallel=1"], input_data)
+            self.assertEqual(cmd(proc), 0)
+            self.assertEqual(os.listdir(tmpdir), [])
+
+        self.assertEqual(proc.get_stdout().decode().split(), sorted(set(words)))
+
+    def test_sort_in_memory_below_buffer(self):
+        # Input that fits in -S is sorted in memory, whatever the parallelism
+        lines = [b"%05d\n" % ((i * 7919) % 10000) for i in range(10000)]
+        output = []
+        spilled = extsort.external_sort(iter(lines), output.append, extsort.SortSpec(),
+                                        buffer_size=2 * 1024 * 1024, parallel=8)
+        self.assertEqual(spilled, 0)
+        self.assertEqual(b"".join(output), b"".join(sorted(lines)))
+
+        # Past the buffer, the first buffer is split into runs of its share
+        spilled = extsort.external_sort(iter(lines), output.append, extsort.SortSpec(),
+                                        buffer_size=64 * 1024, parallel=1)
+        self.assertGreater(spilled, 1)
+
+    def test_sort_numeric_plus_sign(self):
+        # Like GNU sort -n, a leading + is not part of a number
+        proc = self.create_process("sort", ["-n"], "+5\n3\n-1\n")
+        self.assertEqual(BUILTINS['sort'](proc), 0)
+        self.assertEqual(proc.get_stdout(), b"-1\n+5\n3\n")
+
     def test_uniq(self):
         cmd = BUILTINS['uniq']
         input_data = "a\na\nb\nb\nc\n"
@@ -130,6 +224,51 @@ class TestBuiltins(unittest.TestCase):
         self.assertEqual(cmd(proc), 0)
         self.assertEqual(proc.get_stdout(), b"a\nb\nc\n")
 
+        # Input without a final newline keeps it that way
+        proc = self.create_process("uniq", [], "a\na\nb")
+        self.assertEqual(cmd(proc), 0)
+        self.assertEqual(proc.get_stdout(), b"a\nb")
+
+        proc = self.create_process("uniq", [], "a\na")
+        self.assertEqual(cmd(proc), 0)
+        self.assertEqual(proc.get_stdout(), b"a\n")
+
+        proc = self.create_process("uniq", ["-c"], "a\na\nb\na")
+        self.assertEqual(cmd(proc), 0)
+        self.assertEqual(proc.get_stdout(), b"      2 a\n      1 b\n      1 a")
+
+        proc = self.create_process("uniq", ["-d"], input_data)
+        self.assertEqual(cmd(proc), 0)
+        self.assertEqual(proc.get_stdout(), b"a\nb\n")
+
+        proc = self.create_process("uniq", ["-u"], input_data)
+        self.assertEqual(cmd(proc), 0)
+        self.assertEqual(proc.get_stdout(), b"c\n")
+
+    def test_count(self):
+        cmd = BUILTINS['count']
+        input_data = "x\ny\nz\ny\nz\nz\nw\n"
+
+        # Most frequent first, ties in order of first appearance
+        proc = self.create_process("count", [], input_data)
+        self.assertEqual(cmd(proc), 0)
+        self.assertEqual(proc.get_stdout(), b"      3 z\n      2 y\n      1 x\n      1 w\n")
+
+        proc = self.create_process("count", ["-s"], input_data)
+        self.assertEqual(cmd(proc), 0)
+        self.assertEqual(proc.get_stdout(), b"      1 w\n      1 x\n      2 y\n      3 z\n")
+
+        proc = self.create_process("count", ["-n", "2", "-r"], input_data)
+        self.assertEqual(cmd(proc), 0)
+        self.assertEqual(proc.get_stdout(), b"      1 x\n      1 w\n")
+
+        proc = self.create_process("topk", ["2"], input_data)
+        self.assertEqual(BUILTINS['topk'](proc), 0)
+        self.assertEqual(proc.get_stdout(), b"      3 z\n      2 y\n")
+
+        proc = self.create_process("count", ["-n", "x"], input_data)
+        self.assertEqual(cmd(proc), 1)
+
     def test_tr(self):
         cmd = BUILTINS['tr']
         input_data = "hello"
@@ -0,0 +1,22 @@
+import unittest
+from unittest.mock import Mock
+from agfs_shell.filesystem import APPEND_SEGMENT_THRESHOLD, AGFSFileSystem
+
+class TestFileSystem(unittest.TestCase):
+    def test_append_converts_large_files_to_segments(self):
+        fs = AGFSFileSystem()
+        fs.client = Mock()
+        self.assertEqual(fs.write_file("/log", b"line\n", append=True), "OK")
+        fs.client.append.assert_called_once_with(
+            "/log", b"line\n", convert=True, segment_threshold=APPEND_SEGMENT_THRESHOLD)
+        fs.client.write.assert_not_called()
+
+    def test_overwrite_fails_fast(self):
+        fs = AGFSFileSystem()
+        fs.client = Mock()
+        fs.write_file("/out", b"data")
+        fs.client.write.assert_called_once_with("/out", b"data", max_retries=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
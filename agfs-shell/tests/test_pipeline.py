@@ -1,5 +1,8 @@
+import threading
 import unittest
-from agfs_shell.pipeline import Pipeline
+from unittest.mock import Mock
+from agfs_shell.builtins import BUILTINS
+from agfs_shell.pipeline import Pipeline, fuse_commands
 from agfs_shell.process import Process
 from agfs_shell.streams import InputStream, OutputStream, ErrorStream
 
@@ -71,5 +74,117 @@ class TestPipeline(unittest.TestCase):
         self.assertEqual(pipeline.execute(), 0)
         self.assertEqual(pipeline.get_stdout(), b"")
 
+    def test_stages_run_concurrently(self):
+        # The consumer sees the first line before the producer finishes
+        seen_first = threading.Event()
+
+        def producer(proc):
+            proc.stdout.write(b"first\n")
+            self.assertTrue(seen_first.wait(5))
+            proc.stdout.write(b"second\n")
+            return 0
+
+        def consumer(proc):
+            self.assertEqual(proc.stdin.readline(), b"first\n")
+            seen_first.set()
+            proc.stdout.write(proc.stdin.read())
+            return 0
+
+        pipeline = Pipeline([Process("p", [], executor=producer), Process("c", [], executor=consumer)])
+        self.assertEqual(pipeline.execute(), 0)
+        self.assertEqual(pipeline.get_stdout(), b"second\n")
+
+    def test_backpressure_bounds_buffering(self):
+        buffered = []
+
+        def producer(proc):
+            for _ in range(64):
+                proc.stdout.write(b"x" * 1024)
+                buffered.append(proc.stdout.pipe._size)
+            return 0
+
+        def consumer(proc):
+            total = 0
+            while True:
+                chunk = proc.stdin.read(4096)
+                if not chunk:
+                    break
+                total += len(chunk)
+            proc.stdout.write(str(total))
+            return 0
+
+        pipeline = Pipeline([Process("p", [], executor=producer), Process("c", [], executor=consumer)],
+                            pipe_capacity=4096)
+        self.assertEqual(pipeline.execute(), 0)
+        self.assertEqual(pipeline.get_stdout(), b"65536")
+        self.assertLessEqual(max(buffered), 4096 + 1024)
+
+    def test_consumer_exiting_early_breaks_the_pipe(self):
+        written = []
+
+        def producer(proc):
+            for _ in range(1000):
+                proc.stdout.write(b"line\n")
+                written.append(1)
+            return 0
+
+        def first_line(proc):
+            proc.stdout.write(proc.stdin.readline())
+            return 0
+
+        pipeline = Pipeline([Process("p", [], executor=producer), Process("h", [], executor=first_line)],
+                            pipe_capacity=64)
+        self.assertEqual(pipeline.execute(), 0)
+        self.assertEqual(pipeline.get_stdout(), b"line\n")
+        # The producer was stopped by a broken pipe instead of writing everything
+        self.assertEqual(pipeline.exit_codes, [141, 0])
+        self.assertLess(len(written), 1000)
+        self.assertEqual(pipeline.get_stderr(), b"")
+
+    def test_head_stops_cat_download(self):
+        # cat big.log | head -n 2 reads only what head consumes and closes the stream
+        state = {"chunks": 0, "closed": False}
+
+        def stream():
+            try:
+                for i in range(10000):
+                    state["chunks"] += 1
+                    yield b"line %d\n" % i * 100
+            finally:
+                state["closed"] = True
+
+        filesystem = Mock()
+        filesystem.read_file.return_value = stream()
+        cat = Process("cat", ["/big.log"], executor=BUILTINS['cat'], filesystem=filesystem)
+        head = Process("head", ["-n", "2"], executor=BUILTINS['head'])
+
+        pipeline = Pipeline([cat, head], pipe_capacity=4096)
+        self.assertEqual(pipeline.execute(), 0)
+        self.assertEqual(pipeline.get_stdout(), b"line 0\nline 0\n")
+        self.assertEqual(pipeline.exit_codes, [141, 0])
+        self.assertTrue(state["closed"])
+        self.assertLess(state["chunks"], 100)
+
+    def test_fuse_sort_uniq_count(self):
+        commands = [('cat', ['/log']), ('sort', []), ('uniq', ['-c']), ('sort', ['-rn'])]
+        self.assertEqual(fuse_commands(commands),
+                         [('cat', ['/log']), ('count', ['-s']), ('sort', ['-rn'])])
+        self.assertEqual(fuse_commands([('sort', ['-r']), ('uniq', ['-c'])]), [('count', ['-s', '-r'])])
+
+        # Other orders or uniq modes are left alone
+        for commands in ([('sort', ['-n']), ('uniq', ['-c'])], [('sort', []), ('uniq', [])],
+                         [('uniq', ['-c']), ('sort', [])]):
+            self.assertEqual(fuse_commands(commands), commands)
+
+        # The fused pipeline prints what sort | uniq -c would
+        data = b"b\na\nb\nc\nb\na"
+        stages = [Process(cmd, args, executor=BUILTINS[cmd]) for cmd, args in [('sort', []), ('uniq', ['-c'])]]
+        stages[0].stdin = InputStream.from_bytes(data)
+        fused = Process('count', ['-s'], stdin=InputStream.from_bytes(data), executor=BUILTINS['count'])
+        Pipeline(stages).execute()
+        Pipeline([fused]).execute()
+        self.assertEqual(fused.get_stdout(), stages[-1].get_stdout())
+        self.assertEqual(fused.get_stdout(), b"      2 a\n      3 b\n      1 c\n")
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,38 @@
+import threading
+import unittest
+from agfs_shell.streams import InputStream, Pipe, PipeInputStream, PipeOutputStream, iter_lines
+
+class TestStreams(unittest.TestCase):
+    def test_iter_lines_across_chunks(self):
+        chunks = [b"ab", b"c\nde", b"f\n\ng", b"", b"h"]
+        self.assertEqual(list(iter_lines(chunks)), [b"abc\n", b"def\n", b"\n", b"gh"])
+        self.assertEqual(list(iter_lines([])), [])
+        self.assertEqual(list(iter_lines([b"a\r\nb\n"])), [b"a\r\n", b"b\n"])
+
+    def test_input_stream_iter_lines(self):
+        data = b"".join(b"line %d\n" % i for i in range(1000))
+        stream = InputStream.from_bytes(data)
+        lines = list(stream.iter_lines(chunk_size=7))
+        self.assertEqual(lines, data.splitlines(keepends=True))
+
+    def test_input_stream_iter_chunks(self):
+        stream = InputStream.from_bytes(b"x" * 10)
+        self.assertEqual(list(stream.iter_chunks(4)), [b"xxxx", b"xxxx", b"xx"])
+
+    def test_pipe_iter_lines_after_readline(self):
+        pipe = Pipe(capacity=16)
+        reader, writer = PipeInputStream(pipe), PipeOutputStream(pipe)
+
+        def produce():
+            for i in range(100):
+                writer.write(b"%d\n" % i)
+            writer.close()
+
+        thread = threading.Thread(target=produce)
+        thread.start()
+        self.assertEqual(reader.readline(), b"0\n")
+        self.assertEqual(list(reader.iter_lines()), [b"%d\n" % i for i in range(1, 100)])
+        thread.join()
+
+if __name__ == '__main__':
+    unittest.main()